@@ -0,0 +1,63 @@
+"""
+Deferred import of the research agent for the research handlers
+langchain, langgraph and bs4 are only loaded once a request actually needs
+them, so cold starts that are rejected early never pay for the import.
+
+On Vercel every api/*.py file is a function of its own, so pinging
+/api/warmup cannot warm the functions serving research traffic. Each research
+handler instead calls warm_in_background() when it is loaded, which imports
+the agent and runs its warm_up() off the request path.
+"""
+
+import os
+import logging
+import threading
+import traceback
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+research_agent = None
+import_error: Optional[str] = None
+_import_lock = threading.Lock()
+_warm_thread: Optional[threading.Thread] = None
+
+# server.py turns this off: it warms each worker itself after forking
+RESEARCH_WARM_ON_LOAD = os.getenv("RESEARCH_WARM_ON_LOAD", "true").lower() in ("1", "true", "yes")
+
+
+def load_research_agent() -> Tuple[Optional[object], Optional[str]]:
+    """(research agent module, None) once imported, or (None, error detail) if the import failed"""
+    global research_agent, import_error
+    if research_agent is None and import_error is None:
+        with _import_lock:
+            if research_agent is None and import_error is None:
+                try:
+                    from api import research_agent as agent
+                    research_agent = agent
+                    logger.info("Successfully imported api.research_agent")
+                except Exception as e:
+                    import_error = f"{str(e)}\n{traceback.format_exc()}"
+                    logger.error(f"Failed to import api.research_agent: {import_error}")
+    return research_agent, import_error
+
+
+def _warm():
+    agent, error = load_research_agent()
+    if agent is None:
+        return
+    try:
+        logger.info(f"Warmed the research agent: {agent.warm_up()}")
+    except Exception as e:
+        logger.warning(f"Background warm-up failed ({e}); requests will build what they need")
+
+
+def warm_in_background():
+    """Import the agent and warm it up on a daemon thread, once per process"""
+    global _warm_thread
+    if not RESEARCH_WARM_ON_LOAD:
+        return
+    with _import_lock:
+        if _warm_thread is None:
+            _warm_thread = threading.Thread(target=_warm, name="research-warm-up", daemon=True)
+            _warm_thread.start()
@@ -0,0 +1,145 @@
+"""
+Local full-text index of scraped articles
+Every article a live scrape returns is upserted into a SQLite FTS5 table
+(title, authors, abstract, URL, source, fetch time). Before a source is
+scraped for a topic, the index is searched: when it already holds enough
+fresh articles from that source matching every topic term, they are served
+from the index and the source is not fetched, so repeat and related topics
+skip the network for the fetch stage.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from api.parsers import MAX_RESULTS
+from api.relevance import is_article, tokenize
+
+ARTICLE_INDEX_ENABLED = os.getenv("ARTICLE_INDEX_ENABLED", "true").lower() in ("1", "true", "yes")
+ARTICLE_INDEX_PATH = os.getenv("ARTICLE_INDEX_PATH", os.path.join(tempfile.gettempdir(), "research_articles.sqlite3"))
+# Seconds an indexed article counts as fresh enough to stand in for a scrape
+ARTICLE_INDEX_MAX_AGE = float(os.getenv("ARTICLE_INDEX_MAX_AGE", "604800"))
+# Matching fresh articles a source needs in the index to skip its live scrape
+ARTICLE_INDEX_MIN_HITS = int(os.getenv("ARTICLE_INDEX_MIN_HITS", "5"))
+
+INDEX_HIT = "index"
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS articles ("
+    "id INTEGER PRIMARY KEY, url TEXT NOT NULL UNIQUE, source TEXT NOT NULL, title TEXT NOT NULL, "
+    "authors TEXT NOT NULL, abstract TEXT NOT NULL, record TEXT NOT NULL, fetched_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS articles_fetched ON articles (fetched_at)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5("
+    "title, authors, abstract, content='articles', content_rowid='id', tokenize='porter unicode61')",
+    # Keep the external-content FTS table in step with articles
+    "CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN "
+    "INSERT INTO articles_fts (rowid, title, authors, abstract) VALUES (new.id, new.title, new.authors, new.abstract); END",
+    "CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN "
+    "INSERT INTO articles_fts (articles_fts, rowid, title, authors, abstract) "
+    "VALUES ('delete', old.id, old.title, old.authors, old.abstract); END",
+    "CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN "
+    "INSERT INTO articles_fts (articles_fts, rowid, title, authors, abstract) "
+    "VALUES ('delete', old.id, old.title, old.authors, old.abstract); "
+    "INSERT INTO articles_fts (rowid, title, authors, abstract) VALUES (new.id, new.title, new.authors, new.abstract); END",
+)
+
+
+def match_query(topic: str) -> Optional[str]:
+    """FTS5 query requiring every topic term (quoted, so no term is read as syntax)"""
+    terms = list(dict.fromkeys(tokenize(topic)))
+    return " ".join(f'"{term}"' for term in terms) if terms else None
+
+
+class ArticleIndex:
+    """SQLite FTS5 index of scraped articles, one row per URL"""
+
+    def __init__(self, path: str = ARTICLE_INDEX_PATH, max_age: float = ARTICLE_INDEX_MAX_AGE,
+                 min_hits: int = ARTICLE_INDEX_MIN_HITS):
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def add(self, source: str, articles: List[Dict]):
+        """Upsert a scrape's articles, dropping ones past the freshness window.
+        Placeholders and articles without a URL are skipped."""
+        now = time.time()
+        rows = [
+            (article["url"], source, str(article.get("title") or ""), str(article.get("authors") or ""),
+             str(article.get("abstract") or ""), json.dumps(article), now)
+            for article in articles if is_article(article) and article.get("url")
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO articles (url, source, title, authors, abstract, record, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (url) DO UPDATE SET source = excluded.source, "
+                "title = excluded.title, authors = excluded.authors, abstract = excluded.abstract, "
+                "record = excluded.record, fetched_at = excluded.fetched_at",
+                rows
+            )
+            self._conn.execute("DELETE FROM articles WHERE fetched_at < ?", (now - self.max_age,))
+            self._conn.commit()
+
+    def search(self, source: str, topic: str, limit: int = MAX_RESULTS) -> List[Dict]:
+        """Fresh articles from source matching every topic term, best BM25 match first"""
+        query = match_query(topic)
+        if query is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT a.record FROM articles_fts JOIN articles a ON a.id = articles_fts.rowid "
+                "WHERE articles_fts MATCH ? AND a.source = ? AND a.fetched_at >= ? "
+                "ORDER BY bm25(articles_fts) LIMIT ?",
+                (query, source, time.time() - self.max_age, limit)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def lookup(self, source: str, topic: str) -> Optional[List[Dict]]:
+        """The source's indexed articles for the topic when there are enough to skip the scrape, else None"""
+        articles = self.search(source, topic)
+        hit = len(articles) >= max(1, self.min_hits)
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return articles if hit else None
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            articles = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "articles": articles,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_article_index() -> Optional[ArticleIndex]:
+    """Get or initialize the process-wide article index (None when disabled)"""
+    global _index
+    if not ARTICLE_INDEX_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ArticleIndex()
+    return _index
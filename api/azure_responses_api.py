@@ -4,23 +4,63 @@ Handles the new input/output format instead of messages/completions
 """
 
 import os
-import requests
 import json
+import time
+from functools import partial
 from dotenv import load_dotenv
 from langchain_core.runnables import Runnable
 
+from api.deadline import AZURE_OPENAI_TIMEOUT, call_timeout, config_deadline
+from api.http_pool import async_timeout, build_retry, get_async_session, mount_host
+from api.llm_cache import get_llm_cache
+from api.llm_scheduler import LLM_EXPECTED_OUTPUT_TOKENS, estimate_tokens, get_scheduler
+from api.model_router import get_model_router
+from api.source_cache import CACHE_HIT, CACHE_MISS
+from api.tracing import span
+
 env_path = os.path.join(os.path.dirname(__file__), '..', '.env.local')
 if os.path.exists(env_path):
     load_dotenv(env_path)
 
 AZURE_OPENAI_ENDPOINT = os.getenv('AZURE_OPENAI_ENDPOINT')
 AZURE_OPENAI_KEY = os.getenv('AZURE_OPENAI_KEY')
+AZURE_OPENAI_POOL_MAXSIZE = int(os.getenv('AZURE_OPENAI_POOL_MAXSIZE', '10'))
 
 if not AZURE_OPENAI_ENDPOINT or not AZURE_OPENAI_KEY:
     import warnings
     warnings.warn("Azure OpenAI credentials not found. Please set AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_KEY environment variables.")
 
 
+class AzureResponsesAPIError(Exception):
+    """Raised when a Responses API call fails
+    
+    status_code is None for transport errors; retry_after carries the server's
+    Retry-After hint in seconds when one was sent.
+    """
+    
+    def __init__(self, message: str, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+    
+    @property
+    def retryable(self) -> bool:
+        return self.status_code is None or self.status_code == 429 or self.status_code >= 500
+    
+    @classmethod
+    def from_response(cls, status_code: int, body: str, headers) -> "AzureResponsesAPIError":
+        retry_after = None
+        for header in ("retry-after-ms", "Retry-After"):
+            value = headers.get(header)
+            if value:
+                try:
+                    retry_after = float(value) / (1000.0 if header == "retry-after-ms" else 1.0)
+                    break
+                except ValueError:
+                    continue
+        return cls(f"Failed to call Azure Responses API: API Error {status_code}: {body}", status_code, retry_after)
+
+
 class AzureResponsesAPIClient:
     """Client for Azure OpenAI Responses API"""
     
@@ -35,17 +75,29 @@ class AzureResponsesAPIClient:
             "api-key": self.api_key,
             "Content-Type": "application/json"
         }
+        
+        # Dedicated keep-alive pool for the endpoint. Only connection failures
+        # are retried here: a POST that reached the server may be billed, and
+        # read timeouts and error statuses are left to the scheduler, which
+        # knows the run's deadline
+        self.session = mount_host(
+            self.endpoint,
+            pool_maxsize=AZURE_OPENAI_POOL_MAXSIZE,
+            retry=build_retry(status_forcelist=(), allowed_methods=("POST",), respect_retry_after_header=False,
+                              connect_only=True)
+        )
     
-    def invoke(self, input_text: str, model: str = "gpt-4.1") -> str:
+    def create(self, input_text: str, model: str = "gpt-4.1", timeout: float = AZURE_OPENAI_TIMEOUT) -> dict:
         """
-        Call the Responses API with the new input format
+        Call the Responses API and return the full response body
         
         Args:
             input_text: The prompt/input text
             model: Model to use (e.g., "gpt-4.1")
+            timeout: Seconds to wait for the connection and for the response
             
         Returns:
-            The response output text
+            The decoded JSON response, including "output" and "usage"
         """
         payload = {
             "model": model,
@@ -53,24 +105,152 @@ class AzureResponsesAPIClient:
         }
         
         try:
-            response = requests.post(
+            response = self.session.post(
                 self.endpoint,
                 headers=self.headers,
-                json=payload
+                json=payload,
+                timeout=timeout
             )
             
             if response.status_code != 200:
-                raise Exception(f"API Error {response.status_code}: {response.text}")
+                raise AzureResponsesAPIError.from_response(response.status_code, response.text, response.headers)
             
-            result = response.json()
-            # Extract the output from the response
-            if "output" in result:
-                return result["output"]
-            else:
-                return str(result)
+            return response.json()
                 
+        except AzureResponsesAPIError:
+            raise
+        except Exception as e:
+            raise AzureResponsesAPIError(f"Failed to call Azure Responses API: {str(e)}")
+    
+    def invoke(self, input_text: str, model: str = "gpt-4.1", timeout: float = AZURE_OPENAI_TIMEOUT) -> str:
+        """
+        Call the Responses API with the new input format
+        
+        Args:
+            input_text: The prompt/input text
+            model: Model to use (e.g., "gpt-4.1")
+            
+        Returns:
+            The response output text
+        """
+        result = self.create(input_text, model, timeout)
+        # Extract the output from the response
+        if "output" in result:
+            return result["output"]
+        else:
+            return str(result)
+    
+    def stream(self, input_text: str, model: str = "gpt-4.1", timeout: float = AZURE_OPENAI_TIMEOUT):
+        """
+        Call the Responses API in streaming mode
+        
+        Args:
+            input_text: The prompt/input text
+            model: Model to use (e.g., "gpt-4.1")
+            timeout: Seconds to wait for the connection and between streamed chunks
+            
+        Yields:
+            Decoded server-sent events, e.g. {"type": "response.output_text.delta", "delta": "..."}
+            and finally {"type": "response.completed", "response": {...}}
+        """
+        payload = {
+            "model": model,
+            "input": input_text,
+            "stream": True
+        }
+        
+        try:
+            response = self.session.post(
+                self.endpoint,
+                headers=self.headers,
+                json=payload,
+                stream=True,
+                timeout=timeout
+            )
+        except Exception as e:
+            raise AzureResponsesAPIError(f"Failed to call Azure Responses API: {str(e)}")
+        
+        with response:
+            if response.status_code != 200:
+                raise AzureResponsesAPIError.from_response(response.status_code, response.text, response.headers)
+            
+            # text/event-stream responses usually omit the charset
+            response.encoding = response.encoding or "utf-8"
+            for line in response.iter_lines(chunk_size=None, decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if event.get("type") in ("error", "response.failed"):
+                    raise AzureResponsesAPIError(f"Failed to call Azure Responses API: {data}")
+                yield event
+
+    
+    async def acreate(self, input_text: str, model: str = "gpt-4.1", timeout: float = AZURE_OPENAI_TIMEOUT) -> dict:
+        """Async version of create() on the pooled aiohttp session"""
+        payload = {
+            "model": model,
+            "input": input_text
+        }
+        
+        try:
+            session = get_async_session()
+            async with session.post(self.endpoint, headers=self.headers, json=payload,
+                                    timeout=async_timeout(timeout)) as response:
+                if response.status != 200:
+                    raise AzureResponsesAPIError.from_response(response.status, await response.text(), response.headers)
+                return await response.json(content_type=None)
+        except AzureResponsesAPIError:
+            raise
+        except Exception as e:
+            raise AzureResponsesAPIError(f"Failed to call Azure Responses API: {str(e)}")
+    
+    async def astream(self, input_text: str, model: str = "gpt-4.1", timeout: float = AZURE_OPENAI_TIMEOUT):
+        """Async version of stream(), yielding decoded server-sent events"""
+        payload = {
+            "model": model,
+            "input": input_text,
+            "stream": True
+        }
+        
+        try:
+            session = get_async_session()
+            response = await session.post(self.endpoint, headers=self.headers, json=payload,
+                                          timeout=async_timeout(timeout))
         except Exception as e:
-            raise Exception(f"Failed to call Azure Responses API: {str(e)}")
+            raise AzureResponsesAPIError(f"Failed to call Azure Responses API: {str(e)}")
+        
+        async with response:
+            if response.status != 200:
+                raise AzureResponsesAPIError.from_response(response.status, await response.text(), response.headers)
+            
+            async for raw_line in response.content:
+                line = raw_line.decode("utf-8").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                event = json.loads(data)
+                if event.get("type") in ("error", "response.failed"):
+                    raise AzureResponsesAPIError(f"Failed to call Azure Responses API: {data}")
+                yield event
+
+def extract_output_text(raw: str) -> str:
+    """Return the first output_text of a serialized Responses API output list, or raw as-is"""
+    try:
+        parsed = json.loads(raw)
+    except (ValueError, TypeError):
+        return raw
+    if isinstance(parsed, list):
+        for item in parsed:
+            if isinstance(item, dict) and item.get("type") == "message":
+                for content_item in item.get("content") or []:
+                    if isinstance(content_item, dict) and content_item.get("type") == "output_text":
+                        return content_item.get("text", raw)
+    return raw
 
 
 class ResponsesAPIChatModel(Runnable):
@@ -84,17 +264,9 @@ class ResponsesAPIChatModel(Runnable):
         self.client = AzureResponsesAPIClient()
         self.model = model
     
-    def invoke(self, input_dict, config=None):
-        """
-        Invoke the model with LangChain-style input
-        
-        Args:
-            input_dict: Dictionary with template variables or a prompt string
-            config: Optional config dict for LangChain compatibility
-            
-        Returns:
-            Object with .content attribute containing the response
-        """
+    @staticmethod
+    def _input_text(input_dict) -> str:
+        """Render LangChain-style input into the Responses API input string"""
         # Extract the input text from the dict
         if isinstance(input_dict, dict):
             # Handle LangChain template variables
@@ -102,25 +274,191 @@ class ResponsesAPIChatModel(Runnable):
                 input_text = list(input_dict.values())[0]
             else:
                 # For multiple variables, format them as a readable string
-                input_text = "; ".join([f"{k}: {v}" for k, v in input_dict.items()])
+                input_text = "\n".join(f"{k}: {v}" for k, v in input_dict.items())
+        elif hasattr(input_dict, "to_messages"):
+            # Prompt values: the message text alone, not the message reprs
+            input_text = "\n\n".join(str(message.content) for message in input_dict.to_messages())
         else:
             input_text = str(input_dict)
-        
-        response_text = self.client.invoke(str(input_text), self.model)
-        
+        return str(input_text)
+    
+    @staticmethod
+    def _cache_options(config):
+        """Read the node name and cache bypass flag from a LangChain config"""
+        config = config or {}
+        node = (config.get("metadata") or {}).get("llm_node")
+        bypass = (config.get("configurable") or {}).get("llm_cache_bypass", False)
+        return node, bypass
+    
+    @staticmethod
+    def _trace_usage(details: dict, output, usage):
+        """Fill a tracing span with the call's response size and token usage"""
+        usage = usage or {}
+        details["bytes"] = len(output if isinstance(output, str) else json.dumps(output))
+        details["input_tokens"] = usage.get("input_tokens", 0)
+        details["output_tokens"] = usage.get("output_tokens", 0)
+    
+    @staticmethod
+    def _response(response_text, cached: bool):
+        """Wrap output in an object with .content to match LangChain's interface"""
         # Ensure response is always a string
         if isinstance(response_text, list):
             response_text = json.dumps(response_text)
         elif not isinstance(response_text, str):
             response_text = str(response_text)
+        return type('Response', (), {'content': response_text, 'cached': cached})()
+    
+    def invoke(self, input_dict, config=None):
+        """
+        Invoke the model with LangChain-style input
         
-        # Return an object with .content attribute to match LangChain's interface
-        return type('Response', (), {'content': response_text})()
+        Identical (model, input text) pairs are served from the LLM cache. The
+        node name for per-node TTLs is read from config["metadata"]["llm_node"];
+        config["configurable"]["llm_cache_bypass"] skips the lookup and
+        refreshes the entry. The call is bounded by what is left of
+        config["configurable"]["deadline"] when one is set.
+        
+        Args:
+            input_dict: Dictionary with template variables or a prompt string
+            config: Optional config dict for LangChain compatibility
+            
+        Returns:
+            Object with .content attribute containing the response
+        """
+        input_text = self._input_text(input_dict)
+        node, bypass = self._cache_options(config)
+        
+        with span("llm", node or "", model=self.model, cache=CACHE_MISS) as details:
+            cache = get_llm_cache()
+            entry = cache.get(self.model, input_text) if cache and not bypass else None
+            if entry is not None:
+                details["cache"] = CACHE_HIT
+                return self._response(entry["output"], True)
+            
+            started = time.perf_counter()
+            result = self.client.create(input_text, self.model, call_timeout(config))
+            latency = time.perf_counter() - started
+            get_model_router().record(node, self.model, latency)
+            response_text = result["output"] if "output" in result else str(result)
+            self._trace_usage(details, response_text, result.get("usage"))
+            if cache:
+                cache.set(self.model, input_text, response_text, result.get("usage"), latency, node)
+            return self._response(response_text, False)
     
-    def batch(self, inputs, config=None, **kwargs):
-        """Support batch processing"""
-        return [self.invoke(input_item, config) for input_item in inputs]
+    async def ainvoke(self, input_dict, config=None, **kwargs):
+        """Async version of invoke() that does not block the event loop on the API call"""
+        input_text = self._input_text(input_dict)
+        node, bypass = self._cache_options(config)
+        
+        with span("llm", node or "", model=self.model, cache=CACHE_MISS) as details:
+            cache = get_llm_cache()
+            entry = cache.get(self.model, input_text) if cache and not bypass else None
+            if entry is not None:
+                details["cache"] = CACHE_HIT
+                return self._response(entry["output"], True)
+            
+            started = time.perf_counter()
+            result = await self.client.acreate(input_text, self.model, call_timeout(config))
+            latency = time.perf_counter() - started
+            get_model_router().record(node, self.model, latency)
+            response_text = result["output"] if "output" in result else str(result)
+            self._trace_usage(details, response_text, result.get("usage"))
+            if cache:
+                cache.set(self.model, input_text, response_text, result.get("usage"), latency, node)
+            return self._response(response_text, False)
+    
+    def batch(self, inputs, config=None, return_exceptions=False, **kwargs):
+        """
+        Run inputs concurrently through the deployment's rate-limit-aware scheduler
+        
+        Throttled (429) and transient 5xx/transport failures are retried with
+        Retry-After-aware, jittered backoff, within each input's
+        config["configurable"]["deadline"]; results are returned in input order.
+        """
+        configs = config if isinstance(config, list) else [config] * len(inputs)
+        scheduler = get_scheduler(self.model)
+        return scheduler.run(
+            [partial(self.invoke, input_item, item_config) for input_item, item_config in zip(inputs, configs)],
+            [estimate_tokens(self._input_text(input_item)) + LLM_EXPECTED_OUTPUT_TOKENS for input_item in inputs],
+            return_exceptions=return_exceptions,
+            deadlines=[config_deadline(item_config) for item_config in configs]
+        )
+    
+    async def abatch(self, inputs, config=None, return_exceptions=False, **kwargs):
+        """Async version of batch() on the same scheduler and budgets"""
+        configs = config if isinstance(config, list) else [config] * len(inputs)
+        scheduler = get_scheduler(self.model)
+        return await scheduler.arun(
+            [partial(self.ainvoke, input_item, item_config) for input_item, item_config in zip(inputs, configs)],
+            [estimate_tokens(self._input_text(input_item)) + LLM_EXPECTED_OUTPUT_TOKENS for input_item in inputs],
+            return_exceptions=return_exceptions,
+            deadlines=[config_deadline(item_config) for item_config in configs]
+        )
     
     def stream(self, input, config=None, **kwargs):
-        """Support streaming (yields the single response)"""
-        yield self.invoke(input, config)
+        """
+        Stream the response as output text deltas
+        
+        Each yielded chunk's .content is the next piece of output text. Cache
+        hits yield the whole cached text as a single chunk; completed streams
+        are written back to the LLM cache like invoke results.
+        """
+        input_text = self._input_text(input)
+        node, bypass = self._cache_options(config)
+        
+        with span("llm", node or "", model=self.model, cache=CACHE_MISS, stream=True) as details:
+            cache = get_llm_cache()
+            entry = cache.get(self.model, input_text) if cache and not bypass else None
+            if entry is not None:
+                details["cache"] = CACHE_HIT
+                yield self._response(extract_output_text(self._response(entry["output"], True).content), True)
+                return
+            
+            deadline = config_deadline(config)
+            started = time.perf_counter()
+            completed = None
+            for event in self.client.stream(input_text, self.model, call_timeout(config)):
+                if deadline is not None:
+                    deadline.check()
+                if event.get("type") == "response.output_text.delta":
+                    yield self._response(event.get("delta", ""), False)
+                elif event.get("type") == "response.completed":
+                    completed = event.get("response") or {}
+            latency = time.perf_counter() - started
+            get_model_router().record(node, self.model, latency)
+            
+            if completed:
+                self._trace_usage(details, completed.get("output", []), completed.get("usage"))
+            if cache and completed and "output" in completed:
+                cache.set(self.model, input_text, completed["output"], completed.get("usage"), latency, node)
+    
+    async def astream(self, input, config=None, **kwargs):
+        """Async version of stream(), yielding output text deltas"""
+        input_text = self._input_text(input)
+        node, bypass = self._cache_options(config)
+        
+        with span("llm", node or "", model=self.model, cache=CACHE_MISS, stream=True) as details:
+            cache = get_llm_cache()
+            entry = cache.get(self.model, input_text) if cache and not bypass else None
+            if entry is not None:
+                details["cache"] = CACHE_HIT
+                yield self._response(extract_output_text(self._response(entry["output"], True).content), True)
+                return
+            
+            deadline = config_deadline(config)
+            started = time.perf_counter()
+            completed = None
+            async for event in self.client.astream(input_text, self.model, call_timeout(config)):
+                if deadline is not None:
+                    deadline.check()
+                if event.get("type") == "response.output_text.delta":
+                    yield self._response(event.get("delta", ""), False)
+                elif event.get("type") == "response.completed":
+                    completed = event.get("response") or {}
+            latency = time.perf_counter() - started
+            get_model_router().record(node, self.model, latency)
+            
+            if completed:
+                self._trace_usage(details, completed.get("output", []), completed.get("usage"))
+            if cache and completed and "output" in completed:
+                cache.set(self.model, input_text, completed["output"], completed.get("usage"), latency, node)
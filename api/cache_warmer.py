@@ -0,0 +1,144 @@
+"""
+Background cache warmer
+A standalone process that keeps the caches in front of run_research warm for
+the topics users keep asking about. Each pass reads the request history
+(api.topic_log), picks the most requested topics whose sources were last
+scraped, by a request or by the warmer, more than WARMER_REFRESH_AFTER
+seconds ago (by default shortly before their source cache entries expire)
+and re-scrapes them, a few at a time, renewing the source
+cache and the article index. With --full-graph the whole run is repeated so
+LLM outputs are renewed as well. Each pass reports the hit ratio requests saw.
+
+Only shared stores help other processes: the article index always is, the
+source and LLM caches only with their sqlite or redis backends.
+
+    python -m api.cache_warmer
+    python -m api.cache_warmer --once --topics 50 --full-graph
+"""
+
+import os
+import sys
+import time
+import signal
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.deadline import Deadline
+from api.source_cache import SOURCE_CACHE_BACKEND, SOURCE_CACHE_TTL
+from api.topic_log import get_topic_log
+
+# Seconds between passes
+WARMER_INTERVAL = float(os.getenv("WARMER_INTERVAL", "300"))
+# Topics refreshed per pass, hottest first, and how far back "hot" looks
+WARMER_TOPICS = int(os.getenv("WARMER_TOPICS", "20"))
+WARMER_WINDOW = float(os.getenv("WARMER_WINDOW", "86400"))
+# A topic is refreshed once this many seconds passed since its sources were last scraped
+WARMER_REFRESH_AFTER = float(os.getenv("WARMER_REFRESH_AFTER", str(SOURCE_CACHE_TTL * 0.8)))
+WARMER_CONCURRENCY = int(os.getenv("WARMER_CONCURRENCY", "2"))
+WARMER_FULL_GRAPH = os.getenv("WARMER_FULL_GRAPH", "false").lower() in ("1", "true", "yes")
+
+
+class CacheWarmer:
+    """Refreshes the hottest topics that are about to go cold"""
+
+    def __init__(self, topics: int = WARMER_TOPICS, window: float = WARMER_WINDOW,
+                 refresh_after: float = WARMER_REFRESH_AFTER, concurrency: int = WARMER_CONCURRENCY,
+                 full_graph: bool = WARMER_FULL_GRAPH):
+        self.topics = topics
+        self.window = window
+        self.refresh_after = refresh_after
+        self.concurrency = max(1, concurrency)
+        self.full_graph = full_graph
+        self.log = get_topic_log()
+        if self.log is None:
+            raise RuntimeError("The cache warmer needs the request history; set TOPIC_LOG_ENABLED=true")
+
+    def refresh(self, topic: str) -> Dict:
+        from api.research_agent import refresh_topic
+        state = refresh_topic(topic, full_graph=self.full_graph, deadline=Deadline())
+        failed = [name for name, articles in state.get("fetched_data", {}).items()
+                  if any("error" in article for article in articles if isinstance(article, dict))]
+        return {"sources": len(state.get("fetched_data", {})), "failed_sources": failed}
+
+    def run_once(self) -> Dict:
+        """One pass: refresh the due topics and report the hit ratios"""
+        started = time.perf_counter()
+        topics = self.log.due(self.topics, self.window, self.refresh_after)
+        warmed: List[str] = []
+        errors: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="cache-warmer") as executor:
+            futures = {executor.submit(self.refresh, topic): topic for topic in topics}
+            for future in as_completed(futures):
+                topic = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    errors[topic] = str(e)
+                    self.log.warmed(topic, ok=False)
+                    continue
+                if outcome["failed_sources"]:
+                    print(f"Warmed {topic} without {', '.join(outcome['failed_sources'])}")
+                warmed.append(topic)
+                self.log.warmed(topic)
+        return {
+            "topics": len(topics),
+            "warmed": len(warmed),
+            "errors": errors,
+            "seconds": round(time.perf_counter() - started, 2),
+            "hit_ratio": self.log.hit_ratio(self.window),
+            "warmed_hit_ratio": self.log.hit_ratio(self.window, warmed) if warmed else None,
+        }
+
+    def run_forever(self, interval: float = WARMER_INTERVAL, stop: Optional[threading.Event] = None):
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            report(self.run_once())
+            stop.wait(interval)
+
+
+def report(result: Dict):
+    ratio = result["hit_ratio"]
+    line = (f"Warmed {result['warmed']}/{result['topics']} topics in {result['seconds']}s; "
+            f"requests: {ratio['requests']}, sources warm: {ratio['warm']}/{ratio['sources']} "
+            f"({ratio['hit_ratio']:.0%})")
+    if result["warmed_hit_ratio"] is not None:
+        line += f", warmed topics: {result['warmed_hit_ratio']['hit_ratio']:.0%}"
+    print(line)
+    for topic, error in result["errors"].items():
+        print(f"  {topic}: {error}")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Keep the research caches warm for frequently requested topics")
+    parser.add_argument("--once", action="store_true", help="run a single pass and exit")
+    parser.add_argument("--interval", type=float, default=WARMER_INTERVAL)
+    parser.add_argument("--topics", type=int, default=WARMER_TOPICS)
+    parser.add_argument("--window", type=float, default=WARMER_WINDOW)
+    parser.add_argument("--refresh-after", type=float, default=WARMER_REFRESH_AFTER)
+    parser.add_argument("--concurrency", type=int, default=WARMER_CONCURRENCY)
+    parser.add_argument("--full-graph", action="store_true", default=WARMER_FULL_GRAPH,
+                        help="repeat the whole run, renewing the LLM cache too")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    if SOURCE_CACHE_BACKEND == "memory":
+        print("SOURCE_CACHE_BACKEND=memory is private to this process; only the article index is shared")
+    warmer = CacheWarmer(args.topics, args.window, args.refresh_after, args.concurrency, args.full_graph)
+    if args.once:
+        report(warmer.run_once())
+        return 0
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+    warmer.run_forever(args.interval, stop)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Durable per-node checkpoints for research runs
+When the client names a run (run_id), the run's AgentState is written to a
+local SQLite file keyed by run id and node after each graph node completes.
+A retried run with the same id gets the completed nodes' states back instead
+of re-running them, so a late failure (say, draft hitting a transient Azure
+error) only costs the nodes that had not finished. Runs without a run id are
+not checkpointed, and a run that completes drops its rows.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from api.source_cache import normalize_topic
+
+CHECKPOINT_ENABLED = os.getenv("CHECKPOINT_ENABLED", "true").lower() in ("1", "true", "yes")
+CHECKPOINT_PATH = os.getenv("CHECKPOINT_PATH", os.path.join(tempfile.gettempdir(), "research_checkpoints.sqlite3"))
+# Seconds a run stays resumable after its last checkpoint
+CHECKPOINT_TTL = float(os.getenv("CHECKPOINT_TTL", "86400"))
+
+RUN_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def valid_run_id(run_id: str) -> bool:
+    """Client-supplied run ids: 1-64 letters, digits, '-' or '_'"""
+    return bool(RUN_ID_RE.match(run_id or ""))
+
+
+class CheckpointStore:
+    """SQLite table of (run id, node) -> state, expiring CHECKPOINT_TTL after the last write"""
+
+    def __init__(self, path: str = CHECKPOINT_PATH, ttl: float = CHECKPOINT_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            "run_id TEXT NOT NULL, node TEXT NOT NULL, topic TEXT NOT NULL, state TEXT NOT NULL, "
+            "saved_at REAL NOT NULL, PRIMARY KEY (run_id, node))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS checkpoints_saved ON checkpoints (saved_at)")
+        self._conn.commit()
+
+    def save(self, run_id: str, node: str, topic: str, state: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_id, node, topic, state, saved_at) VALUES (?, ?, ?, ?, ?)",
+                (run_id, node, normalize_topic(topic), json.dumps(state), now)
+            )
+            self._conn.execute("DELETE FROM checkpoints WHERE saved_at < ?", (now - self.ttl,))
+            self._conn.commit()
+
+    def load(self, run_id: str, node: str, topic: str) -> Optional[Dict[str, Any]]:
+        """State saved after node in this run, or None. A run id reused for a
+        different topic does not resume."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT state FROM checkpoints WHERE run_id = ? AND node = ? AND topic = ? AND saved_at >= ?",
+                (run_id, node, normalize_topic(topic), time.time() - self.ttl)
+            ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def clear(self, run_id: Optional[str] = None):
+        with self._lock:
+            if run_id is None:
+                self._conn.execute("DELETE FROM checkpoints")
+            else:
+                self._conn.execute("DELETE FROM checkpoints WHERE run_id = ?", (run_id,))
+            self._conn.commit()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_checkpoint_store() -> Optional[CheckpointStore]:
+    """Get or initialize the process-wide checkpoint store (None when disabled)"""
+    global _store
+    if not CHECKPOINT_ENABLED:
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = CheckpointStore()
+    return _store
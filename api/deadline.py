@@ -0,0 +1,140 @@
+"""
+Per-request deadline budget
+A Deadline is created when a request arrives and travels with the run (in
+config["configurable"]["deadline"], and as the current deadline while sources
+are fetched) so every scrape and Responses API call is bounded by what is
+left of the budget. Also tracks per-source latency for hedged requests.
+"""
+
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from api.spec import parse_spec
+
+# Whole-run budget; Vercel kills functions at 60s by default
+RESEARCH_DEADLINE_SECONDS = float(os.getenv("RESEARCH_DEADLINE_SECONDS", "50"))
+# Cap for any one source scrape, overridable per source, e.g. "SSRN=6,SpringerOpen=6"
+SOURCE_TIMEOUT_SECONDS = float(os.getenv("SOURCE_TIMEOUT_SECONDS", "10"))
+SOURCE_TIMEOUTS = os.getenv("SOURCE_TIMEOUTS", "")
+# Cap for one Responses API call when no deadline is set
+AZURE_OPENAI_TIMEOUT = float(os.getenv("AZURE_OPENAI_TIMEOUT", "60"))
+
+# A duplicate request is sent once a source takes HEDGE_MULTIPLIER times its usual latency
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "true").lower() in ("1", "true", "yes")
+HEDGE_MULTIPLIER = float(os.getenv("HEDGE_MULTIPLIER", "3"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "1.0"))
+HEDGE_MIN_SAMPLES = 3
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call is attempted after the run's budget has run out"""
+
+
+class Deadline:
+    """Absolute point in time by which a run must finish"""
+
+    def __init__(self, seconds: float = RESEARCH_DEADLINE_SECONDS):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self):
+        """Raise DeadlineExceeded once the budget is spent"""
+        if self.expired:
+            raise DeadlineExceeded(f"Research deadline of {self.seconds:.0f}s exceeded")
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Seconds the next call may take: what is left, bounded by cap"""
+        self.check()
+        remaining = self.remaining()
+        return min(remaining, cap) if cap is not None else remaining
+
+
+def config_deadline(config: Optional[dict]) -> Optional[Deadline]:
+    """Read the run's deadline from a LangChain config"""
+    return ((config or {}).get("configurable") or {}).get("deadline")
+
+
+def call_timeout(config: Optional[dict], cap: float = AZURE_OPENAI_TIMEOUT) -> float:
+    """Timeout for one call under the run's deadline, or cap when there is none"""
+    deadline = config_deadline(config)
+    return deadline.timeout(cap) if deadline is not None else cap
+
+
+_current_deadline = contextvars.ContextVar("research_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(deadline: Optional[Deadline]):
+    """Make deadline the current deadline for scrapes started in this context"""
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def current_deadline() -> Optional[Deadline]:
+    return _current_deadline.get()
+
+
+_source_timeouts = parse_spec(SOURCE_TIMEOUTS, float)
+
+
+def source_budget(name: str, deadline: Optional[Deadline] = None) -> float:
+    """Seconds a source scrape may take: its cap, bounded by the deadline (0 when expired)"""
+    cap = _source_timeouts.get(name, SOURCE_TIMEOUT_SECONDS)
+    return min(cap, deadline.remaining()) if deadline is not None else cap
+
+
+class LatencyTracker:
+    """Moving average of each source's (or model's) latency, used to decide when to hedge"""
+
+    def __init__(self, alpha: float = 0.3):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._average: Dict[str, float] = {}
+        self._samples: Dict[str, int] = {}
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            previous = self._average.get(name)
+            self._average[name] = seconds if previous is None else previous + self.alpha * (seconds - previous)
+            self._samples[name] = self._samples.get(name, 0) + 1
+
+    def average(self, name: str, min_samples: int = 1) -> Optional[float]:
+        """Moving average for name, or None until it has min_samples samples"""
+        with self._lock:
+            if self._samples.get(name, 0) < max(1, min_samples):
+                return None
+            return self._average[name]
+
+    def hedge_delay(self, name: str) -> Optional[float]:
+        """Seconds after which a duplicate request is worth sending, or None"""
+        if not HEDGE_ENABLED:
+            return None
+        with self._lock:
+            if self._samples.get(name, 0) < HEDGE_MIN_SAMPLES:
+                return None
+            return max(HEDGE_MIN_DELAY, HEDGE_MULTIPLIER * self._average[name])
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(seconds, 3) for name, seconds in self._average.items()}
+
+
+_latency_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    return _latency_tracker
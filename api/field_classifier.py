@@ -0,0 +1,184 @@
+"""
+Local field classifier for research topics
+Maps a topic to one of the three routing buckets used by fetch_data with a
+confidence score, using keyword lexicons plus a small TF-IDF nearest-centroid
+linear model fitted on the bundled seed corpus at first use
+"""
+
+import os
+import re
+import math
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Below this confidence classify_field falls back to the LLM
+FIELD_CLASSIFIER_THRESHOLD = float(os.getenv("FIELD_CLASSIFIER_THRESHOLD", "0.6"))
+FIELD_CLASSIFIER_ENABLED = os.getenv("FIELD_CLASSIFIER_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Field name reported for each bucket; each routes to its tool in fetch_data
+BUCKET_FIELDS = {
+    "medicine": "medicine and health sciences",
+    "social": "social sciences",
+    "multi": "science and technology",
+}
+
+LEXICONS = {
+    "medicine": {
+        "cancer", "tumor", "tumour", "oncology", "disease", "clinical", "patient", "patients", "therapy",
+        "drug", "drugs", "vaccine", "vaccines", "virus", "viral", "covid", "sars", "infection", "immune",
+        "immunology", "gene", "genes", "genetic", "genomics", "genome", "protein", "proteins", "cell", "cells",
+        "neuron", "neurons", "brain", "alzheimer", "diabetes", "cardiac", "heart", "health", "medicine",
+        "medical", "biology", "biological", "microbiome", "bacteria", "antibiotic", "epidemiology",
+        "pharmacology", "crispr", "dna", "rna", "mrna", "stem", "surgery", "obesity", "mental", "depression",
+        "pandemic", "enzyme", "metabolism", "nutrition", "ecology", "species", "evolution", "biomedical",
+    },
+    "social": {
+        "law", "legal", "court", "courts", "constitution", "rights", "regulation", "policy", "policies",
+        "economics", "economic", "economy", "market", "markets", "finance", "financial", "business",
+        "management", "corporate", "governance", "tax", "taxation", "inflation", "labor", "labour",
+        "employment", "trade", "politics", "political", "election", "elections", "democracy", "sociology",
+        "social", "society", "history", "philosophy", "ethics", "culture", "education", "inequality",
+        "poverty", "migration", "immigration", "crime", "criminal", "justice", "humanities", "literature",
+        "accounting", "banking", "monetary", "antitrust", "contract", "contracts", "privacy", "gender",
+    },
+    "multi": {
+        "quantum", "physics", "particle", "relativity", "cosmology", "galaxy", "galaxies", "astrophysics",
+        "neural", "network", "networks", "learning", "machine", "deep", "algorithm", "algorithms",
+        "computer", "computing", "software", "transformer", "transformers", "language", "models", "robot",
+        "robotics", "graph", "optimization", "mathematics", "theorem", "topology", "algebra", "geometry",
+        "statistics", "statistical", "bayesian", "probability", "signal", "circuit", "circuits",
+        "semiconductor", "electrical", "engineering", "materials", "superconductivity", "laser", "optics",
+        "cryptography", "blockchain", "vision", "reinforcement", "llm", "llms", "ai", "compiler", "energy",
+    },
+}
+
+SEED_CORPUS = {
+    "medicine": [
+        "cancer immunotherapy clinical trials", "crispr gene editing therapy", "covid-19 vaccine efficacy",
+        "alzheimer disease biomarkers", "gut microbiome and obesity", "antibiotic resistance in bacteria",
+        "type 2 diabetes treatment", "mrna vaccine development", "stem cell regeneration",
+        "cardiovascular disease risk factors", "tumor microenvironment", "protein folding diseases",
+        "depression and mental health interventions", "epidemiology of infectious disease outbreaks",
+        "single cell rna sequencing", "neurodegeneration and neuron loss", "malaria drug resistance",
+        "genome wide association study", "long covid symptoms in patients", "breast cancer screening",
+        "evolution of viral variants", "nutrition and metabolism", "pharmacology of opioids",
+        "immune response to infection", "pediatric asthma management",
+    ],
+    "social": [
+        "minimum wage effects on employment", "constitutional law and judicial review", "monetary policy and inflation",
+        "corporate governance and shareholder rights", "immigration policy and labor markets",
+        "income inequality and poverty", "antitrust regulation of big tech", "history of the cold war",
+        "political polarization and elections", "contract law enforcement", "behavioral economics of savings",
+        "criminal justice reform", "philosophy of mind and ethics", "gender pay gap", "international trade tariffs",
+        "taxation and public finance", "privacy law and data protection", "education policy and student outcomes",
+        "banking regulation after the financial crisis", "sociology of urban neighborhoods",
+        "human rights and international law", "business strategy and management", "accounting standards",
+        "democracy and authoritarianism", "literature of the renaissance",
+    ],
+    "multi": [
+        "quantum computing error correction", "large language models reasoning", "deep reinforcement learning",
+        "graph neural networks", "dark matter and cosmology", "superconductivity at high temperature",
+        "computer vision object detection", "topological insulators", "bayesian inference methods",
+        "semiconductor device fabrication", "black hole thermodynamics", "transformer architectures",
+        "robot motion planning", "convex optimization algorithms", "algebraic geometry", "signal processing for 5g",
+        "post quantum cryptography", "gravitational waves detection", "renewable energy storage batteries",
+        "compiler optimization techniques", "statistical learning theory", "laser optics and photonics",
+        "materials science of graphene", "distributed systems consensus", "number theory and prime numbers",
+    ],
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word unigrams plus adjacent bigrams"""
+    words = _TOKEN_RE.findall(text.lower().replace("+", " "))
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class FieldClassifier:
+    """Keyword lexicon + TF-IDF nearest-centroid classifier over routing buckets"""
+
+    def __init__(self, corpus: Dict[str, List[str]] = SEED_CORPUS, lexicons: Dict[str, set] = LEXICONS,
+                 lexicon_weight: float = 0.5, temperature: float = 8.0):
+        self.buckets = list(corpus)
+        self.lexicons = lexicons
+        self.lexicon_weight = lexicon_weight
+        self.temperature = temperature
+
+        documents = [(bucket, tokenize(text)) for bucket, texts in corpus.items() for text in texts]
+        # Lexicon terms are part of the vocabulary so unseen-but-known words still count
+        for bucket, terms in lexicons.items():
+            documents.append((bucket, sorted(terms)))
+        vocabulary = sorted({token for _, tokens in documents for token in tokens})
+        self.index = {token: i for i, token in enumerate(vocabulary)}
+
+        document_frequency = Counter(token for _, tokens in documents for token in set(tokens))
+        self.idf = np.array(
+            [math.log((1 + len(documents)) / (1 + document_frequency[token])) + 1 for token in vocabulary]
+        )
+
+        matrix = np.vstack([self._vectorize(tokens) for _, tokens in documents])
+        labels = np.array([self.buckets.index(bucket) for bucket, _ in documents])
+        centroids = np.vstack([matrix[labels == i].mean(axis=0) for i in range(len(self.buckets))])
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        # One weight row per bucket: scores are a single matrix-vector product
+        self.weights = centroids / np.where(norms == 0, 1, norms)
+
+    def _vectorize(self, tokens: List[str]) -> np.ndarray:
+        vector = np.zeros(len(self.index))
+        for token, count in Counter(tokens).items():
+            position = self.index.get(token)
+            if position is not None:
+                vector[position] = 1 + math.log(count)
+        vector *= self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def scores(self, topic: str) -> np.ndarray:
+        tokens = tokenize(topic)
+        similarity = self.weights @ self._vectorize(tokens)
+        words = set(tokens)
+        lexicon_hits = np.array([len(words & self.lexicons.get(bucket, set())) for bucket in self.buckets])
+        if lexicon_hits.sum():
+            similarity = similarity + self.lexicon_weight * lexicon_hits / lexicon_hits.sum()
+        return similarity
+
+    def predict(self, topic: str) -> Tuple[str, float]:
+        """Return (field name, confidence in [0, 1]) for a topic"""
+        scores = self.scores(topic)
+        if not scores.any():
+            return BUCKET_FIELDS["multi"], 0.0
+        exp = np.exp(self.temperature * (scores - scores.max()))
+        probabilities = exp / exp.sum()
+        best = int(probabilities.argmax())
+        return BUCKET_FIELDS[self.buckets[best]], float(probabilities[best])
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_field_classifier() -> FieldClassifier:
+    """Get or initialize the process-wide classifier"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = FieldClassifier()
+    return _classifier
+
+
+def classify_topic(topic: str, threshold: float = FIELD_CLASSIFIER_THRESHOLD) -> Optional[str]:
+    """Return the local field for a topic, or None when the LLM should decide"""
+    if not FIELD_CLASSIFIER_ENABLED:
+        return None
+    field, confidence = get_field_classifier().predict(topic)
+    logger.debug(f"Local field classifier: {field} ({confidence:.2f})")
+    return field if confidence >= threshold else None
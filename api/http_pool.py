@@ -0,0 +1,194 @@
+"""
+Shared HTTP connection pool
+Keeps one requests.Session alive per process so scrapers and the Azure client
+reuse keep-alive connections instead of paying a TCP+TLS handshake per call
+"""
+
+import os
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from api.spec import parse_spec
+
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "16"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.3"))
+
+# Per-host pool sizes, e.g. "arxiv.org=4,www.springeropen.com=2"
+HTTP_POOL_HOST_SIZES = os.getenv("HTTP_POOL_HOST_SIZES", "")
+
+# Total connections held by the asyncio pool (aiohttp's TCPConnector limit)
+HTTP_ASYNC_POOL_LIMIT = int(os.getenv("HTTP_ASYNC_POOL_LIMIT", "100"))
+HTTP_KEEPALIVE_TIMEOUT = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+
+# Scrapes in flight per host across every run in the process (0 = unlimited),
+# overridable per host, e.g. "arxiv.org=2,papers.ssrn.com=1"
+SOURCE_HOST_CONCURRENCY = int(os.getenv("SOURCE_HOST_CONCURRENCY", "4"))
+SOURCE_HOST_LIMITS = os.getenv("SOURCE_HOST_LIMITS", "")
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+
+# aiohttp sessions are bound to the event loop that created them
+_async_sessions = weakref.WeakKeyDictionary()
+
+
+def build_retry(total: int = HTTP_MAX_RETRIES, status_forcelist=RETRY_STATUS_CODES, allowed_methods=("GET", "HEAD"),
+                respect_retry_after_header: bool = False, connect_only: bool = False) -> Retry:
+    """Build the retry policy used by pooled adapters
+
+    connect_only retries only failures to connect, which happen before the
+    request is sent, so a non-idempotent request is never replayed.
+    Retry-After is ignored by default: urllib3 would sleep for as long as the
+    server asks inside a fetch thread, holding the host and source slots well
+    past the source's budget. Retries wait only the short HTTP_RETRY_BACKOFF.
+    """
+    return Retry(
+        total=total,
+        read=0 if connect_only else None,
+        status=0 if connect_only else None,
+        other=0 if connect_only else None,
+        backoff_factor=HTTP_RETRY_BACKOFF,
+        status_forcelist=status_forcelist,
+        allowed_methods=frozenset(allowed_methods),
+        respect_retry_after_header=respect_retry_after_header,
+        raise_on_status=False,
+    )
+
+
+def build_adapter(pool_maxsize: int = HTTP_POOL_MAXSIZE, retry: Optional[Retry] = None) -> HTTPAdapter:
+    """Build a keep-alive adapter with its own connection pool"""
+    return HTTPAdapter(
+        pool_connections=HTTP_POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize,
+        max_retries=retry if retry is not None else build_retry(),
+    )
+
+
+def _build_session() -> requests.Session:
+    session = requests.Session()
+    session.mount("https://", build_adapter())
+    session.mount("http://", build_adapter())
+    for host, size in parse_spec(HTTP_POOL_HOST_SIZES, int).items():
+        session.mount(f"https://{host}/", build_adapter(pool_maxsize=size))
+    return session
+
+
+def get_session() -> requests.Session:
+    """Get or initialize the process-wide pooled session"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def mount_host(url: str, pool_maxsize: int = HTTP_POOL_MAXSIZE, retry: Optional[Retry] = None) -> requests.Session:
+    """Give the host of `url` a dedicated pool and retry policy on the shared session"""
+    parsed = urlparse(url)
+    session = get_session()
+    session.mount(f"{parsed.scheme}://{parsed.netloc}/", build_adapter(pool_maxsize=pool_maxsize, retry=retry))
+    return session
+
+
+class HostLimiter:
+    """Caps concurrent requests per host for threads and coroutines alike, so a
+    batch of runs cannot hammer one site however many topics are in flight"""
+
+    def __init__(self, default: int = SOURCE_HOST_CONCURRENCY, limits: Optional[Dict[str, int]] = None):
+        self.default = default
+        self.limits = limits if limits is not None else parse_spec(SOURCE_HOST_LIMITS, int)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        # asyncio semaphores belong to one event loop
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def limit(self, host: str) -> int:
+        return self.limits.get(host, self.default)
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the host's request slots for the duration of the block"""
+        host = urlparse(url).netloc
+        if self.limit(host) <= 0:
+            yield
+            return
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(self.limit(host))
+        with semaphore:
+            yield
+
+    @asynccontextmanager
+    async def aslot(self, url: str):
+        """Async version of slot() for the running event loop"""
+        host = urlparse(url).netloc
+        if self.limit(host) <= 0:
+            yield
+            return
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphores = self._async_semaphores.setdefault(loop, {})
+            semaphore = semaphores.get(host)
+            if semaphore is None:
+                semaphore = semaphores[host] = asyncio.Semaphore(self.limit(host))
+        async with semaphore:
+            yield
+
+
+_host_limiter = None
+
+
+def get_host_limiter() -> HostLimiter:
+    """Get or initialize the process-wide per-host request limiter"""
+    global _host_limiter
+    if _host_limiter is None:
+        with _session_lock:
+            if _host_limiter is None:
+                _host_limiter = HostLimiter()
+    return _host_limiter
+
+
+def get_async_session():
+    """Get or initialize the pooled aiohttp session for the running event loop
+
+    aiohttp is imported lazily so the synchronous path never pays for it.
+    """
+    import aiohttp
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_ASYNC_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_MAXSIZE,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+        )
+        session = aiohttp.ClientSession(connector=connector)
+        _async_sessions[loop] = session
+    return session
+
+
+def async_timeout(seconds: float):
+    """aiohttp timeout for a total budget in seconds"""
+    import aiohttp
+    return aiohttp.ClientTimeout(total=seconds)
+
+
+async def close_async_session():
+    """Close the running loop's aiohttp session, e.g. before the loop shuts down"""
+    session = _async_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -19,7 +19,11 @@ class handler(BaseHTTPRequestHandler):
             "message": "Research Agent API",
             "endpoints": {
                 "/api/health": "Health check",
-                "/api/research/{topic}": "Research endpoint"
+                "/api/metrics": "Prometheus metrics for nodes, sources and LLM calls",
+                "/api/warmup": "Import the agent and compile the graph in the serving process, with per-step timings",
+                "/api/research/{topic}": "Research endpoint (?timings=1 adds per-node, source and LLM timings; ?run_id=<id> checkpoints the run so a retry with the same id resumes)",
+                "/api/research/stream/{topic}": "Research endpoint streaming Server-Sent Events",
+                "/api/research/batch": "POST {\"topics\": [...]}; streams one NDJSON result per topic as it finishes"
             },
             "env_vars": {
                 "AZURE_OPENAI_ENDPOINT": "set" if os.getenv("AZURE_OPENAI_ENDPOINT") else "not set",
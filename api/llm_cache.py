@@ -0,0 +1,99 @@
+"""
+Content-addressed cache for Responses API outputs
+Entries are keyed by a hash of the model plus the exact input text, so an
+unchanged prompt for a graph node never pays for a second round trip
+"""
+
+import os
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from api.source_cache import build_backend
+from api.spec import parse_spec
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "research_llm_cache.sqlite3"))
+
+# Per-node TTLs in seconds, e.g. "classify=86400,draft=1800"
+LLM_CACHE_TTLS = os.getenv("LLM_CACHE_TTLS", "classify=86400")
+
+
+def cache_key(model: str, input_text: str) -> str:
+    """Hash the model and exact input text into a cache key"""
+    return hashlib.sha256(f"{model}\0{input_text}".encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Per-node TTL cache for model outputs that tracks what hits saved"""
+
+    def __init__(self, backend=None, default_ttl: float = LLM_CACHE_TTL, ttls: Optional[Dict[str, float]] = None):
+        self.backend = backend if backend is not None else build_backend(
+            LLM_CACHE_BACKEND, LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES, prefix="research-llm:"
+        )
+        self.default_ttl = default_ttl
+        self.ttls = ttls if ttls is not None else parse_spec(LLM_CACHE_TTLS, float)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_input_tokens = 0
+        self.saved_output_tokens = 0
+        self.saved_latency = 0.0
+
+    def ttl_for(self, node: Optional[str]) -> float:
+        return self.ttls.get(node, self.default_ttl) if node else self.default_ttl
+
+    def get(self, model: str, input_text: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry ({output, usage, latency}) and count its savings"""
+        entry = self.backend.get(cache_key(model, input_text))
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            usage = entry.get("usage") or {}
+            self.hits += 1
+            self.saved_input_tokens += usage.get("input_tokens", 0)
+            self.saved_output_tokens += usage.get("output_tokens", 0)
+            self.saved_latency += entry.get("latency", 0.0)
+        return entry
+
+    def set(self, model: str, input_text: str, output: Any, usage: Optional[Dict] = None,
+            latency: float = 0.0, node: Optional[str] = None):
+        ttl = self.ttl_for(node)
+        if ttl > 0:
+            self.backend.set(
+                cache_key(model, input_text),
+                {"output": output, "usage": usage or {}, "latency": latency},
+                ttl
+            )
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "saved_input_tokens": self.saved_input_tokens,
+            "saved_output_tokens": self.saved_output_tokens,
+            "saved_latency_seconds": round(self.saved_latency, 3),
+        }
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Get or initialize the process-wide LLM cache (None when disabled)"""
+    global _llm_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        with _llm_cache_lock:
+            if _llm_cache is None:
+                _llm_cache = LLMCache()
+    return _llm_cache
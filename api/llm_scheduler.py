@@ -0,0 +1,207 @@
+"""
+Rate-limit-aware scheduler for batched Responses API calls
+Runs calls with bounded concurrency inside request-per-minute and
+token-per-minute budgets, retrying throttled and transient failures with
+Retry-After-aware, jittered exponential backoff, never waiting past the
+run's deadline
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from api.deadline import Deadline, DeadlineExceeded
+
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "4"))
+# Per-deployment budgets; 0 disables the limit
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+# Output tokens reserved per call when charging the token budget up front
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "512"))
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting"""
+    return max(1, len(text) // 4)
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute; reservations may go into debt so
+    callers learn exactly how long to wait instead of polling"""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self.available = per_minute
+        self.updated = time.monotonic()
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Take `amount` units and return the seconds to wait before using them"""
+        if self.per_minute <= 0:
+            return 0.0
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.per_minute / 60.0)
+        self.updated = now
+        self.available -= min(amount, self.capacity)
+        if self.available >= 0:
+            return 0.0
+        return -self.available * 60.0 / self.per_minute
+
+
+class RateLimiter:
+    """Request-per-minute and token-per-minute budgets shared by every caller"""
+
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = LLM_TOKENS_PER_MINUTE):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens; returns the delay before sending"""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(self._requests.reserve(1, now), self._tokens.reserve(tokens, now))
+            return max(delay, self._paused_until - now)
+
+    def pause(self, seconds: float):
+        """Hold every caller back, e.g. after the server sent Retry-After"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None,
+                  base: float = LLM_BACKOFF_BASE, cap: float = LLM_BACKOFF_MAX) -> float:
+    """Honour Retry-After when given, otherwise exponential backoff with full jitter"""
+    if retry_after is not None:
+        return min(cap, retry_after) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def is_retryable(error: Exception) -> bool:
+    return getattr(error, "retryable", False)
+
+
+class BatchScheduler:
+    """Pushes many calls through one deployment at full quota without tripping throttling"""
+
+    def __init__(self, max_concurrency: int = LLM_BATCH_CONCURRENCY, limiter: Optional[RateLimiter] = None,
+                 max_retries: int = LLM_MAX_RETRIES):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.max_retries = max_retries
+        self.retries = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+
+    def _on_failure(self, error: Exception, attempt: int, deadline: Optional[Deadline]) -> float:
+        """Return how long to back off before retrying, or re-raise if the error
+        is final or the backoff would outlast the deadline"""
+        if attempt >= self.max_retries or not is_retryable(error):
+            raise error
+        retry_after = getattr(error, "retry_after", None)
+        if getattr(error, "status_code", None) == 429:
+            with self._lock:
+                self.throttled += 1
+            if retry_after is not None:
+                self.limiter.pause(retry_after)
+        delay = backoff_delay(attempt, retry_after)
+        if deadline is not None and delay >= deadline.remaining():
+            raise error
+        with self._lock:
+            self.retries += 1
+        return delay
+
+    @staticmethod
+    def _check_wait(delay: float, deadline: Optional[Deadline]):
+        """Raise DeadlineExceeded instead of waiting delay seconds for a rate-limit turn past the deadline"""
+        if deadline is None:
+            return
+        deadline.check()
+        if delay >= deadline.remaining():
+            raise DeadlineExceeded(f"Rate limit wait of {delay:.1f}s exceeds the run's remaining budget")
+
+    def call(self, fn: Callable[[], Any], tokens: int, deadline: Optional[Deadline] = None) -> Any:
+        """Run one call inside the budgets, retrying retryable failures while deadline allows"""
+        attempt = 0
+        while True:
+            delay = self.limiter.reserve(tokens)
+            self._check_wait(delay, deadline)
+            if delay > 0:
+                time.sleep(delay)
+            try:
+                return fn()
+            except Exception as e:
+                time.sleep(self._on_failure(e, attempt, deadline))
+                attempt += 1
+
+    async def acall(self, fn: Callable[[], Awaitable[Any]], tokens: int, deadline: Optional[Deadline] = None) -> Any:
+        """Async version of call()"""
+        attempt = 0
+        while True:
+            delay = self.limiter.reserve(tokens)
+            self._check_wait(delay, deadline)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            try:
+                return await fn()
+            except Exception as e:
+                await asyncio.sleep(self._on_failure(e, attempt, deadline))
+                attempt += 1
+
+    def run(self, calls: Sequence[Callable[[], Any]], tokens: Sequence[int],
+            return_exceptions: bool = False, deadlines: Optional[Sequence[Optional[Deadline]]] = None) -> List[Any]:
+        """Run calls with bounded concurrency and return their results in input order.
+        deadlines, one per call, bound each call's retries and rate-limit waits."""
+        if not calls:
+            return []
+        deadlines = deadlines if deadlines is not None else [None] * len(calls)
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(calls)),
+                                thread_name_prefix="llm-batch") as executor:
+            futures = [executor.submit(self.call, fn, n, d) for fn, n, d in zip(calls, tokens, deadlines)]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    async def arun(self, calls: Sequence[Callable[[], Awaitable[Any]]], tokens: Sequence[int],
+                   return_exceptions: bool = False,
+                   deadlines: Optional[Sequence[Optional[Deadline]]] = None) -> List[Any]:
+        """Async version of run()"""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        deadlines = deadlines if deadlines is not None else [None] * len(calls)
+
+        async def bounded(fn, n, deadline):
+            async with semaphore:
+                return await self.acall(fn, n, deadline)
+
+        return await asyncio.gather(*(bounded(fn, n, d) for fn, n, d in zip(calls, tokens, deadlines)),
+                                    return_exceptions=return_exceptions)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"retries": self.retries, "throttled": self.throttled}
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(model: str) -> BatchScheduler:
+    """Get or initialize the scheduler for a deployment; budgets are per deployment"""
+    with _schedulers_lock:
+        if model not in _schedulers:
+            _schedulers[model] = BatchScheduler()
+        return _schedulers[model]
@@ -0,0 +1,90 @@
+"""
+Per-node model routing
+Small structured tasks (classify's one-line field, select's three picks) can
+go to a smaller, low-latency deployment while summarise and draft keep the
+default model. Latency is tracked per node and model: a small deployment
+that has become slower than the default for its node is routed around. Every
+LLM_ROUTE_PROBE_EVERY-th call goes to whichever model is not currently
+chosen, so both keep being measured and the small model can win its traffic
+back. Callers fall back to the default model when the small model's output
+cannot be used.
+"""
+
+import os
+import threading
+from typing import Dict, Optional
+
+from api.deadline import LatencyTracker
+from api.spec import parse_spec
+
+LLM_DEFAULT_MODEL = os.getenv("LLM_DEFAULT_MODEL", "gpt-4.1")
+# Deployment per node, e.g. "classify=gpt-4.1-mini,select=gpt-4.1-mini"; unlisted nodes use the default
+LLM_NODE_MODELS = os.getenv("LLM_NODE_MODELS", "")
+# Calls per (node, model) before latencies are compared
+LLM_ROUTE_MIN_SAMPLES = int(os.getenv("LLM_ROUTE_MIN_SAMPLES", "5"))
+# Every Nth call of a node goes to the model not currently chosen, to keep measuring it
+LLM_ROUTE_PROBE_EVERY = int(os.getenv("LLM_ROUTE_PROBE_EVERY", "20"))
+
+
+class ModelRouter:
+    """Chooses the deployment for each node's LLM calls"""
+
+    def __init__(self, default: str = LLM_DEFAULT_MODEL, node_models: Optional[Dict[str, str]] = None,
+                 min_samples: int = LLM_ROUTE_MIN_SAMPLES, probe_every: int = LLM_ROUTE_PROBE_EVERY):
+        self.default = default
+        self.node_models = node_models if node_models is not None else parse_spec(LLM_NODE_MODELS, str)
+        self.min_samples = min_samples
+        self.probe_every = max(1, probe_every)
+        self.latency = LatencyTracker()
+        self._lock = threading.Lock()
+        self._calls: Dict[str, int] = {}
+        self.fallbacks: Dict[str, int] = {}
+
+    @staticmethod
+    def _key(node: str, model: str) -> str:
+        return f"{node}/{model}"
+
+    def model_for(self, node: Optional[str]) -> str:
+        """The node's configured model, unless it is measurably slower than the
+        default for this node; every probe_every-th call goes to the other one"""
+        preferred = self.node_models.get(node) if node else None
+        if not preferred or preferred == self.default:
+            return self.default
+        small = self.latency.average(self._key(node, preferred), self.min_samples)
+        large = self.latency.average(self._key(node, self.default), self.min_samples)
+        chosen, other = preferred, self.default
+        if small is not None and large is not None and small > large:
+            chosen, other = other, chosen
+        with self._lock:
+            count = self._calls[node] = self._calls.get(node, 0) + 1
+        return other if count % self.probe_every == 0 else chosen
+
+    def record(self, node: Optional[str], model: str, seconds: float):
+        """Latency of one uncached call"""
+        if node:
+            self.latency.record(self._key(node, model), seconds)
+
+    def record_fallback(self, node: str, model: str):
+        with self._lock:
+            key = self._key(node, model)
+            self.fallbacks[key] = self.fallbacks.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            fallbacks = dict(self.fallbacks)
+        return {"models": dict(self.node_models, default=self.default),
+                "latency": self.latency.stats(), "fallbacks": fallbacks}
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Get or initialize the process-wide model router"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
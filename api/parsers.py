@@ -0,0 +1,399 @@
+"""
+Search-result page parsers
+The lxml parsers parse each page once in C and pull every field with
+precompiled XPath expressions scoped to the result items, instead of building
+a BeautifulSoup tree and calling find() repeatedly per field. The original
+BeautifulSoup parsers are kept as the *_soup variants: they produce the same
+output, serve as the fallback when lxml is unavailable and are the baseline in
+benchmarks/parsers.py. HTML_PARSER=soup switches back to them.
+
+The incremental_* parsers extract the same fields from a page while it is
+still downloading, so the scraper can close the connection as soon as
+MAX_RESULTS results are in (SOURCE_STREAMING=false turns this off).
+"""
+
+import os
+from typing import Callable, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # pragma: no cover - lxml is in requirements.txt
+    etree = None
+
+HTML_PARSER = os.getenv("HTML_PARSER", "lxml").lower()
+SOURCE_STREAMING = os.getenv("SOURCE_STREAMING", "true").lower() in ("1", "true", "yes")
+
+MAX_RESULTS = 10
+
+SSRN_NO_RESULTS_LIST = "SSRN page has no search results list; its layout may have changed"
+
+
+class PageLayoutError(ValueError):
+    """A page lacks the element its results are listed in"""
+
+
+def _has_class(name: str) -> str:
+    """XPath predicate matching a class token the way BeautifulSoup's class_= does"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if etree is not None:
+    _xpath = etree.XPath
+    # HighWire (bioRxiv, medRxiv, PubMed)
+    HIGHWIRE_ITEMS = _xpath(f"//li[{_has_class('search-result')}]")
+    HIGHWIRE_TITLE = _xpath(f"(.//span[{_has_class('highwire-cite-title')}])[1]")
+    HIGHWIRE_META = _xpath(f"(.//div[{_has_class('highwire-cite-metadata')}])[1]")
+    FIRST_LINK = _xpath("(.//a)[1]")
+    # SSRN
+    SSRN_LIST = _xpath(f"(//ol[{_has_class('searchResults')}])[1]")
+    SSRN_ITEMS = _xpath(".//li")
+    SSRN_HEADING = _xpath("(.//h3)[1]")
+    SSRN_AUTHORS = _xpath(f"(.//div[{_has_class('authors')}])[1]")
+    SSRN_ABSTRACT = _xpath(f"(.//div[{_has_class('abstract')}])[1]")
+    SSRN_DATE = _xpath(f"(.//span[{_has_class('date')}])[1]")
+    # arXiv
+    ARXIV_ITEMS = _xpath(f"//li[{_has_class('arxiv-result')}]")
+    ARXIV_TITLE = _xpath(f"(.//p[{_has_class('title')}])[1]")
+    ARXIV_AUTHORS = _xpath(f"(.//p[{_has_class('authors')}])[1]")
+    ARXIV_ABSTRACT = _xpath(f"(.//p[{_has_class('abstract')}])[1]")
+    ARXIV_DATE = _xpath(f"(.//p[{_has_class('is-size-7')}])[1]")
+    ARXIV_LIST_TITLE = _xpath(f"(.//p[{_has_class('list-title')}])[1]")
+    # SpringerOpen
+    SPRINGER_ITEMS = _xpath(f"//div[{_has_class('c-search-result__body')}]")
+    SPRINGER_TITLE = _xpath(f"(.//h3[{_has_class('c-search-result__title')}])[1]")
+    SPRINGER_META = _xpath(f"(.//p[{_has_class('c-search-result__meta')}])[1]")
+    SPRINGER_ABSTRACT = _xpath(f"(.//p[{_has_class('c-search-result__abstract')}])[1]")
+
+
+def parse_tree(html: str):
+    """Parse a page into an lxml tree (pages declaring an XML encoding are parsed as bytes)"""
+    if not html or not html.strip():
+        return lxml_html.fromstring("<html></html>")
+    try:
+        return lxml_html.document_fromstring(html)
+    except ValueError:
+        return lxml_html.document_fromstring(html.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8"))
+
+
+def _first(xpath, node):
+    """First match of xpath under node, or None (also when node itself is missing)"""
+    if node is None:
+        return None
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def _text(node) -> Optional[str]:
+    """Stripped text of a node (like BeautifulSoup's .text.strip()), or None when missing"""
+    return node.text_content().strip() if node is not None else None
+
+
+def _truncated(text: Optional[str]) -> str:
+    return text[:500] + "..." if text else "N/A"
+
+
+def highwire_item(item, base_url: str) -> Dict:
+    link = _first(FIRST_LINK, item)
+    return {
+        "title": _text(_first(HIGHWIRE_TITLE, item)) or "",
+        "abstract": _text(_first(HIGHWIRE_META, item)) or "",
+        "url": base_url + link.get("href", "") if link is not None else "",
+    }
+
+
+def ssrn_items(result_list) -> List[Dict]:
+    articles = []
+    for item in SSRN_ITEMS(result_list)[:MAX_RESULTS]:
+        heading = _first(SSRN_HEADING, item)
+        link = _first(FIRST_LINK, heading)
+        href = link.get("href", "") if link is not None else ""
+        articles.append({
+            "title": _text(link) if link is not None else "N/A",
+            "authors": _text(_first(SSRN_AUTHORS, item)) or "N/A",
+            "abstract": _truncated(_text(_first(SSRN_ABSTRACT, item))),
+            "pub_date": _text(_first(SSRN_DATE, item)) or "N/A",
+            "url": "https://papers.ssrn.com" + href if href.startswith("/") else href,
+        })
+    return articles
+
+
+def arxiv_item(item) -> Dict:
+    authors = _first(ARXIV_AUTHORS, item)
+    date = _first(ARXIV_DATE, item)
+    link = _first(FIRST_LINK, _first(ARXIV_LIST_TITLE, item))
+    return {
+        "title": _text(_first(ARXIV_TITLE, item)) or "N/A",
+        "authors": authors.text_content().replace("Authors:", "").strip() if authors is not None else "N/A",
+        "abstract": _truncated(_text(_first(ARXIV_ABSTRACT, item))),
+        "pub_date": date.text_content().split(";")[0].strip() if date is not None else "N/A",
+        "url": link.get("href", "") if link is not None else "",
+    }
+
+
+def springeropen_item(item) -> Dict:
+    link = _first(FIRST_LINK, _first(SPRINGER_TITLE, item))
+    meta = _first(SPRINGER_META, item)
+    meta_text = meta.text_content() if meta is not None else None
+    return {
+        "title": _text(link) if link is not None else "N/A",
+        "authors": meta_text.split("|")[0].strip() if meta_text is not None else "N/A",
+        "abstract": _truncated(_text(_first(SPRINGER_ABSTRACT, item))),
+        "pub_date": meta_text.split("|")[-1].strip() if meta_text is not None else "N/A",
+        "url": "https://www.springeropen.com" + link.get("href", "") if link is not None else "",
+    }
+
+
+def finish_ssrn(articles: List[Dict]) -> List[Dict]:
+    return articles or [{"note": "No relevant papers found for this query."}]
+
+
+def finish_arxiv(results: List[Dict]) -> List[Dict]:
+    return results or [{"note": "No relevant papers found for this query on arXiv."}]
+
+
+def finish_springeropen(results: List[Dict]) -> List[Dict]:
+    return results or [{"note": "No relevant papers found for this query on SpringerOpen."}]
+
+
+def parse_highwire_lxml(html: str, base_url: str) -> List[Dict]:
+    """Parse a HighWire-style search page (bioRxiv, medRxiv, PubMed)"""
+    return [highwire_item(item, base_url) for item in HIGHWIRE_ITEMS(parse_tree(html))[:MAX_RESULTS]]
+
+
+def parse_ssrn_lxml(html: str) -> List[Dict]:
+    """Parse an SSRN search results page"""
+    result_list = _first(SSRN_LIST, parse_tree(html))
+    if result_list is None:
+        raise PageLayoutError(SSRN_NO_RESULTS_LIST)
+    return finish_ssrn(ssrn_items(result_list))
+
+
+def parse_arxiv_lxml(html: str) -> List[Dict]:
+    """Parse an arXiv search results page"""
+    return finish_arxiv([arxiv_item(item) for item in ARXIV_ITEMS(parse_tree(html))[:MAX_RESULTS]])
+
+
+def parse_springeropen_lxml(html: str) -> List[Dict]:
+    """Parse a SpringerOpen search results page"""
+    return finish_springeropen([springeropen_item(item) for item in SPRINGER_ITEMS(parse_tree(html))[:MAX_RESULTS]])
+
+
+class IncrementalParser:
+    """Parses a page as it downloads, collecting results as their elements close
+
+    Chunks go into lxml's pull parser; each closed <tag class="class_name">
+    element is handed to extract (which returns its results) and then cleared.
+    feed() returns True once `limit` results are in (or, with single, once the
+    first match closed), so the caller can stop downloading the rest of the page.
+    With `missing` set, close() raises PageLayoutError(missing) when no
+    matching element was found at all.
+    """
+
+    def __init__(self, tag: str, class_name: str, extract: Callable[[object], List[Dict]],
+                 finish: Callable[[List[Dict]], List[Dict]] = lambda results: results,
+                 single: bool = False, limit: int = MAX_RESULTS, encoding: Optional[str] = None,
+                 missing: Optional[str] = None):
+        self._parser = etree.HTMLPullParser(events=("end",), tag=tag, encoding=encoding)
+        # HtmlElement (text_content() etc.) like lxml.html's own parser produces
+        self._parser.set_element_class_lookup(lxml_html.HtmlElementClassLookup())
+        self.class_name = class_name
+        self.extract = extract
+        self.finish = finish
+        self.single = single
+        self.limit = limit
+        self.missing = missing
+        self.results: List[Dict] = []
+        self.found = False
+        self.done = False
+        self.bytes_read = 0
+        self._pending = b""
+
+    def _drain(self):
+        for _, element in self._parser.read_events():
+            if self.done or self.class_name not in (element.get("class") or "").split():
+                continue
+            self.found = True
+            self.results.extend(self.extract(element))
+            element.clear(keep_tail=True)
+            if self.single or len(self.results) >= self.limit:
+                self.done = True
+
+    def feed(self, data: bytes) -> bool:
+        """Feed the next chunk; True once enough results have been collected"""
+        if not self.done:
+            self.bytes_read += len(data)
+            # libxml2 (2.10) stalls for good when a chunk ends inside a quoted
+            # attribute value, so only ever hand it data up to a tag's closing '>'
+            data = self._pending + data
+            end = data.rfind(b">") + 1
+            self._pending = data[end:]
+            if end:
+                self._parser.feed(data[:end])
+                self._drain()
+        return self.done
+
+    def close(self) -> List[Dict]:
+        """Finish parsing (unless stopped early) and return the results"""
+        if not self.done:
+            try:
+                if self._pending:
+                    self._parser.feed(self._pending)
+                self._parser.close()
+            except etree.LxmlError:
+                pass
+            self._drain()
+        if self.missing is not None and not self.found:
+            raise PageLayoutError(self.missing)
+        return self.finish(self.results[:self.limit])
+
+
+def incremental_highwire(base_url: str, encoding: Optional[str] = None) -> IncrementalParser:
+    return IncrementalParser("li", "search-result", lambda item: [highwire_item(item, base_url)], encoding=encoding)
+
+
+def incremental_ssrn(encoding: Optional[str] = None) -> IncrementalParser:
+    return IncrementalParser("ol", "searchResults", ssrn_items, finish_ssrn, single=True, encoding=encoding,
+                             missing=SSRN_NO_RESULTS_LIST)
+
+
+def incremental_arxiv(encoding: Optional[str] = None) -> IncrementalParser:
+    return IncrementalParser("li", "arxiv-result", lambda item: [arxiv_item(item)], finish_arxiv, encoding=encoding)
+
+
+def incremental_springeropen(encoding: Optional[str] = None) -> IncrementalParser:
+    return IncrementalParser("div", "c-search-result__body", lambda item: [springeropen_item(item)],
+                             finish_springeropen, encoding=encoding)
+
+
+def parse_highwire_soup(html: str, base_url: str) -> List[Dict]:
+    """Parse a HighWire-style search page (bioRxiv, medRxiv, PubMed)"""
+    soup = BeautifulSoup(html, "html.parser")
+    articles = []
+    for item in soup.find_all("li", class_="search-result"):
+        title = item.find("span", class_="highwire-cite-title").text.strip() if item.find("span", class_="highwire-cite-title") else ""
+        abstract = item.find("div", class_="highwire-cite-metadata").text.strip() if item.find("div", class_="highwire-cite-metadata") else ""
+        url = base_url + item.find("a")["href"] if item.find("a") else ""
+        articles.append({"title": title, "abstract": abstract, "url": url})
+    return articles[:10]
+
+
+def parse_ssrn_soup(html: str) -> List[Dict]:
+    """Parse an SSRN search results page"""
+    soup = BeautifulSoup(html, "html.parser")
+    result_items = soup.find("ol", class_="searchResults")
+    if result_items is None:
+        raise PageLayoutError(SSRN_NO_RESULTS_LIST)
+    
+    articles = []
+    for item in result_items.find_all("li")[:10]:
+        title_elem = item.find("h3")
+        title = title_elem.find("a").text.strip() if title_elem and title_elem.find("a") else "N/A"
+        
+        authors_div = item.find("div", class_="authors")
+        authors = authors_div.text.strip() if authors_div else "N/A"
+        
+        abstract_div = item.find("div", class_="abstract")
+        abstract = abstract_div.text.strip()[:500] + "..." if abstract_div and abstract_div.text.strip() else "N/A"
+        
+        date_span = item.find("span", class_="date")
+        pub_date = date_span.text.strip() if date_span else "N/A"
+        
+        link = title_elem.find("a")["href"] if title_elem and title_elem.find("a") else ""
+        full_url = "https://papers.ssrn.com" + link if link.startswith("/") else link
+        
+        articles.append({
+            "title": title,
+            "authors": authors,
+            "abstract": abstract,
+            "pub_date": pub_date,
+            "url": full_url
+        })
+    
+    if not articles:
+        articles = [{"note": "No relevant papers found for this query."}]
+    return articles
+
+
+def parse_arxiv_soup(html: str) -> List[Dict]:
+    """Parse an arXiv search results page"""
+    soup = BeautifulSoup(html, "html.parser")
+    articles = soup.find_all("li", class_="arxiv-result")[:10]
+    results = []
+    for article in articles:
+        title_elem = article.find("p", class_="title")
+        title = title_elem.text.strip() if title_elem else "N/A"
+        
+        authors_elem = article.find("p", class_="authors")
+        authors = authors_elem.text.replace("Authors:", "").strip() if authors_elem else "N/A"
+        
+        abstract_elem = article.find("p", class_="abstract")
+        abstract = abstract_elem.text.strip()[:500] + "..." if abstract_elem and abstract_elem.text.strip() else "N/A"
+        
+        date_elem = article.find("p", class_="is-size-7")
+        pub_date = date_elem.text.split(";")[0].strip() if date_elem else "N/A"
+        
+        url_elem = article.find("p", class_="list-title").find("a")
+        url = url_elem["href"] if url_elem else ""
+        
+        results.append({
+            "title": title,
+            "authors": authors,
+            "abstract": abstract,
+            "pub_date": pub_date,
+            "url": url
+        })
+    
+    if not articles:
+        results.append({"note": "No relevant papers found for this query on arXiv."})
+    return results
+
+
+def parse_springeropen_soup(html: str) -> List[Dict]:
+    """Parse a SpringerOpen search results page"""
+    soup = BeautifulSoup(html, "html.parser")
+    articles = soup.find_all("div", class_="c-search-result__body")[:10]
+    results = []
+    for article in articles:
+        title_elem = article.find("h3", class_="c-search-result__title")
+        title = title_elem.find("a").text.strip() if title_elem and title_elem.find("a") else "N/A"
+        
+        authors_elem = article.find("p", class_="c-search-result__meta")
+        authors = authors_elem.text.split("|")[0].strip() if authors_elem else "N/A"
+        
+        abstract_elem = article.find("p", class_="c-search-result__abstract")
+        abstract = abstract_elem.text.strip()[:500] + "..." if abstract_elem and abstract_elem.text.strip() else "N/A"
+        
+        date_elem = article.find("p", class_="c-search-result__meta")
+        pub_date = date_elem.text.split("|")[-1].strip() if date_elem else "N/A"
+        
+        url_elem = article.find("h3", class_="c-search-result__title").find("a")
+        url = "https://www.springeropen.com" + url_elem["href"] if url_elem else ""
+        
+        results.append({
+            "title": title,
+            "authors": authors,
+            "abstract": abstract,
+            "pub_date": pub_date,
+            "url": url
+        })
+    
+    if not articles:
+        results.append({"note": "No relevant papers found for this query on SpringerOpen."})
+    return results
+
+
+if etree is not None and HTML_PARSER != "soup":
+    parse_highwire = parse_highwire_lxml
+    parse_ssrn = parse_ssrn_lxml
+    parse_arxiv = parse_arxiv_lxml
+    parse_springeropen = parse_springeropen_lxml
+else:
+    parse_highwire = parse_highwire_soup
+    parse_ssrn = parse_ssrn_soup
+    parse_arxiv = parse_arxiv_soup
+    parse_springeropen = parse_springeropen_soup
+
+# Incremental parsing needs lxml's pull parser
+STREAMING = etree is not None and HTML_PARSER != "soup" and SOURCE_STREAMING
@@ -0,0 +1,152 @@
+"""
+Token-budgeted prompt packing
+Articles go into prompts as compact numbered text blocks instead of Python
+list-of-dict reprs. Error/note placeholders and empty or "N/A" fields are
+dropped, and abstracts are trimmed so each node's article section fits its
+token budget, counted with tiktoken (or a ~4 characters per token estimate
+until the tokenizer has been loaded).
+
+tiktoken downloads its vocabulary the first time an encoding is loaded
+unless it is found in TIKTOKEN_CACHE_DIR, so it is loaded on a background
+thread, started by the first token count or by warm_up (which waits a bounded
+time for it); requests never block on it.
+"""
+
+import os
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from api.llm_scheduler import estimate_tokens
+from api.relevance import is_article
+from api.spec import parse_spec
+
+logger = logging.getLogger(__name__)
+
+# gpt-4.1 and gpt-4o deployments use o200k_base
+PROMPT_ENCODING = os.getenv("PROMPT_ENCODING", "o200k_base")
+# Seconds warm-up waits for the encoding; a slower load finishes in the background
+PROMPT_ENCODING_LOAD_TIMEOUT = float(os.getenv("PROMPT_ENCODING_LOAD_TIMEOUT", "5"))
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+# Per-node budgets for the packed section of the prompt, e.g. "select=1500,summarise=2500"
+PROMPT_TOKEN_BUDGETS = os.getenv("PROMPT_TOKEN_BUDGETS", "select=1500,summarise=2500,draft=2000")
+
+_budgets = parse_spec(PROMPT_TOKEN_BUDGETS, int)
+
+EMPTY_VALUES = ("", "n/a", "none", "null", "unknown")
+ELLIPSIS = "…"
+
+_encoding = None
+_encoding_loader: Optional[threading.Thread] = None
+_encoding_lock = threading.Lock()
+
+
+def _load_encoding():
+    global _encoding
+    try:
+        import tiktoken
+        _encoding = tiktoken.get_encoding(PROMPT_ENCODING)
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable ({type(e).__name__}), estimating prompt tokens from length")
+
+
+def load_encoding(timeout: float = PROMPT_ENCODING_LOAD_TIMEOUT):
+    """Start loading the tiktoken encoding once and wait up to timeout for it;
+    the encoding, or None while it is still loading or failed to load"""
+    global _encoding_loader
+    with _encoding_lock:
+        if _encoding_loader is None:
+            _encoding_loader = threading.Thread(target=_load_encoding, name="tiktoken-load", daemon=True)
+            _encoding_loader.start()
+    _encoding_loader.join(timeout)
+    return _encoding
+
+
+def get_encoding():
+    """The tiktoken encoding, or None until it has loaded; the first call
+    starts loading it in the background without waiting"""
+    if _encoding is None and _encoding_loader is None:
+        load_encoding(timeout=0)
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    encoding = get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """text cut to at most max_tokens tokens, marked with an ellipsis when cut"""
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding()
+    if encoding is None:
+        if estimate_tokens(text) <= max_tokens:
+            return text
+        return text[:max(0, (max_tokens - 1) * 4)].rstrip() + ELLIPSIS
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens - 1]).rstrip() + ELLIPSIS
+
+
+def budget_for(node: str) -> int:
+    return _budgets.get(node, PROMPT_TOKEN_BUDGET)
+
+
+def _clean(value) -> Optional[str]:
+    """Field value as compact text, or None for empty placeholders"""
+    if value is None:
+        return None
+    text = " ".join(str(value).split())
+    return None if text.lower() in EMPTY_VALUES else text
+
+
+def _heading(index: int, article: Dict) -> str:
+    lines = [f"[{index}] {_clean(article.get('title'))}"]
+    meta = " | ".join(filter(None, (_clean(article.get("authors")), _clean(article.get("pub_date")))))
+    if meta:
+        lines.append(meta)
+    for label, key in (("", "url"), ("Why: ", "reason")):
+        value = _clean(article.get(key))
+        if value:
+            lines.append(label + value)
+    return "\n".join(lines)
+
+
+def _allowances(lengths: List[int], budget: int) -> List[int]:
+    """Split budget across abstracts: short ones are kept whole and what they
+    leave over goes to the longer ones"""
+    allowances = [0] * len(lengths)
+    remaining = max(0, budget)
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    for position, i in enumerate(order):
+        share = remaining // (len(order) - position)
+        allowances[i] = min(lengths[i], share)
+        remaining -= allowances[i]
+    return allowances
+
+
+def pack_articles(articles: List[Dict], budget: int) -> str:
+    """Articles as numbered text blocks fitting in about `budget` tokens.
+    Articles are assumed to be in priority order: when even the headings do
+    not fit, trailing articles are left out."""
+    items = [article for article in articles if is_article(article)]
+    if not items:
+        return "(no articles found)"
+    headings = [_heading(i, article) for i, article in enumerate(items, 1)]
+    heading_tokens = [count_tokens(heading) + 2 for heading in headings]
+    while len(items) > 1 and sum(heading_tokens) > budget:
+        items, headings, heading_tokens = items[:-1], headings[:-1], heading_tokens[:-1]
+
+    abstracts = [_clean(article.get("abstract")) or "" for article in items]
+    # +1 for the newline joining each abstract to its heading
+    lengths = [count_tokens(abstract) + 1 if abstract else 0 for abstract in abstracts]
+    allowances = _allowances(lengths, budget - sum(heading_tokens))
+    blocks = []
+    for heading, abstract, allowance in zip(headings, abstracts, allowances):
+        abstract = truncate_tokens(abstract, allowance - 1) if abstract else ""
+        blocks.append(f"{heading}\n{abstract}" if abstract else heading)
+    return "\n\n".join(blocks)
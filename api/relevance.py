@@ -0,0 +1,90 @@
+"""
+Local relevance ranking for fetched articles
+Scores titles and abstracts against the topic with NumPy-vectorized BM25 so
+select_relevant can hand the LLM only the best candidates, or skip it when
+the ranking is already decisive
+"""
+
+import os
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# Candidates passed to the select LLM call
+SELECT_TOP_K = int(os.getenv("SELECT_TOP_K", "8"))
+# Skip the LLM when the k-th score beats the next one by this factor
+SELECT_SEPARATION_RATIO = float(os.getenv("SELECT_SEPARATION_RATIO", "1.5"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Title terms count this many times as often as abstract terms
+TITLE_WEIGHT = 2
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it", "of", "on",
+    "or", "the", "to", "with", "we", "this", "that", "these", "our", "its", "via", "using", "based",
+}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word unigrams without stopwords"""
+    return [token for token in _TOKEN_RE.findall(text.lower().replace("+", " ")) if token not in STOPWORDS]
+
+
+def is_article(item) -> bool:
+    """True for real search hits, False for error/note placeholders"""
+    return isinstance(item, dict) and "error" not in item and "note" not in item and bool(item.get("title"))
+
+
+def bm25_scores(query: str, documents: List[List[str]]) -> np.ndarray:
+    """BM25 score of every tokenized document against the query, as one vector"""
+    terms = sorted(set(tokenize(query)))
+    if not terms or not documents:
+        return np.zeros(len(documents))
+    position = {term: i for i, term in enumerate(terms)}
+
+    tf = np.zeros((len(documents), len(terms)))
+    for row, tokens in enumerate(documents):
+        for token, count in Counter(tokens).items():
+            column = position.get(token)
+            if column is not None:
+                tf[row, column] = count
+
+    lengths = np.array([len(tokens) for tokens in documents], dtype=float)
+    average_length = lengths.mean() or 1.0
+    document_frequency = (tf > 0).sum(axis=0)
+    idf = np.log(1 + (len(documents) - document_frequency + 0.5) / (document_frequency + 0.5))
+    normalizer = BM25_K1 * (1 - BM25_B + BM25_B * lengths / average_length)
+    return ((tf * (BM25_K1 + 1)) / (tf + normalizer[:, None]) * idf).sum(axis=1)
+
+
+def rank_articles(topic: str, articles: List[Dict]) -> List[Tuple[float, Dict]]:
+    """Return (score, article) pairs for real articles, best first"""
+    candidates = [article for article in articles if is_article(article)]
+    documents = [
+        tokenize(article.get("title", "")) * TITLE_WEIGHT + tokenize(article.get("abstract", ""))
+        for article in candidates
+    ]
+    scores = bm25_scores(topic, documents)
+    order = np.argsort(-scores, kind="stable")
+    return [(float(scores[i]), candidates[i]) for i in order]
+
+
+def is_decisive(ranked: List[Tuple[float, Dict]], k: int = 3, ratio: float = SELECT_SEPARATION_RATIO) -> bool:
+    """True when the top k are clearly separated from the rest"""
+    if len(ranked) <= k:
+        return True
+    kth, runner_up = ranked[k - 1][0], ranked[k][0]
+    return kth > 0 and kth >= ratio * runner_up
+
+
+def as_selection(ranked: List[Tuple[float, Dict]], k: int = 3) -> List[Dict]:
+    """Shape the top k ranked articles like the select LLM's JSON output"""
+    return [
+        {"title": article.get("title", ""), "url": article.get("url", ""),
+         "reason": f"Ranked locally by BM25 relevance ({score:.2f})"}
+        for score, article in ranked[:k]
+    ]
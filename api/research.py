@@ -2,7 +2,7 @@
 Serverless function for research agent on Vercel
 """
 from http.server import BaseHTTPRequestHandler
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urlparse, parse_qs, unquote
 import sys
 import os
 
@@ -14,40 +14,37 @@ import json
 import logging
 import traceback
 
-logging.basicConfig(level=logging.DEBUG)
+logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-run_research = None
-import_error = None
+from api.agent_loader import load_research_agent, warm_in_background
+from api.checkpoints import valid_run_id
+from api.deadline import Deadline, DeadlineExceeded
+from api.llm_cache import get_llm_cache
+from api.tracing import Trace
 
-try:
-    logger.info(f"Python path: {sys.path}")
-    logger.info(f"Current directory: {os.getcwd()}")
-    
-    from api.research_agent import run_research
-    logger.info("Successfully imported run_research from api.research_agent")
-        
-except Exception as e:
-    import_error = f"{str(e)}\n{traceback.format_exc()}"
-    logger.error(f"Failed to import run_research: {import_error}")
+warm_in_background()
 
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
+        # The budget starts when the request arrives, not when the graph starts
+        deadline = Deadline()
         try:
             parsed_path = urlparse(self.path)
             path_parts = parsed_path.path.split('/')
             
             topic = None
             if len(path_parts) >= 4 and path_parts[1] == 'api' and path_parts[2] == 'research':
-                topic = path_parts[3]
+                topic = unquote(path_parts[3])
             
             if not topic or len(topic.strip()) == 0:
                 self.send_error(400, "Topic cannot be empty")
                 return
             
+            agent, import_error = load_research_agent()
             if import_error:
                 logger.error(f"Cannot process request due to import error: {import_error}")
                 self.send_response(500)
@@ -60,56 +57,25 @@ class handler(BaseHTTPRequestHandler):
                 }).encode())
                 return
             
-            if not run_research:
+            if not agent:
                 self.send_error(500, "Research agent not initialized")
                 return
             
+            query = parse_qs(parsed_path.query)
+            bypass_cache = query.get("nocache", ["0"])[0].lower() in ("1", "true")
+            trace = Trace() if query.get("timings", ["0"])[0].lower() in ("1", "true") else None
+            # A client-named run is checkpointed; retrying it resumes after the last node that completed
+            run_id = query.get("run_id", [None])[0]
+            if run_id is not None and not valid_run_id(run_id):
+                self.send_error(400, "run_id must be 1-64 letters, digits, '-' or '_'")
+                return
+            
             logger.info(f"Starting research for topic: {topic}")
             
-            result = run_research(topic)
+            result = agent.run_research(topic, bypass_cache=bypass_cache, deadline=deadline, trace=trace, run_id=run_id)
             
             logger.info(f"Research completed for topic: {topic}")
             
-            article_raw = result.get("article", "")
-            try:
-                parsed_article = json.loads(article_raw)
-                if isinstance(parsed_article, list):
-                    for item in parsed_article:
-                        if isinstance(item, dict) and item.get("type") == "message":
-                            content = item.get("content", [])
-                            if content and len(content) > 0:
-                                for content_item in content:
-                                    if content_item.get("type") == "output_text":
-                                        article = content_item.get("text", article_raw)
-                                        break
-                                break
-                    else:
-                        article = article_raw
-                else:
-                    article = article_raw
-            except (json.JSONDecodeError, KeyError, IndexError, TypeError):
-                article = article_raw
-            
-            summary_raw = result.get("summary", "")
-            try:
-                parsed_summary = json.loads(summary_raw)
-                if isinstance(parsed_summary, list):
-                    for item in parsed_summary:
-                        if isinstance(item, dict) and item.get("type") == "message":
-                            content = item.get("content", [])
-                            if content and len(content) > 0:
-                                for content_item in content:
-                                    if content_item.get("type") == "output_text":
-                                        summary = content_item.get("text", summary_raw)
-                                        break
-                                break
-                    else:
-                        summary = summary_raw
-                else:
-                    summary = summary_raw
-            except (json.JSONDecodeError, KeyError, IndexError, TypeError):
-                summary = summary_raw
-            
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
             self.send_header('Access-Control-Allow-Origin', '*')
@@ -119,15 +85,25 @@ class handler(BaseHTTPRequestHandler):
             
             response_data = {
                 "topic": topic,
-                "field": result.get("field", ""),
-                "fetched_data": result.get("fetched_data", {}),
-                "selected_articles": result.get("selected_articles", []),
-                "article": article,
-                "summary": summary
+                **agent.result_payload(result),
+                "llm_cache": get_llm_cache().stats() if get_llm_cache() else None
             }
+            if trace is not None:
+                response_data["timings"] = trace.timings()
             
             self.wfile.write(json.dumps(response_data).encode())
             
+        except DeadlineExceeded as e:
+            logger.error(f"Research deadline exceeded: {str(e)}")
+            
+            self.send_response(504)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                "error": "Research deadline exceeded",
+                "detail": str(e)
+            }).encode())
         except Exception as e:
             error_detail = f"{str(e)}\n{traceback.format_exc()}"
             logger.error(f"Error during research: {error_detail}")
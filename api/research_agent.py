@@ -11,18 +11,45 @@ os.environ["LANGCHAIN_ENDPOINT"] = ""
 os.environ["LANGCHAIN_API_KEY"] = ""
 
 from langgraph.graph import StateGraph, END
-from typing import Dict, List, TypedDict
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from functools import partial
 from langchain_core.prompts import ChatPromptTemplate
 from langchain.tools import tool
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import quote
 from dotenv import load_dotenv
 import sys
+import ast
+import json
+import asyncio
+import inspect
+import logging
+import threading
+import time
+from contextvars import ContextVar, copy_context
+from contextlib import contextmanager
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from api.azure_responses_api import ResponsesAPIChatModel
+from api.article_index import INDEX_HIT, get_article_index
+from api.azure_responses_api import ResponsesAPIChatModel, extract_output_text
+from api.checkpoints import get_checkpoint_store
+from api.deadline import (
+    Deadline, DeadlineExceeded, config_deadline, current_deadline, deadline_scope, get_latency_tracker,
+    source_budget
+)
+from api.field_classifier import classify_topic, get_field_classifier
+from api.http_pool import async_timeout, get_async_session, get_host_limiter, get_session
+from api.model_router import get_model_router
+from api.parsers import STREAMING
+from api.prompt_packing import budget_for, load_encoding, pack_articles, truncate_tokens
+from api.relevance import SELECT_TOP_K, as_selection, is_decisive, rank_articles
+from api.singleflight import RESEARCH_COALESCE, SingleFlight, get_single_flight
+from api.source_cache import CACHE_HIT, CACHE_MISS, get_source_cache, normalize_topic
+from api.source_registry import SourceHTTPError, get_source_registry
+from api.topic_log import get_topic_log
+from api.tracing import Trace, record, span, trace_scope
+
+logger = logging.getLogger(__name__)
 
 env_path = os.path.join(os.path.dirname(__file__), '..', '.env.local')
 if os.path.exists(env_path):
@@ -35,252 +62,588 @@ class AgentState(TypedDict):
     selected_artices: list[Dict]
     summary: str
     article: str
+    cache_status: Dict[str, str]
+
+_llms: Dict[str, ResponsesAPIChatModel] = {}
+_llms_lock = threading.Lock()
+
+def get_model(model: str) -> ResponsesAPIChatModel:
+    """Get or initialize the chat model for one deployment"""
+    if model not in _llms:
+        with _llms_lock:
+            if model not in _llms:
+                _llms[model] = ResponsesAPIChatModel(model=model)
+    return _llms[model]
+
+def get_llm(node: Optional[str] = None) -> ResponsesAPIChatModel:
+    """Get the model a node's calls are routed to (the default model without a node)"""
+    return get_model(get_model_router().model_for(node))
+
+# ==================== Source Scrapers ====================
+
+FETCH_MAX_WORKERS = int(os.getenv("RESEARCH_FETCH_MAX_WORKERS", "8"))
+
+# Tool results carry the per-source cache status under this key; fetch_data
+# moves it out of fetched_data into state["cache_status"]
+CACHE_STATUS_KEY = "_cache"
+
+_fetch_executor = None
+
+def get_fetch_executor() -> ThreadPoolExecutor:
+    """Get or initialize the thread pool shared by all source scrapes"""
+    global _fetch_executor
+    if _fetch_executor is None:
+        # Room for every source of a full batch; per-host limits still apply on top
+        registry = get_source_registry()
+        largest_group = max(len(registry.names(group)) for group in registry.groups())
+        workers = max(FETCH_MAX_WORKERS, RESEARCH_BATCH_CONCURRENCY * largest_group)
+        _fetch_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="research-fetch")
+    return _fetch_executor
+
+def timed_out(name: str, seconds: float) -> List[Dict]:
+    """fetched_data entry for a source that did not answer within its budget"""
+    return [{"error": f"{name} timed out after {seconds:.1f}s", "timed_out": True}]
+
+# Set while the cache warmer refreshes a topic: lookups are skipped so every
+# source is scraped again and its cache entry and index rows renewed
+_refreshing = ContextVar("refresh_sources", default=False)
+
+@contextmanager
+def refresh_scope(refresh: bool):
+    token = _refreshing.set(refresh)
+    try:
+        yield
+    finally:
+        _refreshing.reset(token)
+
+def skipped(name: str) -> List[Dict]:
+    """fetched_data entry for a source whose circuit breaker is open"""
+    retry_in = get_source_registry()[name].breaker.retry_in()
+    return [{"error": f"{name} skipped: recent requests failed, retrying in {retry_in:.0f}s", "skipped": True}]
+
+def fan_out(topic: str, scrapers: Dict[str, Callable[[float], List[Dict]]]) -> Dict[str, List[Dict]]:
+    """Run every source scraper concurrently and merge the results as they finish.
+
+    Sources with a fresh entry in the source cache are served from it instead of
+    being scraped. A scraper that raises only marks its own source as an error;
+    the other sources are unaffected. Keys keep the order in which sources were
+    given, and the per-source cache status is returned under CACHE_STATUS_KEY.
+    Sources the local article index already covers (see api.article_index)
+    are served from it. Inside refresh_scope(True) both lookups are skipped.
+    A source whose circuit breaker is open (see api.source_registry) is
+    skipped without a request.
+
+    Each scraper is called with its timeout in seconds: the source's cap bounded
+    by the current deadline. A source still running when that budget runs out is
+    marked as timed out and the others are returned without it. A source taking
+    far longer than its usual latency gets a hedged duplicate request, and the
+    first attempt to answer wins.
+    """
+    cache = get_source_cache()
+    index = get_article_index()
+    registry = get_source_registry()
+    deadline = current_deadline()
+    tracker = get_latency_tracker()
+    executor = get_fetch_executor()
+    refresh = _refreshing.get()
+    results = {name: [] for name in scrapers}
+    cache_status = {}
+    started, expires, hedge_at = {}, {}, {}
+    pending = {}
+    for name, scrape in scrapers.items():
+        cached = cache.get(name, topic) if not refresh else None
+        if cached is not None:
+            results[name] = cached
+            cache_status[name] = CACHE_HIT
+            record("source", name, cache=CACHE_HIT)
+            continue
+        indexed = index.lookup(name, topic) if index is not None and not refresh else None
+        if indexed is not None:
+            results[name] = indexed
+            cache_status[name] = INDEX_HIT
+            record("source", name, cache=INDEX_HIT)
+            continue
+        cache_status[name] = CACHE_MISS
+        if registry[name].breaker.is_open():
+            results[name] = skipped(name)
+            record("source", name, cache=CACHE_MISS, status="circuit_open")
+            continue
+        budget = source_budget(name, deadline)
+        if budget <= 0:
+            results[name] = timed_out(name, 0.0)
+            record("source", name, cache=CACHE_MISS, status="timed_out")
+            continue
+        started[name] = time.monotonic()
+        expires[name] = started[name] + budget
+        delay = tracker.hedge_delay(name)
+        if delay is not None and delay < budget:
+            hedge_at[name] = started[name] + delay
+        # Scrapes run in the caller's context so they see its deadline and trace
+        pending[executor.submit(copy_context().run, scrape, budget)] = name
+
+    def settle(name: str):
+        del expires[name]
+        hedge_at.pop(name, None)
+        for future in [future for future, source in pending.items() if source == name]:
+            del pending[future]
+            future.cancel()
+
+    while pending:
+        waiting = set(pending.values())
+        wake = min([expires[name] for name in waiting] + [hedge_at[name] for name in waiting if name in hedge_at])
+        done, _ = wait(pending, timeout=max(0.0, wake - time.monotonic()), return_when=FIRST_COMPLETED)
+        for future in done:
+            name = pending.pop(future, None)
+            if name is None or name not in expires:
+                continue
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                if name in pending.values():
+                    # The other attempt may still answer
+                    continue
+                results[name] = [{"error": str(e)}]
+            else:
+                tracker.record(name, time.monotonic() - started[name])
+                cache.set(name, topic, results[name])
+                if index is not None:
+                    index.add(name, results[name])
+            settle(name)
+        now = time.monotonic()
+        for name in list(expires):
+            if now >= expires[name]:
+                tracker.record(name, now - started[name])
+                results[name] = timed_out(name, now - started[name])
+                record("source", name, now - started[name], cache=CACHE_MISS, status="timed_out")
+                settle(name)
+            elif name in hedge_at and now >= hedge_at[name]:
+                logger.info(f"Hedging slow source {name}")
+                del hedge_at[name]
+                pending[executor.submit(copy_context().run, scrapers[name], expires[name] - now)] = name
+    results[CACHE_STATUS_KEY] = cache_status
+    return results
+
+async def _ahedged(name: str, scrape: Callable[[float], Awaitable[List[Dict]]], budget: float,
+                   delay: Optional[float]) -> List[Dict]:
+    """Await scrape(budget), adding a duplicate attempt after delay seconds; the first
+    attempt to answer wins. Raises asyncio.TimeoutError once the budget is spent."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    running = {asyncio.ensure_future(scrape(budget))}
+    hedged = delay is None or delay >= budget
+    try:
+        while True:
+            wake = started + (budget if hedged else delay)
+            done, running = await asyncio.wait(running, timeout=max(0.0, wake - loop.time()),
+                                               return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            if done and not running:
+                raise next(iter(done)).exception()
+            now = loop.time()
+            if now >= started + budget:
+                raise asyncio.TimeoutError()
+            if not hedged and now >= started + delay:
+                logger.info(f"Hedging slow source {name}")
+                running.add(asyncio.ensure_future(scrape(started + budget - now)))
+                hedged = True
+    finally:
+        for task in running:
+            task.cancel()
 
-_llm = None
+async def afan_out(topic: str, scrapers: Dict[str, Callable[[float], Awaitable[List[Dict]]]]) -> Dict[str, List[Dict]]:
+    """Async version of fan_out: misses are awaited together on the event loop"""
+    cache = get_source_cache()
+    index = get_article_index()
+    registry = get_source_registry()
+    deadline = current_deadline()
+    tracker = get_latency_tracker()
+    results = {name: [] for name in scrapers}
+    cache_status = {}
 
-def get_llm():
-    """Get or initialize the LLM instance"""
-    global _llm
-    if _llm is None:
-        _llm = ResponsesAPIChatModel(model="gpt-4.1")
-    return _llm
+    # The cache and index may be on disk or across the network, so they are
+    # read and written off the event loop
+    refresh = _refreshing.get()
+
+    def lookup(name: str) -> Tuple[Optional[List[Dict]], Optional[List[Dict]]]:
+        if refresh:
+            return None, None
+        cached = cache.get(name, topic)
+        indexed = index.lookup(name, topic) if cached is None and index is not None else None
+        return cached, indexed
+
+    def store(name: str, articles: List[Dict]):
+        cache.set(name, topic, articles)
+        if index is not None:
+            index.add(name, articles)
+
+    async def run(name: str, scrape):
+        if registry[name].breaker.is_open():
+            results[name] = skipped(name)
+            record("source", name, cache=CACHE_MISS, status="circuit_open")
+            return
+        budget = source_budget(name, deadline)
+        if budget <= 0:
+            results[name] = timed_out(name, 0.0)
+            record("source", name, cache=CACHE_MISS, status="timed_out")
+            return
+        started = time.monotonic()
+        try:
+            results[name] = await _ahedged(name, scrape, budget, tracker.hedge_delay(name))
+            await asyncio.to_thread(store, name, results[name])
+        except asyncio.TimeoutError:
+            results[name] = timed_out(name, time.monotonic() - started)
+            record("source", name, time.monotonic() - started, cache=CACHE_MISS, status="timed_out")
+        except Exception as e:
+            results[name] = [{"error": str(e)}]
+            return
+        tracker.record(name, time.monotonic() - started)
+
+    found = await asyncio.gather(*(asyncio.to_thread(lookup, name) for name in scrapers))
+    pending = []
+    for (name, scrape), (cached, indexed) in zip(scrapers.items(), found):
+        if cached is not None:
+            results[name] = cached
+            cache_status[name] = CACHE_HIT
+            record("source", name, cache=CACHE_HIT)
+        elif indexed is not None:
+            results[name] = indexed
+            cache_status[name] = INDEX_HIT
+            record("source", name, cache=INDEX_HIT)
+        else:
+            pending.append(run(name, scrape))
+            cache_status[name] = CACHE_MISS
+    await asyncio.gather(*pending)
+    results[CACHE_STATUS_KEY] = cache_status
+    return results
+
+STREAM_CHUNK_SIZE = 16384
+
+def _charset(content_type: Optional[str]) -> Optional[str]:
+    """charset parameter of a Content-Type header; None lets the parser read <meta charset>"""
+    for param in (content_type or "").split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "charset" and value:
+            return value.strip('"\' ')
+    return None
+
+def scrape_source(name: str, query: str, timeout: Optional[float] = None) -> List[Dict]:
+    """Fetch and parse one source's search page.
+    With streaming on, the page is parsed as it arrives and the connection is
+    closed once the parser has enough results."""
+    source = get_source_registry()[name]
+    url = source.url(query)
+    stream = STREAMING and source.stream_parser is not None
+    timeout = timeout if timeout is not None else source_budget(name)
+    with span("source", name, cache=CACHE_MISS) as details, source.call(timeout), get_host_limiter().slot(url):
+        res = get_session().get(url, headers=source.headers, stream=stream, timeout=timeout)
+        with res:
+            details["status_code"] = res.status_code
+            if source.error_label is not None and res.status_code != 200:
+                raise SourceHTTPError(f"{source.error_label}HTTP {res.status_code}: Unable to fetch page")
+            if not stream:
+                details["bytes"] = len(res.content)
+                return source.parse(res.text)
+            parser = source.stream_parser(_charset(res.headers.get("Content-Type")))
+            for chunk in res.iter_content(STREAM_CHUNK_SIZE):
+                if parser.feed(chunk):
+                    details["stopped_early"] = True
+                    break
+            details["bytes"] = parser.bytes_read
+            return parser.close()
+
+async def ascrape_source(name: str, query: str, timeout: Optional[float] = None) -> List[Dict]:
+    """Fetch one source's search page without blocking the event loop.
+    Streamed pages are parsed chunk by chunk as they arrive (and the connection
+    dropped once there are enough results); otherwise the page is parsed off-loop."""
+    source = get_source_registry()[name]
+    url = source.url(query)
+    stream = STREAMING and source.stream_parser is not None
+    timeout = timeout if timeout is not None else source_budget(name)
+    session = get_async_session()
+    with span("source", name, cache=CACHE_MISS) as details:
+        async with source.acall(timeout), get_host_limiter().aslot(url), session.get(
+                url, headers=source.headers, timeout=async_timeout(timeout)) as res:
+            details["status_code"] = res.status
+            if source.error_label is not None and res.status != 200:
+                raise SourceHTTPError(f"{source.error_label}HTTP {res.status}: Unable to fetch page")
+            if stream:
+                parser = source.stream_parser(res.charset)
+                async for chunk in res.content.iter_chunked(STREAM_CHUNK_SIZE):
+                    if parser.feed(chunk):
+                        details["stopped_early"] = True
+                        # Drop the connection instead of draining the rest of the page
+                        res.close()
+                        break
+                details["bytes"] = parser.bytes_read
+                return parser.close()
+            body = await res.read()
+            details["bytes"] = len(body)
+            html = body.decode(res.get_encoding(), errors="replace")
+        return await asyncio.to_thread(source.parse, html)
 
 # ==================== Tools ====================
 
+def research_group(group: str, topic: str) -> Dict[str, List[Dict]]:
+    """Scrape every registered source of a group for the topic"""
+    registry = get_source_registry()
+    return fan_out(topic, {
+        name: partial(scrape_source, name, registry[name].query(topic)) for name in registry.names(group)
+    })
+
+async def aresearch_group(group: str, topic: str) -> Dict[str, List[Dict]]:
+    """Async version of research_group"""
+    registry = get_source_registry()
+    return await afan_out(topic, {
+        name: partial(ascrape_source, name, registry[name].query(topic)) for name in registry.names(group)
+    })
+
 @tool
 def medicine_bio_lifescience_research(topic: str) -> Dict[str, List[Dict]]:
     """Research the given topic on medical or life science"""
-    results = {}
-    topicSearch = topic.replace(" ", "+")
-    
-    # bioRxiv scrape
-    try:
-        url = f"https://www.biorxiv.org/search/{topicSearch}"
-        res = requests.get(url)
-        soup = BeautifulSoup(res.text, "html.parser")
-        articles = []
-        for item in soup.find_all("li", class_="search-result"):
-            title = item.find("span", class_="highwire-cite-title").text.strip() if item.find("span", class_="highwire-cite-title") else ""
-            abstract = item.find("div", class_="highwire-cite-metadata").text.strip() if item.find("div", class_="highwire-cite-metadata") else ""
-            url = "https://www.biorxiv.org" + item.find("a")["href"] if item.find("a") else ""
-            articles.append({"title": title, "abstract": abstract, "url": url})
-        results["bioRxiv"] = articles[:10]
-    except Exception as e:
-        results["bioRxiv"] = [{"error": str(e)}]
-    
-    # medRxiv scrape
-    try:
-        url = f"https://www.medrxiv.org/search/{topicSearch}"
-        res = requests.get(url)
-        soup = BeautifulSoup(res.text, "html.parser")
-        articles = []
-        for item in soup.find_all("li", class_="search-result"):
-            title = item.find("span", class_="highwire-cite-title").text.strip() if item.find("span", class_="highwire-cite-title") else ""
-            abstract = item.find("div", class_="highwire-cite-metadata").text.strip() if item.find("div", class_="highwire-cite-metadata") else ""
-            url = "https://www.medrxiv.org" + item.find("a")["href"] if item.find("a") else ""
-            articles.append({"title": title, "abstract": abstract, "url": url})
-        results["medRxiv"] = articles[:10]
-    except Exception as e:
-        results["medRxiv"] = [{"error": str(e)}]
-    
-    # PubMed scrape
-    try:
-        url = f"https://pubmed.ncbi.nlm.nih.gov/?term={topicSearch}"
-        res = requests.get(url)
-        soup = BeautifulSoup(res.text, "html.parser")
-        articles = []
-        for item in soup.find_all("li", class_="search-result"):
-            title = item.find("span", class_="highwire-cite-title").text.strip() if item.find("span", class_="highwire-cite-title") else ""
-            abstract = item.find("div", class_="highwire-cite-metadata").text.strip() if item.find("div", class_="highwire-cite-metadata") else ""
-            url = "https://www.pubmed.org" + item.find("a")["href"] if item.find("a") else ""
-            articles.append({"title": title, "abstract": abstract, "url": url})
-        results["PubMed"] = articles[:10]
-    except Exception as e:
-        results["PubMed"] = [{"error": str(e)}]
-    
-    return results
+    return research_group("medicine", topic)
 
 @tool
 def socialScience_law_humanities_research(topic: str) -> Dict[str, List[Dict]]:
     """Research the given topic on social science, law and humanities"""
-    results = {"SSRN": []}
-    
-    query = quote(topic.replace(" ", "+"))
-    url = f"https://papers.ssrn.com/searchresults.cfm?term={query}"
-    
-    try:
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-        if resp.status_code != 200:
-            raise ValueError(f"HTTP {resp.status_code}: Unable to fetch page")
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        result_items = soup.find("ol", class_="searchResults")
-        if not result_items:
-            raise ValueError("No search results found or page structure changed")
-        
-        for item in result_items.find_all("li")[:10]:
-            title_elem = item.find("h3")
-            title = title_elem.find("a").text.strip() if title_elem and title_elem.find("a") else "N/A"
-            
-            authors_div = item.find("div", class_="authors")
-            authors = authors_div.text.strip() if authors_div else "N/A"
-            
-            abstract_div = item.find("div", class_="abstract")
-            abstract = abstract_div.text.strip()[:500] + "..." if abstract_div and abstract_div.text.strip() else "N/A"
-            
-            date_span = item.find("span", class_="date")
-            pub_date = date_span.text.strip() if date_span else "N/A"
-            
-            link = title_elem.find("a")["href"] if title_elem and title_elem.find("a") else ""
-            full_url = "https://papers.ssrn.com" + link if link.startswith("/") else link
-            
-            results["SSRN"].append({
-                "title": title,
-                "authors": authors,
-                "abstract": abstract,
-                "pub_date": pub_date,
-                "url": full_url
-            })
-        
-        if not results["SSRN"]:
-            results["SSRN"] = [{"note": "No relevant papers found for this query."}]
-    
-    except Exception as e:
-        results["SSRN"] = [{"error": str(e)}]
-    
-    return results
+    return research_group("social", topic)
 
 @tool
 def multi_disciplinary_research(topic: str) -> Dict[str, List[Dict]]:
     """Research the given topic across multiple disciplines"""
-    results = {"arXiv": [], "SpringerOpen": []}
-    query = topic.replace(" ", "+")
-    
-    # arXiv search
-    try:
-        url = f"https://arxiv.org/search/?query={query}&source=header&searchtype=all"
-        res = requests.get(url)
-        if res.status_code != 200:
-            raise ValueError(f"arXiv HTTP {res.status_code}: Unable to fetch page")
-        
-        soup = BeautifulSoup(res.text, "html.parser")
-        articles = soup.find_all("li", class_="arxiv-result")[:10]
-        for article in articles:
-            title_elem = article.find("p", class_="title")
-            title = title_elem.text.strip() if title_elem else "N/A"
-            
-            authors_elem = article.find("p", class_="authors")
-            authors = authors_elem.text.replace("Authors:", "").strip() if authors_elem else "N/A"
-            
-            abstract_elem = article.find("p", class_="abstract")
-            abstract = abstract_elem.text.strip()[:500] + "..." if abstract_elem and abstract_elem.text.strip() else "N/A"
-            
-            date_elem = article.find("p", class_="is-size-7")
-            pub_date = date_elem.text.split(";")[0].strip() if date_elem else "N/A"
-            
-            url_elem = article.find("p", class_="list-title").find("a")
-            url = url_elem["href"] if url_elem else ""
-            
-            results["arXiv"].append({
-                "title": title,
-                "authors": authors,
-                "abstract": abstract,
-                "pub_date": pub_date,
-                "url": url
-            })
-        
-        if not articles:
-            results["arXiv"].append({"note": "No relevant papers found for this query on arXiv."})
-    
-    except Exception as e:
-        results["arXiv"] = [{"error": str(e)}]
-    
-    # SpringerOpen search
-    springer_url = f"https://www.springeropen.com/search?query={query}&searchType=publisherSearch"
-    try:
-        resp = requests.get(springer_url, headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
-        if resp.status_code != 200:
-            raise ValueError(f"SpringerOpen HTTP {resp.status_code}: Unable to fetch page")
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        articles = soup.find_all("div", class_="c-search-result__body")[:10]
-        for article in articles:
-            title_elem = article.find("h3", class_="c-search-result__title")
-            title = title_elem.find("a").text.strip() if title_elem and title_elem.find("a") else "N/A"
-            
-            authors_elem = article.find("p", class_="c-search-result__meta")
-            authors = authors_elem.text.split("|")[0].strip() if authors_elem else "N/A"
-            
-            abstract_elem = article.find("p", class_="c-search-result__abstract")
-            abstract = abstract_elem.text.strip()[:500] + "..." if abstract_elem and abstract_elem.text.strip() else "N/A"
-            
-            date_elem = article.find("p", class_="c-search-result__meta")
-            pub_date = date_elem.text.split("|")[-1].strip() if date_elem else "N/A"
-            
-            url_elem = article.find("h3", class_="c-search-result__title").find("a")
-            url = "https://www.springeropen.com" + url_elem["href"] if url_elem else ""
-            
-            results["SpringerOpen"].append({
-                "title": title,
-                "authors": authors,
-                "abstract": abstract,
-                "pub_date": pub_date,
-                "url": url
-            })
-        
-        if not articles:
-            results["SpringerOpen"].append({"note": "No relevant papers found for this query on SpringerOpen."})
-    
-    except Exception as e:
-        results["SpringerOpen"] = [{"error": str(e)}]
-    
-    return results
+    return research_group("multi", topic)
+
+# Let tool.ainvoke scrape on the event loop instead of in a worker thread
+medicine_bio_lifescience_research.coroutine = partial(aresearch_group, "medicine")
+socialScience_law_humanities_research.coroutine = partial(aresearch_group, "social")
+multi_disciplinary_research.coroutine = partial(aresearch_group, "multi")
+
+# Source group -> research tool scraping it
+RESEARCH_TOOLS = {
+    "medicine": medicine_bio_lifescience_research,
+    "social": socialScience_law_humanities_research,
+    "multi": multi_disciplinary_research,
+}
 
 # ==================== Node Functions ====================
 
+def _node_config(node: str) -> dict:
+    """Tag LLM calls with their node so the LLM cache applies per-node TTLs"""
+    return {"metadata": {"llm_node": node}}
+
+def _token_sink(config: Optional[dict]) -> Optional[Callable[[str, str], None]]:
+    return ((config or {}).get("configurable") or {}).get("token_sink")
+
+def _generate(chain, inputs: dict, node: str, config: Optional[dict] = None) -> str:
+    """Run an LLM chain, forwarding text deltas to the run's token sink when one is configured"""
+    token_sink = _token_sink(config)
+    if token_sink is None:
+        return chain.invoke(inputs, config=_node_config(node)).content
+    text = []
+    for chunk in chain.stream(inputs, config=_node_config(node)):
+        token_sink(node, chunk.content)
+        text.append(chunk.content)
+    return "".join(text)
+
+async def _agenerate(chain, inputs: dict, node: str, config: Optional[dict] = None) -> str:
+    """Async version of _generate"""
+    token_sink = _token_sink(config)
+    if token_sink is None:
+        return (await chain.ainvoke(inputs, config=_node_config(node))).content
+    text = []
+    async for chunk in chain.astream(inputs, config=_node_config(node)):
+        token_sink(node, chunk.content)
+        text.append(chunk.content)
+    return "".join(text)
+
 classify_prompt = ChatPromptTemplate.from_template("""Classify the topic '{topic}' into fields like Physics, Mathematics, 
 Computer Science, Quantitative Biology, Quantitative Finance, Statistics, Electrical Engineering, and Economics, Biology and Life Sciences, 
 Medicine and Health Sciences, Social Sciences, Humanities, Law, Economics, and Business, Biomedical and Life Sciences, Science, Technology, Medicine.
 output only the field name""")
 
 def classify_field(state: AgentState) -> AgentState:
-    classify_chain = classify_prompt | get_llm()
-    field = classify_chain.invoke({"topic": state["topic"]}).content.strip().lower()
-    state["field"] = field
+    if state.get("field"):
+        # Already classified, e.g. by classify_topics for a batch
+        return state
+    # Confident local classifications skip the LLM round trip entirely
+    local_field = classify_topic(state["topic"])
+    if local_field:
+        state["field"] = local_field
+        return state
+    state["field"] = _routed_invoke(classify_prompt, {"topic": state["topic"]}, "classify", _parse_field) or ""
     return state
 
-def fetch_data(state: AgentState) -> AgentState:
-    print(f"Fetching data for field: {state['field']}")
-    field = state.get("field", "").lower()
-    if any(x in field for x in ["medicine", "health sciences", "biology", "life sciences", "biomedical"]):
-        state["fetched_data"] = medicine_bio_lifescience_research.invoke({"topic": state["topic"]})
-    elif any(x in field for x in ["social sciences", "humanities", "law", "economics", "business"]):
-        state["fetched_data"] = socialScience_law_humanities_research.invoke({"topic": state["topic"]})
-    else:
-        state["fetched_data"] = multi_disciplinary_research.invoke({"topic": state["topic"]})
+async def aclassify_field(state: AgentState) -> AgentState:
+    if state.get("field"):
+        return state
+    local_field = classify_topic(state["topic"])
+    if local_field:
+        state["field"] = local_field
+        return state
+    state["field"] = await _arouted_invoke(classify_prompt, {"topic": state["topic"]}, "classify", _parse_field) or ""
+    return state
+
+def _research_tool(field: str):
+    """Route a classified field to the research tool covering its source group"""
+    return RESEARCH_TOOLS[get_source_registry().route(field)]
+
+def _refreshes(config: Optional[dict]) -> bool:
+    return bool(((config or {}).get("configurable") or {}).get("refresh_sources"))
+
+def _log_request(state: AgentState):
+    """Add the topic and its warm/cold sources to the request history read by the cache warmer"""
+    log = get_topic_log()
+    if log is not None:
+        log.record(state["topic"], state["cache_status"])
+
+def fetch_data(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    logger.info(f"Fetching data for field: {state['field']}")
+    research_tool = _research_tool(state.get("field", ""))
+    with deadline_scope(config_deadline(config)), refresh_scope(_refreshes(config)):
+        state["fetched_data"] = research_tool.invoke({"topic": state["topic"]})
+    state["cache_status"] = state["fetched_data"].pop(CACHE_STATUS_KEY, {})
+    if not _refreshes(config):
+        _log_request(state)
+    return state
+
+async def afetch_data(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    logger.info(f"Fetching data for field: {state['field']}")
+    research_tool = _research_tool(state.get("field", ""))
+    with deadline_scope(config_deadline(config)), refresh_scope(_refreshes(config)):
+        state["fetched_data"] = await research_tool.ainvoke({"topic": state["topic"]})
+    state["cache_status"] = state["fetched_data"].pop(CACHE_STATUS_KEY, {})
+    if not _refreshes(config):
+        await asyncio.to_thread(_log_request, state)
     return state
 
 select_prompt = ChatPromptTemplate.from_template(
-    "From these articles: {articles}\nSelect the top 3 most relevant to '{topic}'. Output as JSON list: [{{title, url, reason}}]"
+    "From these articles:\n\n{articles}\n\nSelect the top 3 most relevant to '{topic}'. Output as JSON list: [{{title, url, reason}}]"
 )
 
-def select_relevant(state: AgentState) -> AgentState:
-    select_chain = select_prompt | get_llm()
+def _collect_articles(fetched_data: Dict[str, List[Dict]]) -> List[Dict]:
     all_articles = []
-    for source, article in state["fetched_data"].items():
+    for source, article in fetched_data.items():
         if isinstance(article, list):
             all_articles.extend(article)
-    if all_articles:
-        selected = select_chain.invoke({"articles": all_articles, "topic": state["topic"]}).content
+    return all_articles
+
+def _selected_articles(state: AgentState) -> List[Dict]:
+    """The selection joined back to the fetched records (the select output
+    only carries title, url and reason), so summarise sees the abstracts"""
+    fetched = [article for article in _collect_articles(state["fetched_data"]) if isinstance(article, dict)]
+    by_url = {article["url"]: article for article in fetched if article.get("url")}
+    by_title = {str(article["title"]).strip().lower(): article for article in fetched if article.get("title")}
+    articles = []
+    for chosen in state["selected_artices"] or []:
+        if not isinstance(chosen, dict):
+            continue
+        record = by_url.get(chosen.get("url")) or by_title.get(str(chosen.get("title", "")).strip().lower()) or {}
+        articles.append({**record, **{key: value for key, value in chosen.items() if value}})
+    return articles
+
+def _summary_inputs(state: AgentState) -> dict:
+    return {"articles": pack_articles(_selected_articles(state), budget_for("summarise")), "topic": state["topic"]}
+
+def _draft_inputs(state: AgentState) -> dict:
+    summary = extract_output_text(state["summary"])
+    return {"summary": truncate_tokens(summary, budget_for("draft")), "topic": state["topic"]}
+
+def _parse_selection(selected: str) -> Optional[List[Dict]]:
+    """The article list in a select output, or None when it is not one"""
+    text = extract_output_text(selected).strip()
+    if text.startswith("```"):
+        text = text.strip("`").partition("\n")[2]
+    try:
+        parsed = json.loads(text)
+    except ValueError:
         try:
-            state["selected_artices"] = eval(selected)
-        except:
-            state["selected_artices"] = all_articles[:3]
-    else:
-        state["selected_artices"] = []
+            parsed = ast.literal_eval(text)
+        except (ValueError, SyntaxError):
+            return None
+    if not isinstance(parsed, list) or not parsed or not all(isinstance(item, dict) for item in parsed):
+        return None
+    return parsed
+
+def _parse_field(output: str) -> Optional[str]:
+    """The field name in a classify output, lowercased, or None when it is not a single short field name"""
+    text = extract_output_text(output).strip()
+    if not text or "\n" in text or len(text) > 80:
+        return None
+    return text.lower()
+
+def _routed_invoke(prompt, inputs: dict, node: str, parse: Callable[[str], Any]) -> Any:
+    """Invoke prompt on the node's routed model and parse the output; if that
+    model is not the default and its call fails or its output does not parse,
+    the call is repeated on the default model. Returns the parsed output or None."""
+    router = get_model_router()
+    model = router.model_for(node)
+    parsed = None
+    try:
+        parsed = parse((prompt | get_model(model)).invoke(inputs, config=_node_config(node)).content)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        if model == router.default:
+            raise
+        logger.warning(f"{node}: {model} failed ({e})")
+    if parsed is None and model != router.default:
+        router.record_fallback(node, model)
+        logger.warning(f"{node}: falling back from {model} to {router.default}")
+        parsed = parse((prompt | get_model(router.default)).invoke(inputs, config=_node_config(node)).content)
+    return parsed
+
+async def _arouted_invoke(prompt, inputs: dict, node: str, parse: Callable[[str], Any]) -> Any:
+    """Async version of _routed_invoke"""
+    router = get_model_router()
+    model = router.model_for(node)
+    parsed = None
+    try:
+        parsed = parse((await (prompt | get_model(model)).ainvoke(inputs, config=_node_config(node))).content)
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        if model == router.default:
+            raise
+        logger.warning(f"{node}: {model} failed ({e})")
+    if parsed is None and model != router.default:
+        router.record_fallback(node, model)
+        logger.warning(f"{node}: falling back from {model} to {router.default}")
+        parsed = parse((await (prompt | get_model(router.default)).ainvoke(inputs, config=_node_config(node))).content)
+    return parsed
+
+def _prerank(state: AgentState) -> Tuple[List[Tuple[float, Dict]], Optional[List[Dict]]]:
+    """BM25-rank the fetched articles; returns the ranking and, when it is
+    decisive on its own, the final selection so the LLM call can be skipped"""
+    ranked = rank_articles(state["topic"], _collect_articles(state["fetched_data"]))
+    if not ranked:
+        return ranked, []
+    if is_decisive(ranked):
+        logger.debug(f"Selected {min(3, len(ranked))} articles locally from {len(ranked)} candidates")
+        return ranked, as_selection(ranked)
+    return ranked, None
+
+def select_relevant(state: AgentState) -> AgentState:
+    ranked, selection = _prerank(state)
+    if selection is None:
+        candidates = [article for _, article in ranked[:SELECT_TOP_K]]
+        inputs = {"articles": pack_articles(candidates, budget_for("select")), "topic": state["topic"]}
+        selection = _routed_invoke(select_prompt, inputs, "select", _parse_selection) or as_selection(ranked)
+    state["selected_artices"] = selection
     return state
 
-summary_prompt = ChatPromptTemplate.from_template("""Based on the articles: {articles}
+async def aselect_relevant(state: AgentState) -> AgentState:
+    ranked, selection = _prerank(state)
+    if selection is None:
+        candidates = [article for _, article in ranked[:SELECT_TOP_K]]
+        inputs = {"articles": pack_articles(candidates, budget_for("select")), "topic": state["topic"]}
+        selection = await _arouted_invoke(select_prompt, inputs, "select", _parse_selection) or as_selection(ranked)
+    state["selected_artices"] = selection
+    return state
+
+summary_prompt = ChatPromptTemplate.from_template("""Based on the articles:
+
+{articles}
 
 Summarize the key findings on the topic '{topic}' in a clear and concise manner.
 
@@ -289,14 +652,17 @@ Format using Markdown:
 - Use bullet points for listing findings
 - Keep it well-structured and informative""")
 
-def summarise(state: AgentState) -> AgentState:
-    summary_chain = summary_prompt | get_llm()
-    state["summary"] = summary_chain.invoke({"articles": state["selected_artices"], "topic": state["topic"]}).content
+def summarise(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    summary_chain = summary_prompt | get_llm("summarise")
+    state["summary"] = _generate(summary_chain, _summary_inputs(state), "summarise", config)
     return state
 
-article_draft_prompt = ChatPromptTemplate.from_template("""Draft a comprehensive article on the topic '{topic}' using the summary: {summary}
+async def asummarise(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    summary_chain = summary_prompt | get_llm("summarise")
+    state["summary"] = await _agenerate(summary_chain, _summary_inputs(state), "summarise", config)
+    return state
 
-Format the article with proper Markdown syntax:
+ARTICLE_FORMAT = """Format the article with proper Markdown syntax:
 - Use # for main title
 - Use ## for major sections
 - Use ### for subsections
@@ -305,48 +671,538 @@ Format the article with proper Markdown syntax:
 - Use numbered lists where appropriate
 - Include relevant hashtags at the end
 
-Make it well-structured, informative, and easy to read.""")
+Make it well-structured, informative, and easy to read."""
+
+article_draft_prompt = ChatPromptTemplate.from_template("""Draft a comprehensive article on the topic '{topic}' using the summary: {summary}
+
+""" + ARTICLE_FORMAT)
 
-def draft(state: AgentState) -> AgentState:
-    article_draft_chain = article_draft_prompt | get_llm()
-    state["article"] = article_draft_chain.invoke({"summary": state["summary"], "topic": state["topic"]}).content
+def draft(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    article_draft_chain = article_draft_prompt | get_llm("draft")
+    state["article"] = _generate(article_draft_chain, _draft_inputs(state), "draft", config)
     return state
 
+async def adraft(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    article_draft_chain = article_draft_prompt | get_llm("draft")
+    state["article"] = await _agenerate(article_draft_chain, _draft_inputs(state), "draft", config)
+    return state
+
+# ==================== Write Modes ====================
+
+# How summarise and draft run: "sequential" (draft waits for the summary),
+# "pipelined" (both calls at once, the draft working from the articles) or
+# "fused" (one call returning both in delimited sections)
+WRITE_MODE = os.getenv("WRITE_MODE", "sequential").lower()
+WRITE_MODES = ("sequential", "pipelined", "fused")
+
+# Same articles-first prefix as summary_prompt, so both calls share a cacheable prompt prefix
+article_from_articles_prompt = ChatPromptTemplate.from_template("""Based on the articles:
+
+{articles}
+
+Draft a comprehensive article on the topic '{topic}'.
+
+""" + ARTICLE_FORMAT)
+
+SUMMARY_MARKER = "=== SUMMARY ==="
+ARTICLE_MARKER = "=== ARTICLE ==="
+
+fused_write_prompt = ChatPromptTemplate.from_template(f"""Based on the articles:
+
+{{articles}}
+
+Write two sections on the topic '{{topic}}', each starting with its marker alone on a line.
+
+{SUMMARY_MARKER}
+Summarize the key findings in a clear and concise manner, using **bold** for key terms and bullet points for findings.
+
+{ARTICLE_MARKER}
+A comprehensive article building on that summary.
+""" + ARTICLE_FORMAT)
+
+class SectionSplitter:
+    """Split fused output into summary and article text as it streams in,
+    forwarding each section's deltas to sink(node, text) under the node that
+    would have produced it. Text that might be the start of a marker is held
+    back until the next chunk shows whether it is one."""
+
+    MARKERS = {SUMMARY_MARKER: "summarise", ARTICLE_MARKER: "draft"}
+
+    def __init__(self, sink: Optional[Callable[[str, str], None]] = None):
+        self.sink = sink
+        self.section: Optional[str] = None
+        self.parts: Dict[str, List[str]] = {"summarise": [], "draft": []}
+        self._buffer = ""
+        self._section_start = False
+
+    def feed(self, text: str):
+        self._buffer += text
+        while True:
+            found = [(self._buffer.find(marker), marker) for marker in self.MARKERS if marker in self._buffer]
+            if not found:
+                break
+            index, marker = min(found)
+            self._emit(self._buffer[:index])
+            self.section = self.MARKERS[marker]
+            self._section_start = True
+            self._buffer = self._buffer[index + len(marker):]
+        held = max((k for marker in self.MARKERS for k in range(1, len(marker))
+                    if self._buffer.endswith(marker[:k])), default=0)
+        self._emit(self._buffer[:len(self._buffer) - held])
+        self._buffer = self._buffer[len(self._buffer) - held:]
+
+    def _emit(self, text: str):
+        if self._section_start:
+            text = text.lstrip()
+            self._section_start = not text
+        # Anything before the first marker is preamble and dropped
+        if text and self.section is not None:
+            self.parts[self.section].append(text)
+            if self.sink is not None:
+                self.sink(self.section, text)
+
+    def close(self) -> Tuple[str, str]:
+        """(summary, article) once the output is complete"""
+        self._emit(self._buffer)
+        self._buffer = ""
+        return "".join(self.parts["summarise"]).strip(), "".join(self.parts["draft"]).strip()
+
+_write_executor = None
+
+def get_write_executor() -> ThreadPoolExecutor:
+    """Get or initialize the thread pool running pipelined drafts"""
+    global _write_executor
+    if _write_executor is None:
+        _write_executor = ThreadPoolExecutor(max_workers=max(FETCH_MAX_WORKERS, RESEARCH_BATCH_CONCURRENCY),
+                                             thread_name_prefix="research-write")
+    return _write_executor
+
+def write_pipelined(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    """Summarise and draft at once: the draft is written from the same packed
+    articles instead of waiting for the summary"""
+    inputs = _summary_inputs(state)
+    # The draft runs in this run's context so it sees its deadline, trace and LLM config
+    article = get_write_executor().submit(
+        copy_context().run, _generate, article_from_articles_prompt | get_llm("draft"), inputs, "draft", config
+    )
+    state["summary"] = _generate(summary_prompt | get_llm("summarise"), inputs, "summarise", config)
+    state["article"] = article.result()
+    return state
+
+async def awrite_pipelined(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    """Async version of write_pipelined"""
+    inputs = _summary_inputs(state)
+    state["summary"], state["article"] = await asyncio.gather(
+        _agenerate(summary_prompt | get_llm("summarise"), inputs, "summarise", config),
+        _agenerate(article_from_articles_prompt | get_llm("draft"), inputs, "draft", config),
+    )
+    return state
+
+def _fused_config(config: Optional[dict], splitter: SectionSplitter) -> Optional[dict]:
+    """Config streaming the fused call through the splitter when the run streams tokens"""
+    if _token_sink(config) is None:
+        return None
+    return {"configurable": {"token_sink": lambda node, text: splitter.feed(text)}}
+
+def _fused_result(state: AgentState, splitter: SectionSplitter) -> bool:
+    """Store the fused sections in state; False when the output lacks them"""
+    summary, article = splitter.close()
+    if not summary or not article:
+        logger.warning("Fused output is missing its sections, writing summary and article separately")
+        return False
+    state["summary"], state["article"] = summary, article
+    return True
+
+def write_fused(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    """Summary and article from one LLM call; falls back to summarise then
+    draft when the output does not come back in its two sections"""
+    splitter = SectionSplitter(_token_sink(config))
+    streaming = _fused_config(config, splitter)
+    text = _generate(fused_write_prompt | get_llm("draft"), _summary_inputs(state), "write", streaming)
+    if streaming is None:
+        splitter.feed(extract_output_text(text))
+    if not _fused_result(state, splitter):
+        state = draft(summarise(state, config), config)
+    return state
+
+async def awrite_fused(state: AgentState, config: Optional[dict] = None) -> AgentState:
+    """Async version of write_fused"""
+    splitter = SectionSplitter(_token_sink(config))
+    streaming = _fused_config(config, splitter)
+    text = await _agenerate(fused_write_prompt | get_llm("draft"), _summary_inputs(state), "write", streaming)
+    if streaming is None:
+        splitter.feed(extract_output_text(text))
+    if not _fused_result(state, splitter):
+        state = await adraft(await asummarise(state, config), config)
+    return state
+
+# mode -> (sync, async) node replacing summarise and draft
+WRITE_NODES = {
+    "pipelined": (write_pipelined, awrite_pipelined),
+    "fused": (write_fused, awrite_fused),
+}
+
 # ==================== Graph Construction ====================
 
-def build_research_graph():
-    """Build and return the research workflow graph"""
+def _traced_node(name: str, fn):
+    """Wrap a node function in a tracing span, keeping the config parameter LangGraph looks for"""
+    takes_config = "config" in inspect.signature(fn).parameters
+    if asyncio.iscoroutinefunction(fn):
+        async def traced(state: AgentState, config: Optional[dict] = None) -> AgentState:
+            with span("node", name):
+                return await (fn(state, config) if takes_config else fn(state))
+    else:
+        def traced(state: AgentState, config: Optional[dict] = None) -> AgentState:
+            with span("node", name):
+                return fn(state, config) if takes_config else fn(state)
+    traced.__name__ = fn.__name__
+    return traced
+
+def _checkpointed_node(name: str, fn):
+    """Wrap a node so a run with a run id checkpoints its state after the node
+    completes, and a retry of that run gets the saved state back instead of
+    running the node again"""
+    takes_config = "config" in inspect.signature(fn).parameters
+
+    def checkpoint_for(config: Optional[dict]):
+        run_id = ((config or {}).get("configurable") or {}).get("run_id")
+        store = get_checkpoint_store() if run_id else None
+        return run_id, store
+
+    if asyncio.iscoroutinefunction(fn):
+        async def checkpointed(state: AgentState, config: Optional[dict] = None) -> AgentState:
+            run_id, store = checkpoint_for(config)
+            if store is not None:
+                saved = await asyncio.to_thread(store.load, run_id, name, state["topic"])
+                if saved is not None:
+                    logger.info(f"Resumed {name} from checkpoint of run {run_id}")
+                    return saved
+            state = await (fn(state, config) if takes_config else fn(state))
+            if store is not None:
+                await asyncio.to_thread(store.save, run_id, name, state["topic"], state)
+            return state
+    else:
+        def checkpointed(state: AgentState, config: Optional[dict] = None) -> AgentState:
+            run_id, store = checkpoint_for(config)
+            if store is not None:
+                saved = store.load(run_id, name, state["topic"])
+                if saved is not None:
+                    logger.info(f"Resumed {name} from checkpoint of run {run_id}")
+                    return saved
+            state = fn(state, config) if takes_config else fn(state)
+            if store is not None:
+                store.save(run_id, name, state["topic"], state)
+            return state
+    checkpointed.__name__ = fn.__name__
+    return checkpointed
+
+def _completed(run_id: Optional[str]):
+    """Drop a finished run's checkpoints; they only exist to resume failed runs"""
+    store = get_checkpoint_store() if run_id else None
+    if store is not None:
+        store.clear(run_id)
+
+def _node(name: str, fn):
+    return _traced_node(name, _checkpointed_node(name, fn))
+
+def build_research_graph(use_async: bool = False):
+    """Build and return the research workflow graph
+
+    With use_async the nodes are coroutines and the graph is meant to be run
+    through ainvoke/astream, so a run never blocks a thread on network I/O.
+    Every node is traced, and checkpointed when the run has a run id
+    (config["configurable"]["run_id"]). Outside the sequential WRITE_MODE a
+    single "write" node takes the place of summarise and draft.
+    """
+    if WRITE_MODE not in WRITE_MODES:
+        raise ValueError(f"WRITE_MODE must be one of {', '.join(WRITE_MODES)}, not {WRITE_MODE!r}")
     workflow = StateGraph(AgentState)
     
     # Add nodes
-    workflow.add_node("classify", classify_field)
-    workflow.add_node("fetch", fetch_data)
-    workflow.add_node("select", select_relevant)
-    workflow.add_node("summarise", summarise)
-    workflow.add_node("draft", draft)
+    workflow.add_node("classify", _node("classify", aclassify_field if use_async else classify_field))
+    workflow.add_node("fetch", _node("fetch", afetch_data if use_async else fetch_data))
+    workflow.add_node("select", _node("select", aselect_relevant if use_async else select_relevant))
+    if WRITE_MODE == "sequential":
+        workflow.add_node("summarise", _node("summarise", asummarise if use_async else summarise))
+        workflow.add_node("draft", _node("draft", adraft if use_async else draft))
+    else:
+        write, awrite = WRITE_NODES[WRITE_MODE]
+        workflow.add_node("write", _node("write", awrite if use_async else write))
     
     # Set entry point and add edges
     workflow.set_entry_point("classify")
     workflow.add_edge("classify", "fetch")
     workflow.add_edge("fetch", "select")
-    workflow.add_edge("select", "summarise")
-    workflow.add_edge("summarise", "draft")
-    workflow.add_edge("draft", END)
+    if WRITE_MODE == "sequential":
+        workflow.add_edge("select", "summarise")
+        workflow.add_edge("summarise", "draft")
+        workflow.add_edge("draft", END)
+    else:
+        workflow.add_edge("select", "write")
+        workflow.add_edge("write", END)
     
     return workflow.compile()
 
-# Create the compiled graph
-graph = build_research_graph()
+# Compiled lazily so importing this module stays cheap on cold starts
+_graph = None
+_async_graph = None
+_graph_lock = threading.Lock()
+
+def get_graph():
+    """Get or compile the synchronous research graph"""
+    global _graph
+    if _graph is None:
+        with _graph_lock:
+            if _graph is None:
+                _graph = build_research_graph()
+    return _graph
+
+def get_async_graph():
+    """Get or compile the coroutine research graph"""
+    global _async_graph
+    if _async_graph is None:
+        with _graph_lock:
+            if _async_graph is None:
+                _async_graph = build_research_graph(use_async=True)
+    return _async_graph
 
-def run_research(topic: str) -> dict:
-    """Run the research workflow for a given topic"""
-    print(f"Running research for topic: {topic}")
-    initial_state = {
+def warm_up() -> Dict[str, float]:
+    """Compile the graphs and build the process-wide clients, caches and models
+    ahead of the first request; returns the seconds spent on each step"""
+    steps = {
+        "graph": get_graph,
+        "async_graph": get_async_graph,
+        "llm": lambda: [get_model(model) for model in {get_llm().model, *get_model_router().node_models.values()}],
+        "http_session": get_session,
+        "source_cache": get_source_cache,
+        "source_registry": get_source_registry,
+        "article_index": get_article_index,
+        "topic_log": get_topic_log,
+        "field_classifier": get_field_classifier,
+        "tokenizer": load_encoding,
+    }
+    timings = {}
+    for name, step in steps.items():
+        started = time.perf_counter()
+        step()
+        timings[name] = round(time.perf_counter() - started, 4)
+    return timings
+
+def _initial_state(topic: str, field: Optional[str] = None) -> AgentState:
+    return {
         "topic": topic,
-        "field": "",
+        "field": field or "",
         "fetched_data": {},
         "selected_artices": [],
         "summary": "",
         "article": "",
+        "cache_status": {},
     }
-    return graph.invoke(initial_state)
+
+def _run_config(bypass_cache: bool, deadline: Optional[Deadline], **configurable) -> dict:
+    return {"configurable": {
+        "llm_cache_bypass": bypass_cache,
+        "deadline": deadline if deadline is not None else Deadline(),
+        **configurable,
+    }}
+
+def _flights() -> SingleFlight:
+    # With coalescing off every call gets a registry of its own, i.e. runs alone
+    return get_single_flight() if RESEARCH_COALESCE else SingleFlight()
+
+def _flight_key(topic: str, bypass_cache: bool, run_id: Optional[str] = None) -> Tuple[str, bool, Optional[str]]:
+    return normalize_topic(topic), bypass_cache, run_id
+
+def _joined(topic: str, result: dict, trace: Optional[Trace]) -> dict:
+    """A coalesced caller's copy of the shared result"""
+    logger.info(f"Joined in-flight research for topic: {topic}")
+    if trace is not None:
+        trace.coalesced = True
+    return {**result, "topic": topic}
+
+def run_research(topic: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None,
+                 trace: Optional[Trace] = None, field: Optional[str] = None, run_id: Optional[str] = None,
+                 refresh: bool = False) -> dict:
+    """Run the research workflow for a given topic
+
+    bypass_cache skips LLM cache lookups for this run (fresh outputs are still stored).
+    deadline bounds every fetch and LLM call of the run; it defaults to
+    RESEARCH_DEADLINE_SECONDS from now. Sources that do not answer in time are
+    marked as timed out in fetched_data and the run continues without them.
+    trace, when given, collects a span per node, source fetch and LLM call.
+    field, when already known, skips the classify step.
+    run_id, when the client supplies one, turns on checkpointing: each
+    completed node's state is saved under it, and calling again with the same
+    run_id after a failure resumes after the last completed node. A run that
+    completes drops its checkpoints. Without a run_id nothing is written. The
+    result carries it as "run_id".
+    refresh re-scrapes every source and regenerates every LLM output (implying
+    bypass_cache), storing the fresh results; the cache warmer uses it.
+
+    Concurrent calls for the same normalized topic (and bypass_cache) share one
+    run: later callers wait for the first one's result instead of repeating its
+    scrapes and LLM calls (RESEARCH_COALESCE=false turns this off).
+    """
+    bypass_cache = bypass_cache or refresh
+
+    def run() -> dict:
+        logger.info(f"Running research for topic: {topic}")
+        config = _run_config(bypass_cache, deadline, run_id=run_id, refresh_sources=refresh)
+        with trace_scope(trace):
+            result = get_graph().invoke(_initial_state(topic, field), config=config)
+        _completed(run_id)
+        return {**result, "run_id": run_id}
+
+    result, shared = _flights().do(_flight_key(topic, bypass_cache, run_id), run, deadline)
+    return _joined(topic, result, trace) if shared else result
+
+async def arun_research(topic: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None,
+                        trace: Optional[Trace] = None, run_id: Optional[str] = None) -> dict:
+    """Async version of run_research on the coroutine graph"""
+    async def run() -> dict:
+        logger.info(f"Running research for topic: {topic}")
+        config = _run_config(bypass_cache, deadline, run_id=run_id)
+        with trace_scope(trace):
+            result = await get_async_graph().ainvoke(_initial_state(topic), config=config)
+        await asyncio.to_thread(_completed, run_id)
+        return {**result, "run_id": run_id}
+
+    result, shared = await _flights().ado(_flight_key(topic, bypass_cache, run_id), run, deadline)
+    return _joined(topic, result, trace) if shared else result
+
+def refresh_topic(topic: str, full_graph: bool = False, deadline: Optional[Deadline] = None) -> dict:
+    """Re-scrape a topic's sources, renewing their source cache entries and
+    article index rows; with full_graph the whole run is repeated so the LLM
+    cache is renewed too. Returns the resulting state. Used by the cache warmer."""
+    if full_graph:
+        return run_research(topic, deadline=deadline, refresh=True)
+    config = _run_config(False, deadline, refresh_sources=True)
+    return fetch_data(classify_field(_initial_state(topic)), config)
+
+# Topics researched at once by run_research_batch
+RESEARCH_BATCH_CONCURRENCY = int(os.getenv("RESEARCH_BATCH_CONCURRENCY", "4"))
+
+def classify_topics(topics: List[str]) -> List[str]:
+    """Fields for many topics: the local classifier first, then one batched
+    LLM pass (through the rate-limit-aware scheduler) for the rest. Topics the
+    LLM fails on get "" and are classified again by their own run."""
+    fields = [classify_topic(topic) or "" for topic in topics]
+    unresolved = [i for i, field in enumerate(fields) if not field]
+    if unresolved:
+        outputs = (classify_prompt | get_llm("classify")).batch(
+            [{"topic": topics[i]} for i in unresolved], config=_node_config("classify"), return_exceptions=True
+        )
+        for i, output in zip(unresolved, outputs):
+            if not isinstance(output, Exception):
+                fields[i] = _parse_field(output.content) or ""
+    return fields
+
+def run_research_batch(topics: List[str], bypass_cache: bool = False,
+                       concurrency: int = RESEARCH_BATCH_CONCURRENCY) -> Iterator[dict]:
+    """Research many topics, yielding each one's outcome as soon as it finishes
+
+    Topics are classified together up front (see classify_topics), then run
+    `concurrency` at a time, each under its own RESEARCH_DEADLINE_SECONDS
+    budget. Scrapes from every run share the process-wide per-host limits
+    (SOURCE_HOST_CONCURRENCY), and repeated topics share one run. Yields
+    {"index", "topic", "result"} or {"index", "topic", "error"} in completion order.
+    """
+    logger.info(f"Running research batch of {len(topics)} topics")
+    fields = classify_topics(topics)
+
+    def research(topic: str, field: str) -> dict:
+        # The deadline starts when the topic does, not when the batch was submitted
+        return run_research(topic, bypass_cache, Deadline(), field=field)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="research-batch")
+    try:
+        futures = {
+            executor.submit(research, topic, field): index for index, (topic, field) in enumerate(zip(topics, fields))
+        }
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield {"index": index, "topic": topics[index], "result": future.result()}
+            except Exception as e:
+                yield {"index": index, "topic": topics[index], "error": str(e),
+                       "timed_out": isinstance(e, DeadlineExceeded)}
+    finally:
+        # A consumer that stops early (e.g. a disconnected client) cancels the topics not yet started
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def result_payload(result: dict) -> dict:
+    """The response fields of a finished run, shared by the research, batch and stream endpoints"""
+    return {
+        "run_id": result.get("run_id"),
+        "field": extract_output_text(result.get("field", "")),
+        "fetched_data": result.get("fetched_data", {}),
+        "selected_articles": result.get("selected_artices", []),
+        "article": extract_output_text(result.get("article", "")),
+        "summary": extract_output_text(result.get("summary", "")),
+        "cache": result.get("cache_status", {}),
+    }
+
+# Stream event emitted when each graph node completes
+NODE_EVENTS = {
+    "classify": lambda state: ("field", {"field": extract_output_text(state["field"])}),
+    "fetch": lambda state: ("sources", {"fetched_data": state["fetched_data"], "cache": state.get("cache_status", {})}),
+    "select": lambda state: ("selected", {"selected_articles": state["selected_artices"]}),
+    "summarise": lambda state: ("summary", {"summary": extract_output_text(state["summary"])}),
+    "draft": lambda state: ("article", {"article": extract_output_text(state["article"])}),
+}
+
+# Nodes whose completion stands for several NODE_EVENTS steps
+COMBINED_NODES = {
+    "write": ("summarise", "draft"),
+}
+
+# Stream event carrying text deltas from a generating node
+TOKEN_EVENTS = {
+    "summarise": "summary_delta",
+    "draft": "article_delta",
+}
+
+def stream_research(topic: str, bypass_cache: bool = False, deadline: Optional[Deadline] = None,
+                    run_id: Optional[str] = None) -> Iterator[Tuple[str, dict]]:
+    """Run the research workflow, yielding (event, data) pairs as it progresses
+
+    One event is emitted per completed node (see NODE_EVENTS), summary and
+    article text deltas are forwarded as they arrive from the Responses API,
+    and the stream ends with "done", carrying the same fields as the research
+    endpoint (result_payload), or "error"; both carry the run_id (see
+    run_research for resuming a run).
+
+    Like run_research, concurrent streams for the same topic share one run;
+    a stream that joins late first gets the events emitted so far.
+    """
+    def start(publish: Callable[[Tuple[str, dict]], None], finish: Callable[[], None]):
+        logger.info(f"Streaming research for topic: {topic}")
+
+        def token_sink(node: str, text: str):
+            if text:
+                publish((TOKEN_EVENTS.get(node, "delta"), {"text": text}))
+
+        def run():
+            config = _run_config(bypass_cache, deadline, token_sink=token_sink, run_id=run_id)
+            run = {"run_id": run_id}
+            final = _initial_state(topic)
+            try:
+                for step in get_graph().stream(_initial_state(topic), config=config):
+                    for node, state in step.items():
+                        final = state
+                        for name in COMBINED_NODES.get(node, (node,)):
+                            if name in NODE_EVENTS:
+                                publish(NODE_EVENTS[name](state))
+                _completed(run_id)
+                publish(("done", {"topic": topic, **result_payload({**final, **run})}))
+            except Exception as e:
+                publish(("error", {"error": str(e), **run}))
+            finally:
+                finish()
+
+        threading.Thread(target=run, name="research-stream", daemon=True).start()
+
+    events, shared = _flights().stream(_flight_key(topic, bypass_cache, run_id), start)
+    if shared:
+        logger.info(f"Joined in-flight research stream for topic: {topic}")
+    yield from events
@@ -0,0 +1,119 @@
+"""
+Batch research endpoint
+POST /api/research/batch with {"topics": [...], "nocache": false, "concurrency": 4}
+researches every topic and streams one NDJSON line per topic as it finishes,
+then a final {"done": true, ...} line. Meant for long-running servers; a
+large batch will outlast a serverless function's time limit.
+"""
+from http.server import BaseHTTPRequestHandler
+import sys
+import os
+
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+os.environ["LANGCHAIN_ENDPOINT"] = ""
+os.environ["LANGCHAIN_API_KEY"] = ""
+
+import json
+import time
+import logging
+import traceback
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.agent_loader import load_research_agent, warm_in_background
+
+RESEARCH_BATCH_MAX_TOPICS = int(os.getenv("RESEARCH_BATCH_MAX_TOPICS", "500"))
+
+warm_in_background()
+
+
+def format_line(data: dict) -> bytes:
+    """Encode one NDJSON line"""
+    return (json.dumps(data) + "\n").encode()
+
+
+def parse_request(body: bytes):
+    """(topics, nocache, concurrency) from the request body, or raise ValueError"""
+    try:
+        payload = json.loads(body or b"{}")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Body must be JSON: {e}")
+    topics = payload.get("topics") if isinstance(payload, dict) else None
+    if not isinstance(topics, list) or not topics:
+        raise ValueError('Body must contain a non-empty "topics" list')
+    if not all(isinstance(topic, str) and topic.strip() for topic in topics):
+        raise ValueError("Topics must be non-empty strings")
+    if len(topics) > RESEARCH_BATCH_MAX_TOPICS:
+        raise ValueError(f"At most {RESEARCH_BATCH_MAX_TOPICS} topics per batch")
+    concurrency = payload.get("concurrency")
+    if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+        raise ValueError('"concurrency" must be a positive integer')
+    return [topic.strip() for topic in topics], bool(payload.get("nocache")), concurrency
+
+
+class handler(BaseHTTPRequestHandler):
+    def _send_json(self, status: int, data: dict):
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(json.dumps(data).encode())
+
+    def do_POST(self):
+        try:
+            topics, bypass_cache, concurrency = parse_request(
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            )
+        except ValueError as e:
+            self._send_json(400, {"error": "Invalid batch request", "detail": str(e)})
+            return
+
+        agent, import_error = load_research_agent()
+        if import_error or not agent:
+            logger.error(f"Cannot process request due to import error: {import_error}")
+            self._send_json(500, {"error": "Research agent initialization failed", "detail": import_error})
+            return
+
+        self.send_response(200)
+        self.send_header('Content-type', 'application/x-ndjson')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        self.end_headers()
+
+        logger.info(f"Starting research batch of {len(topics)} topics")
+        started = time.perf_counter()
+        errors = 0
+        kwargs = {"concurrency": concurrency} if concurrency else {}
+        try:
+            for outcome in agent.run_research_batch(topics, bypass_cache=bypass_cache, **kwargs):
+                if "error" in outcome:
+                    errors += 1
+                    line = outcome
+                else:
+                    line = {"index": outcome["index"], "topic": outcome["topic"],
+                            **agent.result_payload(outcome["result"])}
+                self.wfile.write(format_line(line))
+                self.wfile.flush()
+            self.wfile.write(format_line({
+                "done": True, "topics": len(topics), "errors": errors,
+                "seconds": round(time.perf_counter() - started, 2),
+            }))
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client disconnected from research batch")
+        except Exception as e:
+            logger.error(f"Error during research batch: {str(e)}\n{traceback.format_exc()}")
+            self.wfile.write(format_line({"error": "Error during research batch", "detail": str(e)}))
+        logger.info(f"Research batch finished: {len(topics)} topics, {errors} errors")
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        self.end_headers()
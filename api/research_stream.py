@@ -0,0 +1,96 @@
+"""
+Server-Sent Events endpoint for the research agent on Vercel
+Streams node completions and summary/article tokens as they are produced
+"""
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, unquote
+import sys
+import os
+
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+os.environ["LANGCHAIN_ENDPOINT"] = ""
+os.environ["LANGCHAIN_API_KEY"] = ""
+
+import json
+import logging
+import traceback
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.agent_loader import load_research_agent, warm_in_background
+from api.checkpoints import valid_run_id
+from api.deadline import Deadline
+
+warm_in_background()
+
+
+def format_sse(event: str, data: dict) -> bytes:
+    """Encode one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode()
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # The budget starts when the request arrives, not when the graph starts
+        deadline = Deadline()
+        parsed_path = urlparse(self.path)
+        path_parts = parsed_path.path.split('/')
+        
+        topic = None
+        if len(path_parts) >= 5 and path_parts[1] == 'api' and path_parts[2] == 'research' and path_parts[3] == 'stream':
+            topic = unquote(path_parts[4])
+        
+        if not topic or len(topic.strip()) == 0:
+            self.send_error(400, "Topic cannot be empty")
+            return
+        
+        agent, import_error = load_research_agent()
+        if import_error or not agent:
+            logger.error(f"Cannot process request due to import error: {import_error}")
+            self.send_response(500)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                "error": "Research agent initialization failed",
+                "detail": import_error
+            }).encode())
+            return
+        
+        query = parse_qs(parsed_path.query)
+        bypass_cache = query.get("nocache", ["0"])[0].lower() in ("1", "true")
+        run_id = query.get("run_id", [None])[0]
+        if run_id is not None and not valid_run_id(run_id):
+            self.send_error(400, "run_id must be 1-64 letters, digits, '-' or '_'")
+            return
+        
+        self.send_response(200)
+        self.send_header('Content-type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('X-Accel-Buffering', 'no')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        self.end_headers()
+        
+        logger.info(f"Starting research stream for topic: {topic}")
+        try:
+            for event, data in agent.stream_research(topic, bypass_cache=bypass_cache, deadline=deadline, run_id=run_id):
+                self.wfile.write(format_sse(event, data))
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info(f"Client disconnected from research stream for topic: {topic}")
+        except Exception as e:
+            logger.error(f"Error during research stream: {str(e)}\n{traceback.format_exc()}")
+            self.wfile.write(format_sse("error", {"error": "Error during research", "detail": str(e)}))
+        logger.info(f"Research stream finished for topic: {topic}")
+    
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        self.end_headers()
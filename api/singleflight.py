@@ -0,0 +1,176 @@
+"""
+Single-flight coalescing of identical research runs
+Concurrent callers asking for the same key (normalized topic plus options)
+attach to the one run already in flight instead of starting their own, so a
+trending topic costs one set of scrapes and LLM calls however many users ask
+for it at once. Covers blocking calls, coroutines and event streams; the
+entry is dropped as soon as the run finishes, so later callers start fresh
+(and are usually served from the source and LLM caches).
+"""
+
+import os
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from api.deadline import Deadline, DeadlineExceeded
+
+RESEARCH_COALESCE = os.getenv("RESEARCH_COALESCE", "true").lower() in ("1", "true", "yes")
+
+
+class _Call:
+    """One in-flight blocking call and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Broadcast:
+    """Events of one in-flight stream, replayed to every subscriber from the start"""
+
+    def __init__(self):
+        self.events: List[Tuple[str, dict]] = []
+        self.finished = False
+        self.condition = threading.Condition()
+
+    def publish(self, event: Tuple[str, dict]):
+        with self.condition:
+            self.events.append(event)
+            self.condition.notify_all()
+
+    def finish(self):
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
+    def subscribe(self) -> Iterator[Tuple[str, dict]]:
+        index = 0
+        while True:
+            with self.condition:
+                while index >= len(self.events) and not self.finished:
+                    self.condition.wait()
+                if index >= len(self.events):
+                    return
+                batch = self.events[index:]
+            index += len(batch)
+            yield from batch
+
+
+def _exceeded(deadline: Deadline) -> DeadlineExceeded:
+    return DeadlineExceeded(f"Research deadline of {deadline.seconds:.0f}s exceeded")
+
+
+class SingleFlight:
+    """Process-wide registry of in-flight runs keyed by request identity"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._streams: Dict[Hashable, _Broadcast] = {}
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any], deadline: Optional[Deadline] = None) -> Tuple[Any, bool]:
+        """Run fn, or wait for the identical call already running.
+        Returns (result, shared); an error raised by the run is raised to every caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+
+        if not call.done.wait(deadline.remaining() if deadline is not None else None):
+            raise _exceeded(deadline)
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]],
+                  deadline: Optional[Deadline] = None) -> Tuple[Any, bool]:
+        """Coroutine version of do(). The run is a task of its own, so one caller
+        being cancelled (e.g. a client disconnecting) does not cancel it for the rest."""
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        with self._lock:
+            task = self._tasks.get(task_key)
+            shared = task is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                task = self._tasks[task_key] = loop.create_task(fn())
+                task.add_done_callback(lambda _: self._forget_task(task_key, task))
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task),
+                                            deadline.remaining() if deadline is not None else None)
+        except asyncio.TimeoutError:
+            if task.done():
+                raise
+            raise _exceeded(deadline)
+        return result, shared
+
+    def _forget_task(self, task_key: Tuple[int, Hashable], task: asyncio.Task):
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+
+    def stream(self, key: Hashable, start: Callable[[Callable[[Tuple[str, dict]], None], Callable[[], None]], None]
+               ) -> Tuple[Iterator[Tuple[str, dict]], bool]:
+        """Subscribe to the identical stream already running, or start one with
+        start(publish, finish), which must produce in the background, publish each
+        event and call finish at the end. Late subscribers get the events so far
+        replayed first. Returns (events, shared)."""
+        with self._lock:
+            broadcast = self._streams.get(key)
+            shared = broadcast is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                broadcast = self._streams[key] = _Broadcast()
+
+        if not shared:
+            def finish():
+                with self._lock:
+                    if self._streams.get(key) is broadcast:
+                        del self._streams[key]
+                broadcast.finish()
+
+            start(broadcast.publish, finish)
+        return broadcast.subscribe(), shared
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._tasks) + len(self._streams),
+                "coalesced": self.coalesced,
+            }
+
+
+_flights: Optional[SingleFlight] = None
+_flights_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    """Lazily created process-wide SingleFlight"""
+    global _flights
+    if _flights is None:
+        with _flights_lock:
+            if _flights is None:
+                _flights = SingleFlight()
+    return _flights
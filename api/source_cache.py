@@ -0,0 +1,215 @@
+"""
+TTL/LRU cache for scraped search results
+Results are keyed by source plus normalized topic and stored in a pluggable
+backend: in-process dict, on-disk SQLite file or a Redis-compatible server
+"""
+
+import os
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from api.spec import parse_spec
+
+SOURCE_CACHE_BACKEND = os.getenv("SOURCE_CACHE_BACKEND", "memory")
+SOURCE_CACHE_MAX_ENTRIES = int(os.getenv("SOURCE_CACHE_MAX_ENTRIES", "512"))
+SOURCE_CACHE_TTL = float(os.getenv("SOURCE_CACHE_TTL", "3600"))
+SOURCE_CACHE_PATH = os.getenv("SOURCE_CACHE_PATH", os.path.join(tempfile.gettempdir(), "research_source_cache.sqlite3"))
+SOURCE_CACHE_URL = os.getenv("SOURCE_CACHE_URL", "redis://localhost:6379/0")
+
+# Per-source TTLs in seconds, e.g. "bioRxiv=3600,SSRN=7200"
+SOURCE_CACHE_TTLS = os.getenv("SOURCE_CACHE_TTLS", "")
+
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+
+def normalize_topic(topic: str) -> str:
+    """Lowercase and collapse whitespace so equivalent topics share a key"""
+    return " ".join(topic.lower().replace("+", " ").split())
+
+
+class MemoryBackend:
+    """In-process LRU dict with per-entry expiry"""
+
+    def __init__(self, max_entries: int = SOURCE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """On-disk cache file, evicting the least recently accessed rows"""
+
+    def __init__(self, path: str = SOURCE_CACHE_PATH, max_entries: int = SOURCE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now)
+            )
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+
+class RedisBackend:
+    """Redis-compatible server; expiry uses SETEX and eviction is left to the
+    server's maxmemory-policy (configure allkeys-lru for LRU behaviour)"""
+
+    def __init__(self, url: str = SOURCE_CACHE_URL, prefix: str = "research:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("The redis cache backend needs the redis package: pip install redis") from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: float):
+        self._client.setex(self.prefix + key, max(1, int(ttl)), json.dumps(value))
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+
+def build_backend(name: str = SOURCE_CACHE_BACKEND, path: str = SOURCE_CACHE_PATH,
+                  max_entries: int = SOURCE_CACHE_MAX_ENTRIES, prefix: str = "research:"):
+    """Build the configured backend, falling back to memory if it is unavailable.
+    A missing redis package is raised instead: the memory fallback would
+    silently stop sharing the cache between processes."""
+    try:
+        if name == "sqlite":
+            return SQLiteBackend(path, max_entries)
+        if name == "redis":
+            return RedisBackend(SOURCE_CACHE_URL, prefix)
+    except ImportError:
+        raise
+    except Exception as e:
+        warnings.warn(f"Cache backend '{name}' unavailable ({e}); using in-process memory cache.")
+    return MemoryBackend(max_entries)
+
+
+class SourceCache:
+    """Per-source TTL cache for scraped search results"""
+
+    def __init__(self, backend=None, default_ttl: float = SOURCE_CACHE_TTL, ttls: Optional[Dict[str, float]] = None):
+        self.backend = backend if backend is not None else build_backend()
+        self.default_ttl = default_ttl
+        self.ttls = ttls if ttls is not None else parse_spec(SOURCE_CACHE_TTLS, float)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(source: str, topic: str) -> str:
+        return f"{source}:{normalize_topic(topic)}"
+
+    def ttl_for(self, source: str) -> float:
+        return self.ttls.get(source, self.default_ttl)
+
+    def get(self, source: str, topic: str) -> Optional[list]:
+        value = self.backend.get(self.key(source, topic))
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, source: str, topic: str, articles: list):
+        """Store a source's articles unless the scrape failed"""
+        if any("error" in article for article in articles if isinstance(article, dict)):
+            return
+        ttl = self.ttl_for(source)
+        if ttl > 0:
+            self.backend.set(self.key(source, topic), articles, ttl)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": hits / total if total else 0.0,
+        }
+
+
+_source_cache = None
+_source_cache_lock = threading.Lock()
+
+
+def get_source_cache() -> SourceCache:
+    """Get or initialize the process-wide source cache"""
+    global _source_cache
+    if _source_cache is None:
+        with _source_cache_lock:
+            if _source_cache is None:
+                _source_cache = SourceCache()
+    return _source_cache
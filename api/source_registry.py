@@ -0,0 +1,389 @@
+"""
+Source adapter registry
+Each search source is an adapter: its search URL, headers and result parsers,
+the field group it serves, and its own request policy:
+- a cap on concurrent requests,
+- a rate limit (requests per second),
+- a circuit breaker that stops calling a source whose recent requests mostly
+  failed (SSRN answering 403, say) for a cooldown window, then lets a single
+  probe through to decide whether to close again.
+fetch_data routes a classified field to a source group through the registry,
+and a source with an open circuit is reported as skipped instead of waited on.
+"""
+
+import os
+import sys
+import time
+import logging
+import asyncio
+import threading
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+
+from api.parsers import (
+    IncrementalParser, incremental_arxiv, incremental_highwire, incremental_springeropen, incremental_ssrn,
+    parse_arxiv, parse_highwire, parse_springeropen, parse_ssrn
+)
+from api.spec import parse_spec
+
+logger = logging.getLogger(__name__)
+
+# Requests in flight per source across all runs (0 = unlimited), with per-source
+# overrides, e.g. "SSRN=1,arXiv=2"
+SOURCE_CONCURRENCY = int(os.getenv("SOURCE_CONCURRENCY", "0"))
+SOURCE_CONCURRENCY_LIMITS = os.getenv("SOURCE_CONCURRENCY_LIMITS", "")
+# Requests per second per source (0 = unlimited), with per-source overrides, e.g. "arXiv=1"
+SOURCE_RATE_LIMIT = float(os.getenv("SOURCE_RATE_LIMIT", "0"))
+SOURCE_RATE_LIMITS = os.getenv("SOURCE_RATE_LIMITS", "")
+
+# A source opens its circuit once at least MIN_CALLS of its last WINDOW requests
+# are in and FAILURE_RATE of them failed; it is skipped for COOLDOWN seconds
+SOURCE_BREAKER_ENABLED = os.getenv("SOURCE_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+SOURCE_BREAKER_WINDOW = int(os.getenv("SOURCE_BREAKER_WINDOW", "20"))
+SOURCE_BREAKER_MIN_CALLS = int(os.getenv("SOURCE_BREAKER_MIN_CALLS", "5"))
+SOURCE_BREAKER_FAILURE_RATE = float(os.getenv("SOURCE_BREAKER_FAILURE_RATE", "0.5"))
+SOURCE_BREAKER_COOLDOWN = float(os.getenv("SOURCE_BREAKER_COOLDOWN", "60"))
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+BROWSER_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
+# group -> field keywords routed to it; fields matching none go to DEFAULT_GROUP
+FIELD_ROUTES = (
+    ("medicine", ("medicine", "health sciences", "biology", "life sciences", "biomedical")),
+    ("social", ("social sciences", "humanities", "law", "economics", "business")),
+)
+DEFAULT_GROUP = "multi"
+
+
+class SourceUnavailable(Exception):
+    """A source was not called: its circuit is open, or no request slot came up in time"""
+    pass
+
+
+class SourceHTTPError(ValueError):
+    """A source answered with an error status"""
+    pass
+
+
+def is_source_failure(error: BaseException) -> bool:
+    """Whether an error counts against the source's circuit: an error status or
+    a transport failure. Anything else (say, a parser error) means it answered."""
+    if isinstance(error, (SourceHTTPError, OSError, asyncio.TimeoutError)):
+        return True
+    # requests' errors are OSErrors; aiohttp's are not, and it is only loaded on the async path
+    aiohttp = sys.modules.get("aiohttp")
+    return aiohttp is not None and isinstance(error, aiohttp.ClientError)
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker over a sliding window of request outcomes"""
+
+    def __init__(self, name: str, window: int = SOURCE_BREAKER_WINDOW, min_calls: int = SOURCE_BREAKER_MIN_CALLS,
+                 failure_rate: float = SOURCE_BREAKER_FAILURE_RATE, cooldown: float = SOURCE_BREAKER_COOLDOWN,
+                 enabled: bool = SOURCE_BREAKER_ENABLED):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.enabled = enabled
+        self.state = CLOSED
+        self.opened = 0
+        self._outcomes = deque(maxlen=max(1, window))
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe is let through (0 when not open)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def is_open(self) -> bool:
+        """Whether a request now would be refused, without claiming the half-open probe"""
+        with self._lock:
+            if self.state == OPEN:
+                return self.retry_in() > 0
+            return self.state == HALF_OPEN and self._probing
+
+    def allow(self) -> bool:
+        """Admit a request; in the half-open state only one probe at a time"""
+        with self._lock:
+            if self.state == OPEN and self.retry_in() <= 0:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self):
+        """An admitted request was abandoned before it had an outcome"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+
+    def record(self, success: bool):
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probing = False
+                if success:
+                    logger.info(f"{self.name}: probe succeeded, closing circuit")
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                else:
+                    self._open()
+                return
+            if self.state == OPEN:
+                # A request started before the circuit opened
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        logger.warning(f"{self.name}: opening circuit for {self.cooldown:.0f}s")
+        self.state = OPEN
+        self.opened += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            failures = self._outcomes.count(False)
+            return {
+                "state": self.state,
+                "failure_rate": round(failures / len(self._outcomes), 3) if self._outcomes else 0.0,
+                "opened": self.opened,
+                "retry_in": round(self.retry_in(), 1),
+            }
+
+
+class RateLimiter:
+    """Spaces requests at least 1/rate seconds apart (rate <= 0: unlimited)"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """Book the next send slot and return the seconds to wait for it, or
+        None (booking nothing) when that is longer than timeout"""
+        if not self.interval:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            if timeout is not None and start - now > timeout:
+                return None
+            self._next = start + self.interval
+            return start - now
+
+
+class SourceAdapter:
+    """One search source: how to query and parse it, and the policy guarding its requests"""
+
+    def __init__(self, name: str, group: str, url_template: str, parse: Callable[[str], List[Dict]],
+                 stream_parser: Optional[Callable[[Optional[str]], IncrementalParser]] = None,
+                 headers: Optional[Dict[str, str]] = None, error_label: Optional[str] = None,
+                 quote_query: bool = False, concurrency: Optional[int] = None, rate: Optional[float] = None):
+        self.name = name
+        self.group = group
+        self.url_template = url_template
+        self.parse = parse
+        # Factory taking the response charset, if any, for streamed fetches
+        self.stream_parser = stream_parser
+        self.headers = headers
+        # Prefix for non-200 errors, or None to skip the status check
+        self.error_label = error_label
+        self.quote_query = quote_query
+        self.concurrency = concurrency if concurrency is not None else \
+            parse_spec(SOURCE_CONCURRENCY_LIMITS, int).get(name, SOURCE_CONCURRENCY)
+        self.rate = rate if rate is not None else parse_spec(SOURCE_RATE_LIMITS, float).get(name, SOURCE_RATE_LIMIT)
+        self.breaker = CircuitBreaker(name)
+        self._rate_limiter = RateLimiter(self.rate)
+        self._semaphore = threading.BoundedSemaphore(self.concurrency) if self.concurrency > 0 else None
+        # asyncio semaphores belong to one event loop
+        self._async_semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def query(self, topic: str) -> str:
+        query = topic.replace(" ", "+")
+        return quote(query) if self.quote_query else query
+
+    def url(self, query: str) -> str:
+        return self.url_template.format(query=query)
+
+    def _admit(self):
+        if not self.breaker.allow():
+            raise SourceUnavailable(f"{self.name} skipped: circuit open, retrying in {self.breaker.retry_in():.0f}s")
+
+    def _reserve(self, timeout: Optional[float], waited: float) -> float:
+        delay = self._rate_limiter.reserve(None if timeout is None else timeout - waited)
+        if delay is None:
+            raise SourceUnavailable(f"{self.name} skipped: rate limited for longer than its {timeout:.1f}s budget")
+        return delay
+
+    @contextmanager
+    def call(self, timeout: Optional[float] = None) -> Iterator[None]:
+        """Admit one request to the source for the duration of the block.
+        Raises SourceUnavailable while the circuit is open or when no request
+        slot or rate-limit turn comes up within timeout; otherwise the circuit
+        breaker records a failure if the block raises a transport or HTTP
+        error (is_source_failure), and a success if not."""
+        self._admit()
+        started = time.monotonic()
+        if self._semaphore is not None and not self._semaphore.acquire(timeout=timeout):
+            self.breaker.release()
+            raise SourceUnavailable(f"{self.name} skipped: no free request slot within {timeout:.1f}s")
+        try:
+            try:
+                delay = self._reserve(timeout, time.monotonic() - started)
+            except SourceUnavailable:
+                self.breaker.release()
+                raise
+            if delay:
+                time.sleep(delay)
+            try:
+                yield
+            except Exception as e:
+                self.breaker.record(not is_source_failure(e))
+                raise
+            self.breaker.record(True)
+        finally:
+            if self._semaphore is not None:
+                self._semaphore.release()
+
+    def _async_semaphore(self) -> Optional[asyncio.Semaphore]:
+        if self.concurrency <= 0:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    @asynccontextmanager
+    async def acall(self, timeout: Optional[float] = None):
+        """Async version of call(); a cancelled request (e.g. the losing attempt of a hedge) counts as neither outcome"""
+        self._admit()
+        started = time.monotonic()
+        semaphore = self._async_semaphore()
+        if semaphore is not None:
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout)
+            except asyncio.TimeoutError:
+                self.breaker.release()
+                raise SourceUnavailable(f"{self.name} skipped: no free request slot within {timeout:.1f}s")
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+        try:
+            try:
+                delay = self._reserve(timeout, time.monotonic() - started)
+                if delay:
+                    await asyncio.sleep(delay)
+            except (SourceUnavailable, asyncio.CancelledError):
+                self.breaker.release()
+                raise
+            try:
+                yield
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception as e:
+                self.breaker.record(not is_source_failure(e))
+                raise
+            self.breaker.record(True)
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+    def stats(self) -> Dict:
+        return {"group": self.group, "concurrency": self.concurrency, "rate": self.rate, **self.breaker.stats()}
+
+
+class SourceRegistry:
+    """Adapters by name, grouped by the fields they serve"""
+
+    def __init__(self, adapters: Tuple[SourceAdapter, ...] = (),
+                 routes: Tuple[Tuple[str, Tuple[str, ...]], ...] = FIELD_ROUTES, default_group: str = DEFAULT_GROUP):
+        self.routes = routes
+        self.default_group = default_group
+        self._adapters: Dict[str, SourceAdapter] = {}
+        for adapter in adapters:
+            self.register(adapter)
+
+    def register(self, adapter: SourceAdapter):
+        self._adapters[adapter.name] = adapter
+
+    def __getitem__(self, name: str) -> SourceAdapter:
+        return self._adapters[name]
+
+    def __iter__(self) -> Iterator[SourceAdapter]:
+        return iter(list(self._adapters.values()))
+
+    def names(self, group: str) -> List[str]:
+        """Sources serving a group, in registration order"""
+        return [adapter.name for adapter in self if adapter.group == group]
+
+    def groups(self) -> List[str]:
+        return list(dict.fromkeys(adapter.group for adapter in self))
+
+    def route(self, field: str) -> str:
+        """Group of sources covering a classified field"""
+        field = field.lower()
+        for group, keywords in self.routes:
+            if any(keyword in field for keyword in keywords):
+                return group
+        return self.default_group
+
+    def stats(self) -> Dict[str, Dict]:
+        return {adapter.name: adapter.stats() for adapter in self}
+
+
+def default_adapters() -> Tuple[SourceAdapter, ...]:
+    return (
+        SourceAdapter("bioRxiv", "medicine", "https://www.biorxiv.org/search/{query}",
+                      lambda html: parse_highwire(html, "https://www.biorxiv.org"),
+                      partial(incremental_highwire, "https://www.biorxiv.org")),
+        SourceAdapter("medRxiv", "medicine", "https://www.medrxiv.org/search/{query}",
+                      lambda html: parse_highwire(html, "https://www.medrxiv.org"),
+                      partial(incremental_highwire, "https://www.medrxiv.org")),
+        SourceAdapter("PubMed", "medicine", "https://pubmed.ncbi.nlm.nih.gov/?term={query}",
+                      lambda html: parse_highwire(html, "https://www.pubmed.org"),
+                      partial(incremental_highwire, "https://www.pubmed.org")),
+        SourceAdapter("SSRN", "social", "https://papers.ssrn.com/searchresults.cfm?term={query}",
+                      parse_ssrn, incremental_ssrn, BROWSER_HEADERS, "", quote_query=True),
+        SourceAdapter("arXiv", "multi", "https://arxiv.org/search/?query={query}&source=header&searchtype=all",
+                      parse_arxiv, incremental_arxiv, error_label="arXiv "),
+        SourceAdapter("SpringerOpen", "multi",
+                      "https://www.springeropen.com/search?query={query}&searchType=publisherSearch",
+                      parse_springeropen, incremental_springeropen, BROWSER_HEADERS, "SpringerOpen "),
+    )
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_source_registry() -> SourceRegistry:
+    """Get or initialize the process-wide source registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SourceRegistry(default_adapters())
+    return _registry
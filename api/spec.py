@@ -0,0 +1,25 @@
+"""
+"name=value,name=value" settings
+Per-host, per-source and per-node overrides are all read from environment
+variables in this one format.
+"""
+
+from typing import Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+def parse_spec(spec: str, convert: Callable[[str], T]) -> Dict[str, T]:
+    """Parse a "name=value,name=value" spec into a dict, skipping malformed entries"""
+    values = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        if not name.strip() or not value.strip():
+            continue
+        try:
+            values[name.strip()] = convert(value.strip())
+        except ValueError:
+            continue
+    return values
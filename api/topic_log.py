@@ -0,0 +1,113 @@
+"""
+Request history for cache warming
+fetch_data logs every topic it serves, with how many of its sources came
+back warm (source cache or article index). The cache warmer reads the log to
+find the hottest topics whose caches are about to go cold, and to report
+the hit ratio users are actually seeing.
+"""
+
+import os
+import time
+import sqlite3
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+from api.article_index import INDEX_HIT
+from api.source_cache import CACHE_HIT, normalize_topic
+
+TOPIC_LOG_ENABLED = os.getenv("TOPIC_LOG_ENABLED", "true").lower() in ("1", "true", "yes")
+TOPIC_LOG_PATH = os.getenv("TOPIC_LOG_PATH", os.path.join(tempfile.gettempdir(), "research_topics.sqlite3"))
+# Seconds of request history kept
+TOPIC_LOG_RETENTION = float(os.getenv("TOPIC_LOG_RETENTION", "604800"))
+
+WARM_STATUSES = (CACHE_HIT, INDEX_HIT)
+
+
+class TopicLog:
+    """SQLite log of requested topics and of when each was last warmed"""
+
+    def __init__(self, path: str = TOPIC_LOG_PATH, retention: float = TOPIC_LOG_RETENTION):
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS requests ("
+            "topic TEXT NOT NULL, requested_at REAL NOT NULL, sources INTEGER NOT NULL, warm INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS requests_at ON requests (requested_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS requests_topic ON requests (topic, requested_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS warms (topic TEXT PRIMARY KEY, warmed_at REAL NOT NULL, ok INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+
+    def record(self, topic: str, cache_status: Dict[str, str]):
+        """Log one request for topic and how many of its sources were served warm"""
+        now = time.time()
+        warm = sum(1 for status in cache_status.values() if status in WARM_STATUSES)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO requests (topic, requested_at, sources, warm) VALUES (?, ?, ?, ?)",
+                (normalize_topic(topic), now, len(cache_status), warm)
+            )
+            self._conn.execute("DELETE FROM requests WHERE requested_at < ?", (now - self.retention,))
+            self._conn.commit()
+
+    def warmed(self, topic: str, ok: bool = True):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO warms (topic, warmed_at, ok) VALUES (?, ?, ?)",
+                (normalize_topic(topic), time.time(), int(ok))
+            )
+            self._conn.commit()
+
+    def due(self, limit: int, window: float, refresh_after: float) -> List[str]:
+        """Up to limit topics requested in the last window seconds whose sources
+        were last scraped more than refresh_after seconds ago, most requested
+        first. A topic counts as scraped when it was warmed, or when a request
+        for it had to go to the network for some of its sources."""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.topic FROM requests r LEFT JOIN warms w ON w.topic = r.topic "
+                "LEFT JOIN (SELECT topic, MAX(requested_at) AS scraped_at FROM requests "
+                "WHERE warm < sources GROUP BY topic) s ON s.topic = r.topic "
+                "WHERE r.requested_at >= ? AND MAX(IFNULL(w.warmed_at, 0), IFNULL(s.scraped_at, 0)) < ? "
+                "GROUP BY r.topic ORDER BY COUNT(*) DESC, MAX(r.requested_at) DESC LIMIT ?",
+                (now - window, now - refresh_after, limit)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def hit_ratio(self, window: float, topics: Optional[List[str]] = None) -> Dict[str, float]:
+        """Requests, sources and the share of sources served warm over the last
+        window seconds, optionally only for some topics"""
+        query = "SELECT COUNT(*), IFNULL(SUM(sources), 0), IFNULL(SUM(warm), 0) FROM requests WHERE requested_at >= ?"
+        params = [time.time() - window]
+        if topics is not None:
+            query += f" AND topic IN ({', '.join('?' * len(topics))})"
+            params += [normalize_topic(topic) for topic in topics]
+        with self._lock:
+            requests, sources, warm = self._conn.execute(query, params).fetchone()
+        return {
+            "requests": requests,
+            "sources": sources,
+            "warm": warm,
+            "hit_ratio": warm / sources if sources else 0.0,
+        }
+
+
+_log = None
+_log_lock = threading.Lock()
+
+
+def get_topic_log() -> Optional[TopicLog]:
+    """Get or initialize the process-wide topic log (None when disabled)"""
+    global _log
+    if not TOPIC_LOG_ENABLED:
+        return None
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = TopicLog()
+    return _log
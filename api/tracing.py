@@ -0,0 +1,161 @@
+"""
+Run tracing and Prometheus-style metrics
+Every graph node, source scrape and Responses API call is wrapped in a span
+that records wall time, bytes, tokens in/out and cache status. Spans are
+collected on the run's Trace (when one is active) for the optional `timings`
+block of /api/research, and always observed into process-wide histograms
+rendered by /api/metrics.
+"""
+
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with one series per label set"""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels.get(label, "")) for label in self.labels)
+        with self._lock:
+            # One count per bucket (last one is +Inf), then sum
+            series = self._series.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for key, values in sorted(series.items()):
+            labels = ",".join(f'{label}="{value}"' for label, value in zip(self.labels, key))
+            prefix = labels + "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ["+Inf"], values[:-1]):
+                cumulative += count
+                yield f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {values[-1]}"
+            yield f"{self.name}_count{{{labels}}} {cumulative}"
+
+
+NODE_SECONDS = Histogram("research_node_duration_seconds", "Wall time of each graph node",
+                         ("node",), DURATION_BUCKETS)
+SOURCE_SECONDS = Histogram("research_source_duration_seconds", "Wall time of each source fetch",
+                           ("source", "cache", "status"), DURATION_BUCKETS)
+SOURCE_BYTES = Histogram("research_source_response_bytes", "Bytes downloaded per source fetch",
+                         ("source",), BYTES_BUCKETS)
+LLM_SECONDS = Histogram("research_llm_duration_seconds", "Wall time of each Responses API call",
+                        ("node", "model", "cache"), DURATION_BUCKETS)
+LLM_TOKENS = Histogram("research_llm_tokens", "Tokens per Responses API call",
+                       ("node", "direction"), TOKEN_BUCKETS)
+
+HISTOGRAMS = (NODE_SECONDS, SOURCE_SECONDS, SOURCE_BYTES, LLM_SECONDS, LLM_TOKENS)
+
+
+class Trace:
+    """Spans recorded during one research run"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: List[Dict] = []
+        # Set when the run was shared with an identical in-flight request, whose spans it did not see
+        self.coalesced = False
+        self._lock = threading.Lock()
+
+    def add(self, span: Dict):
+        with self._lock:
+            self.spans.append(span)
+
+    def timings(self) -> Dict:
+        """Summary for the `timings` block of the research response"""
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "coalesced": self.coalesced,
+            "nodes": {span["name"]: span["seconds"] for span in spans if span["kind"] == "node"},
+            "sources": [{k: v for k, v in span.items() if k != "kind"} for span in spans if span["kind"] == "source"],
+            "llm": [{k: v for k, v in span.items() if k != "kind"} for span in spans if span["kind"] == "llm"],
+        }
+
+
+_current_trace = contextvars.ContextVar("research_trace", default=None)
+
+
+@contextmanager
+def trace_scope(trace: Optional[Trace]):
+    """Collect spans recorded in this context (and threads/tasks started from it) on trace"""
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def observe(span: Dict):
+    """Feed a finished span into the histograms"""
+    kind = span["kind"]
+    if kind == "node":
+        NODE_SECONDS.observe(span["seconds"], node=span["name"])
+    elif kind == "source":
+        SOURCE_SECONDS.observe(span["seconds"], source=span["name"], cache=span.get("cache", ""),
+                               status=span.get("status", "ok"))
+        if span.get("bytes"):
+            SOURCE_BYTES.observe(span["bytes"], source=span["name"])
+    elif kind == "llm":
+        LLM_SECONDS.observe(span["seconds"], node=span["name"], model=span.get("model", ""), cache=span.get("cache", ""))
+        for direction in ("input", "output"):
+            if span.get(f"{direction}_tokens"):
+                LLM_TOKENS.observe(span[f"{direction}_tokens"], node=span["name"], direction=direction)
+
+
+def record(kind: str, name: str, seconds: float = 0.0, **fields):
+    """Record an already-measured span"""
+    span = {"kind": kind, "name": name, "seconds": round(seconds, 4), **fields}
+    observe(span)
+    trace = current_trace()
+    if trace is not None:
+        trace.add(span)
+
+
+@contextmanager
+def span(kind: str, name: str, **fields):
+    """Time the block as a span; the block may fill in bytes, tokens or cache on the yielded dict.
+    Spans that raise are recorded with status "error"."""
+    details = dict(fields)
+    started = time.perf_counter()
+    try:
+        yield details
+    except Exception:
+        details["status"] = "error"
+        raise
+    finally:
+        record(kind, name, time.perf_counter() - started, **details)
+
+
+def render_metrics() -> str:
+    """All histograms in the Prometheus text exposition format"""
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
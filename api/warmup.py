@@ -0,0 +1,62 @@
+"""
+Warm-up endpoint
+Imports the research agent, compiles the graphs and builds the shared clients
+in the process serving this request, and reports what each step took. Under
+server.py that process serves every route; on Vercel it is only the warmup
+function, as the research functions warm themselves when they load (see
+api/agent_loader.py).
+"""
+from http.server import BaseHTTPRequestHandler
+import sys
+import os
+
+os.environ["LANGCHAIN_TRACING_V2"] = "false"
+os.environ["LANGCHAIN_ENDPOINT"] = ""
+os.environ["LANGCHAIN_API_KEY"] = ""
+
+import json
+import time
+import logging
+import traceback
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            started = time.perf_counter()
+            from api.research_agent import warm_up
+            import_seconds = round(time.perf_counter() - started, 4)
+            timings = warm_up()
+
+            self.send_response(200)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                "status": "warm",
+                "timings": {"import": import_seconds, **timings}
+            }).encode())
+
+        except Exception as e:
+            logger.error(f"Warm-up failed: {str(e)}\n{traceback.format_exc()}")
+
+            self.send_response(500)
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(json.dumps({
+                "error": "Warm-up failed",
+                "detail": str(e)
+            }).encode())
+
+    def do_OPTIONS(self):
+        self.send_response(200)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', '*')
+        self.end_headers()
@@ -0,0 +1,72 @@
+"""
+Parser benchmark: lxml/XPath parsers against the original BeautifulSoup ones
+Parses every page in benchmarks/fixtures with both implementations, checks
+that they return identical results and reports p50 time and speedup.
+
+    python benchmarks/parsers.py
+    python benchmarks/parsers.py --iterations 500
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+from typing import Callable, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from api import parsers
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# source -> (BeautifulSoup parser, lxml parser)
+PARSERS = {
+    "bioRxiv": (lambda html: parsers.parse_highwire_soup(html, "https://www.biorxiv.org"),
+                lambda html: parsers.parse_highwire_lxml(html, "https://www.biorxiv.org")),
+    "medRxiv": (lambda html: parsers.parse_highwire_soup(html, "https://www.medrxiv.org"),
+                lambda html: parsers.parse_highwire_lxml(html, "https://www.medrxiv.org")),
+    "PubMed": (lambda html: parsers.parse_highwire_soup(html, "https://www.pubmed.org"),
+               lambda html: parsers.parse_highwire_lxml(html, "https://www.pubmed.org")),
+    "SSRN": (parsers.parse_ssrn_soup, parsers.parse_ssrn_lxml),
+    "arXiv": (parsers.parse_arxiv_soup, parsers.parse_arxiv_lxml),
+    "SpringerOpen": (parsers.parse_springeropen_soup, parsers.parse_springeropen_lxml),
+}
+
+
+def time_parser(parse: Callable[[str], list], html: str, iterations: int) -> float:
+    """Median seconds per parse"""
+    samples: List[float] = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        parse(html)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Compare the lxml and BeautifulSoup result parsers")
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args(argv)
+
+    mismatches = []
+    print(f"{'source':<14} {'KiB':>7} {'soup ms':>9} {'lxml ms':>9} {'speedup':>8}")
+    for name, (soup_parse, lxml_parse) in PARSERS.items():
+        with open(os.path.join(FIXTURES_DIR, f"{name}.html"), encoding="utf-8") as f:
+            html = f.read()
+        if soup_parse(html) != lxml_parse(html):
+            mismatches.append(name)
+        soup_seconds = time_parser(soup_parse, html, args.iterations)
+        lxml_seconds = time_parser(lxml_parse, html, args.iterations)
+        print(f"{name:<14} {len(html) / 1024:>7.1f} {soup_seconds * 1000:>9.2f} {lxml_seconds * 1000:>9.2f} "
+              f"{soup_seconds / lxml_seconds:>7.1f}x")
+
+    if mismatches:
+        print(f"Parsers disagree on: {', '.join(mismatches)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
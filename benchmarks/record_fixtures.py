@@ -0,0 +1,51 @@
+"""
+Record live search pages into benchmarks/fixtures for the offline benchmarks
+Fetches each source's search page for a topic through the same URL templates
+and headers the scrapers use, and overwrites <source>.html. Needs network access.
+
+    python benchmarks/record_fixtures.py "quantum dots"
+    python benchmarks/record_fixtures.py "minimum wage" --source SSRN
+"""
+
+import os
+import sys
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Record live search pages as benchmark fixtures")
+    parser.add_argument("topic")
+    parser.add_argument("--source", action="append", help="only record these sources (repeatable)")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("AZURE_OPENAI_ENDPOINT", "http://localhost")
+    os.environ.setdefault("AZURE_OPENAI_KEY", "record")
+    from api.http_pool import get_session
+    from api.source_registry import get_source_registry
+
+    failed = 0
+    for source in get_source_registry():
+        name = source.name
+        if args.source and name not in args.source:
+            continue
+        try:
+            # Same query encoding as the research tools
+            res = get_session().get(source.url(source.query(args.topic)), headers=source.headers, timeout=30)
+            res.raise_for_status()
+        except Exception as e:
+            print(f"{name}: failed ({e})")
+            failed += 1
+            continue
+        with open(os.path.join(FIXTURES_DIR, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(res.text)
+        print(f"{name}: {len(res.text)} chars, {len(source.parse(res.text))} parsed results")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,253 @@
+"""
+Offline benchmark suite for the research pipeline
+Runs the HTML parsers against the pages in benchmarks/fixtures, each graph node alone and
+run_research end to end (sequential, threaded and asyncio) against the local
+stub in benchmarks/stub_server.py, with no network access. Reports p50/p95
+latency, throughput and peak Python memory per benchmark.
+
+    python benchmarks/run.py
+    python benchmarks/run.py --suite parsers --iterations 200
+    python benchmarks/run.py --llm-latency 0.5 --source-latency 0.3 --json results.json
+    python benchmarks/run.py --compare results.json --tolerance 0.2
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_server import FIXTURES_DIR, RESPONSES_PATH, SOURCES_PATH, StubSettings, start_stub_server
+
+SUITES = ("parsers", "nodes", "pipeline")
+TOPIC = "quantum dot photonic coherence"
+# Sub-millisecond swings are timer noise, not regressions
+MIN_REGRESSION_MS = 0.5
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def measure(name: str, fn: Callable[[], object], iterations: int, concurrency: int = 1) -> Dict[str, float]:
+    """Time fn over iterations (concurrency at a time), then trace one extra call for peak memory"""
+    fn()  # warm-up: lazy imports, pools, compiled graphs
+    samples = []
+
+    def timed():
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+
+    gc.collect()
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for _ in range(iterations):
+            timed()
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for future in [executor.submit(timed) for _ in range(iterations)]:
+                future.result()
+    wall = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return summarize(name, samples, wall, peak, concurrency)
+
+
+def measure_async(name: str, fn: Callable[[], object], iterations: int, concurrency: int) -> Dict[str, float]:
+    """Like measure() for a coroutine function, with concurrency tasks in flight on one loop"""
+    samples = []
+
+    async def timed():
+        started = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - started)
+
+    async def run_all():
+        from api.http_pool import close_async_session
+        await fn()
+        samples.clear()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded():
+            async with semaphore:
+                await timed()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(bounded() for _ in range(iterations)))
+        wall = time.perf_counter() - started
+        tracemalloc.start()
+        await fn()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await close_async_session()
+        return wall, peak
+
+    gc.collect()
+    wall, peak = asyncio.run(run_all())
+    return summarize(name, samples, wall, peak, concurrency)
+
+
+def summarize(name: str, samples: List[float], wall: float, peak: int, concurrency: int) -> Dict[str, float]:
+    return {
+        "name": name,
+        "iterations": len(samples),
+        "concurrency": concurrency,
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3),
+        "throughput_per_s": round(len(samples) / wall, 2) if wall else 0.0,
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def point_sources_at(agent, base_url: str):
+    """Send every scraper to the stub instead of the live site"""
+    for source in agent.get_source_registry():
+        source.url_template = f"{base_url}{SOURCES_PATH}{source.name}?query={{query}}"
+
+
+def parser_benchmarks(agent, iterations: int) -> List[Dict[str, float]]:
+    results = []
+    for source in agent.get_source_registry():
+        with open(os.path.join(FIXTURES_DIR, f"{source.name}.html"), encoding="utf-8") as f:
+            html = f.read()
+        results.append(measure(f"parse/{source.name}", lambda: source.parse(html), iterations))
+    return results
+
+
+def node_benchmarks(agent, iterations: int) -> List[Dict[str, float]]:
+    state = agent.run_research(TOPIC)
+    buckets = {
+        "medicine": "medicine and health sciences",
+        "social": "social sciences",
+        "multi": "science and technology",
+    }
+    llm_classify = agent.classify_prompt | agent.get_llm()
+    results = [
+        measure("node/classify (local)", lambda: agent.classify_field({**state, "field": ""}), iterations),
+        measure("node/classify (llm)", lambda: llm_classify.invoke({"topic": TOPIC}), iterations),
+    ]
+    for bucket, field in buckets.items():
+        results.append(measure(f"node/fetch ({bucket})", lambda: agent.fetch_data({**state, "field": field}), iterations))
+    results += [
+        measure("node/select", lambda: agent.select_relevant(dict(state)), iterations),
+        measure("node/summarise", lambda: agent.summarise(dict(state)), iterations),
+        measure("node/draft", lambda: agent.draft(dict(state)), iterations),
+        measure("node/write (pipelined)", lambda: agent.write_pipelined(dict(state)), iterations),
+        measure("node/write (fused)", lambda: agent.write_fused(dict(state)), iterations),
+    ]
+    return results
+
+
+def pipeline_benchmarks(agent, iterations: int, concurrency: int) -> List[Dict[str, float]]:
+    return [
+        measure("run_research", lambda: agent.run_research(TOPIC), iterations),
+        measure(f"run_research x{concurrency} threads", lambda: agent.run_research(TOPIC), iterations, concurrency),
+        measure_async(f"arun_research x{concurrency} tasks", lambda: agent.arun_research(TOPIC), iterations, concurrency),
+    ]
+
+
+def print_table(results: List[Dict[str, float]]):
+    print(f"{'benchmark':<36} {'n':>5} {'p50 ms':>10} {'p95 ms':>10} {'ops/s':>9} {'peak KiB':>10}")
+    for r in results:
+        print(f"{r['name']:<36} {r['iterations']:>5} {r['p50_ms']:>10.2f} {r['p95_ms']:>10.2f} "
+              f"{r['throughput_per_s']:>9.2f} {r['peak_memory_kib']:>10.1f}")
+
+
+def compare(results: List[Dict[str, float]], baseline_path: str, tolerance: float) -> List[str]:
+    """Names of benchmarks whose p50 got slower than the baseline by more than tolerance"""
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    regressions = []
+    for r in results:
+        before = baseline.get(r["name"])
+        if before and r["p50_ms"] > before["p50_ms"] * (1 + tolerance) \
+                and r["p50_ms"] - before["p50_ms"] > MIN_REGRESSION_MS:
+            regressions.append(f"{r['name']}: p50 {before['p50_ms']:.2f} -> {r['p50_ms']:.2f} ms")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the research pipeline")
+    parser.add_argument("--suite", choices=SUITES + ("all",), default="all")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--parser-iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--source-latency", type=float, default=0.05)
+    parser.add_argument("--output-words", type=int, default=150)
+    parser.add_argument("--with-cache", action="store_true",
+                        help="leave the source and LLM caches and the article index enabled")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown against --compare")
+    args = parser.parse_args(argv)
+
+    settings = StubSettings(args.llm_latency, args.token_delay, args.source_latency, args.output_words)
+    server, base_url = start_stub_server(settings)
+
+    # Configuration is read at import time, so it has to be in place before api.* loads
+    os.environ["AZURE_OPENAI_ENDPOINT"] = f"{base_url}{RESPONSES_PATH}"
+    os.environ["AZURE_OPENAI_KEY"] = "benchmark"
+    # Every stub source is on one host, which the per-host limit would otherwise throttle
+    os.environ.setdefault("SOURCE_HOST_CONCURRENCY", "0")
+    # On-disk stores live in a throwaway directory so stub articles, topics and
+    # checkpoints never reach the production files in the shared tempdir
+    store_dir = tempfile.TemporaryDirectory(prefix="research-bench-")
+    for setting, filename in (("SOURCE_CACHE_PATH", "sources.sqlite3"), ("LLM_CACHE_PATH", "llm.sqlite3"),
+                              ("ARTICLE_INDEX_PATH", "articles.sqlite3"), ("TOPIC_LOG_PATH", "topics.sqlite3"),
+                              ("CHECKPOINT_PATH", "checkpoints.sqlite3")):
+        os.environ[setting] = os.path.join(store_dir.name, filename)
+    # Checkpoints and the request log are bookkeeping, not part of what is measured
+    os.environ["CHECKPOINT_ENABLED"] = "false"
+    os.environ["TOPIC_LOG_ENABLED"] = "false"
+    if not args.with_cache:
+        os.environ["LLM_CACHE_ENABLED"] = "false"
+        os.environ["SOURCE_CACHE_TTL"] = "0"
+        os.environ["ARTICLE_INDEX_ENABLED"] = "false"
+    import api.research_agent as agent
+    point_sources_at(agent, base_url)
+
+    suites = SUITES if args.suite == "all" else (args.suite,)
+    results = []
+    if "parsers" in suites:
+        results += parser_benchmarks(agent, args.parser_iterations)
+    if "nodes" in suites:
+        results += node_benchmarks(agent, args.iterations)
+    if "pipeline" in suites:
+        results += pipeline_benchmarks(agent, args.iterations, args.concurrency)
+    server.shutdown()
+    store_dir.cleanup()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
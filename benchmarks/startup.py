@@ -0,0 +1,104 @@
+"""
+Cold-start benchmark for the serverless handlers
+Imports each handler in a fresh interpreter under `python -X importtime`,
+reports the heaviest modules it pulls in and exits non-zero when a handler's
+cold import goes over the budget.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 150 --top 15
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HANDLERS = ["api.index", "api.health", "api.research", "api.research_stream", "api.research_batch", "api.warmup"]
+
+# Budget for importing one handler module in a cold interpreter
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "300"))
+
+# Only reported: what the first real request pays on top of the handler import
+FIRST_USE_SNIPPET = """
+import time
+started = time.perf_counter()
+import api.research_agent as agent
+imported = time.perf_counter()
+agent.get_graph()
+print(f"{(imported - started) * 1000:.1f} {(time.perf_counter() - imported) * 1000:.1f}")
+"""
+
+
+def import_times(module: str) -> Dict[str, Tuple[float, float]]:
+    """Import module in a fresh interpreter; returns {module: (self ms, cumulative ms)}
+    for it and everything it pulled in (interpreter startup imports are left out)"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+        # The handler's background warm-up would be timed along with its own import
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1", "RESEARCH_WARM_ON_LOAD": "false"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us) / 1000.0, int(cumulative_us) / 1000.0)
+        # Nested imports are indented and listed before their parent, so an
+        # unindented line closes a top-level import: keep only the last one's tree
+        if not name[1:].startswith(" ") and name.strip() != module:
+            times = {}
+    return times
+
+
+def first_use() -> Tuple[float, float]:
+    """(ms to import api.research_agent, ms to compile the graph) in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_USE_SNIPPET], cwd=ROOT, capture_output=True, text=True,
+        env={**os.environ, "AZURE_OPENAI_ENDPOINT": os.getenv("AZURE_OPENAI_ENDPOINT", "http://localhost"),
+             "AZURE_OPENAI_KEY": os.getenv("AZURE_OPENAI_KEY", "benchmark")}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Compiling the research graph failed:\n{result.stderr[-2000:]}")
+    import_ms, compile_ms = result.stdout.strip().splitlines()[-1].split()
+    return float(import_ms), float(compile_ms)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=3, help="cold imports per handler; the median is reported")
+    parser.add_argument("--top", type=int, default=10, help="heaviest modules listed per handler")
+    parser.add_argument("--skip-first-use", action="store_true", help="do not time the agent import and graph compile")
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    for handler in HANDLERS:
+        runs = [import_times(handler) for _ in range(max(1, args.repeat))]
+        total = statistics.median(run[handler][1] for run in runs)
+        status = "ok" if total <= args.budget_ms else "OVER BUDGET"
+        print(f"{handler:<24} {total:8.1f} ms  (budget {args.budget_ms:.0f} ms)  {status}")
+        heaviest = sorted(runs[-1].items(), key=lambda item: item[1][1], reverse=True)
+        for name, (_, cumulative) in [item for item in heaviest if item[0] != handler][:args.top]:
+            print(f"    {name:<40} {cumulative:8.1f} ms")
+        if total > args.budget_ms:
+            over_budget.append(handler)
+
+    if not args.skip_first_use:
+        import_ms, compile_ms = first_use()
+        print(f"first request: import api.research_agent {import_ms:.1f} ms, compile graph {compile_ms:.1f} ms")
+
+    if over_budget:
+        print(f"Cold start over budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
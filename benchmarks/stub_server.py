@@ -0,0 +1,165 @@
+"""
+Local stand-in for the Azure Responses API and the scraped source sites
+POST /openai/responses answers like the Responses API (plain JSON or a
+server-sent event stream) after a configurable latency; GET /sources/<name>
+serves benchmarks/fixtures/<name>.html. Used by benchmarks/run.py, or on its own:
+
+    python benchmarks/stub_server.py --port 8765 --llm-latency 0.5 --source-latency 0.2
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+RESPONSES_PATH = "/openai/responses"
+SOURCES_PATH = "/sources/"
+
+
+class StubSettings:
+    """Latency and payload knobs, adjustable while the server is running"""
+
+    def __init__(self, llm_latency: float = 0.2, token_delay: float = 0.0, source_latency: float = 0.1,
+                 output_words: int = 150, source_latencies: Optional[Dict[str, float]] = None):
+        self.llm_latency = llm_latency
+        self.token_delay = token_delay
+        self.source_latency = source_latency
+        self.source_latencies = source_latencies or {}
+        self.output_words = output_words
+        self.requests = 0
+
+    def output_text(self, prompt: str) -> str:
+        """Canned model output shaped like what each node expects"""
+        if "Classify the topic" in prompt:
+            return "computer science"
+        if "Select the top 3" in prompt:
+            return json.dumps([
+                {"title": f"Benchmark article {i}", "url": f"https://example.org/{i}", "reason": "benchmark"}
+                for i in range(3)
+            ])
+        words = ("benchmark output text for the research agent pipeline " * (self.output_words // 8 + 1)).split()
+        text = " ".join(words[:self.output_words])
+        if "=== ARTICLE ===" in prompt:
+            return f"=== SUMMARY ===\n{text}\n\n=== ARTICLE ===\n{text}"
+        return text
+
+
+def load_fixtures() -> Dict[str, bytes]:
+    fixtures = {}
+    for filename in os.listdir(FIXTURES_DIR):
+        if filename.endswith(".html"):
+            with open(os.path.join(FIXTURES_DIR, filename), "rb") as f:
+                fixtures[filename[:-len(".html")]] = f.read()
+    return fixtures
+
+
+def build_handler(settings: StubSettings, fixtures: Dict[str, bytes]):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, content_type: str, body: bytes):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def do_GET(self):
+            path = urlparse(self.path).path
+            name = path[len(SOURCES_PATH):] if path.startswith(SOURCES_PATH) else None
+            if name not in fixtures:
+                self._send(404, "text/plain", b"not found")
+                return
+            settings.requests += 1
+            time.sleep(settings.source_latencies.get(name, settings.source_latency))
+            self._send(200, "text/html; charset=utf-8", fixtures[name])
+
+        def do_POST(self):
+            if urlparse(self.path).path != RESPONSES_PATH:
+                self._send(404, "text/plain", b"not found")
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            settings.requests += 1
+            text = settings.output_text(str(body.get("input", "")))
+            output = [{"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": text}]}]
+            usage = {"input_tokens": len(str(body.get("input", ""))) // 4, "output_tokens": len(text) // 4}
+            time.sleep(settings.llm_latency)
+
+            if not body.get("stream"):
+                self._send(200, "application/json", json.dumps({"output": output, "usage": usage}).encode())
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for word in text.split(" "):
+                event = {"type": "response.output_text.delta", "delta": word + " "}
+                self._chunk(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+                if settings.token_delay:
+                    time.sleep(settings.token_delay)
+            event = {"type": "response.completed", "response": {"output": output, "usage": usage}}
+            self._chunk(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+            self.wfile.write(b"0\r\n\r\n")
+
+    return StubHandler
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Streaming scrapers hang up once they have enough results
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def start_stub_server(settings: Optional[StubSettings] = None, host: str = "127.0.0.1",
+                      port: int = 0) -> Tuple[StubServer, str]:
+    """Serve the stub on a daemon thread; returns the server and its base URL"""
+    settings = settings or StubSettings()
+    server = StubServer((host, port), build_handler(settings, load_fixtures()))
+    server.settings = settings
+    threading.Thread(target=server.serve_forever, name="benchmark-stub", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stub Responses API and source sites for benchmarks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="seconds before each model response")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="seconds between streamed words")
+    parser.add_argument("--source-latency", type=float, default=0.1, help="seconds before each source page")
+    parser.add_argument("--output-words", type=int, default=150, help="words in summary/draft outputs")
+    args = parser.parse_args(argv)
+
+    settings = StubSettings(args.llm_latency, args.token_delay, args.source_latency, args.output_words)
+    server, base_url = start_stub_server(settings, args.host, args.port)
+    print(f"Responses API: {base_url}{RESPONSES_PATH}")
+    print(f"Sources:       {base_url}{SOURCES_PATH}<name>  ({', '.join(sorted(load_fixtures()))})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
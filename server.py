@@ -0,0 +1,304 @@
+"""
+Standalone HTTP server for running the API outside Vercel
+Mounts every handler in api/ under the same routes as vercel.json, in one
+long-lived process (or several pre-forked ones sharing the listening socket)
+so caches, HTTP pools, compiled graphs and models stay warm across requests.
+
+Each worker serves requests from a bounded thread pool. SIGTERM or SIGINT
+stops accepting connections and lets in-flight requests finish, for up to
+SERVER_SHUTDOWN_TIMEOUT seconds. In-process caches are per worker; the sqlite
+or redis cache backends share them across workers.
+
+    python server.py
+    python server.py --port 8080 --workers 4 --threads 64
+"""
+
+import os
+import re
+import sys
+import time
+import signal
+import socket
+import logging
+import argparse
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, ROOT)
+
+logger = logging.getLogger(__name__)
+
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+# Worker processes (0 = one per CPU) and request threads per worker
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", "1"))
+SERVER_THREADS = int(os.getenv("SERVER_THREADS", "32"))
+# Connections the kernel queues while every thread is busy (a worker only
+# accepts a connection once one of its threads is free)
+SERVER_BACKLOG = int(os.getenv("SERVER_BACKLOG", "128"))
+SERVER_SHUTDOWN_TIMEOUT = float(os.getenv("SERVER_SHUTDOWN_TIMEOUT", "30"))
+
+# Same routing as vercel.json: first match wins
+ROUTES: List[Tuple[str, str]] = [
+    (r"^/api/health$", "api.health"),
+    (r"^/api/metrics$", "api.metrics"),
+    (r"^/api/warmup$", "api.warmup"),
+    (r"^/api/research/batch$", "api.research_batch"),
+    (r"^/api/research/stream(/.*)?$", "api.research_stream"),
+    (r"^/api/research/(.+)$", "api.research"),
+    (r"^/api/?$", "api.index"),
+]
+
+
+def load_routes() -> List[Tuple["re.Pattern", type]]:
+    """Import every handler module; each route gets a RoutedHandler subclass of its handler"""
+    routes = []
+    for pattern, module in ROUTES:
+        handler = importlib.import_module(module).handler
+        routed = type(f"Routed_{module.rsplit('.', 1)[1]}", (RoutedHandler, handler), {})
+        routes.append((re.compile(pattern), routed))
+    return routes
+
+
+class RoutedHandler(BaseHTTPRequestHandler):
+    """Reads the request line, then becomes the handler class of the matching
+    route for the rest of the request"""
+
+    routes: List[Tuple["re.Pattern", type]] = []
+
+    def handle_one_request(self):
+        try:
+            self.raw_requestline = self.rfile.readline(65537)
+            if len(self.raw_requestline) > 65536:
+                self.send_error(414)
+                return
+            if not self.raw_requestline:
+                self.close_connection = True
+                return
+            if not self.parse_request():
+                return
+            path = self.path.split("?", 1)[0]
+            routed = next((cls for pattern, cls in self.routes if pattern.match(path)), None)
+            if routed is None:
+                self.send_error(404, "Not Found")
+                return
+            self.__class__ = routed
+            method = getattr(self, f"do_{self.command}", None)
+            if method is None:
+                self.send_error(501, f"Unsupported method ({self.command!r})")
+                return
+            method()
+            self.wfile.flush()
+        except socket.timeout as e:
+            self.log_error("Request timed out: %r", e)
+            self.close_connection = True
+
+    def log_message(self, format, *args):
+        sys.stderr.write(f"[{os.getpid()}] {self.address_string()} - {format % args}\n")
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer handing each connection to a bounded thread pool
+
+    A connection is only accepted once a thread is free to serve it, so the
+    surplus waits in the kernel's listen backlog (or is taken by another
+    worker) instead of queueing without limit inside this process.
+    """
+
+    allow_reuse_address = True
+    request_queue_size = SERVER_BACKLOG
+
+    def __init__(self, address, handler_class, threads: int = SERVER_THREADS, bind_and_activate: bool = True):
+        super().__init__(address, handler_class, bind_and_activate)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="http")
+        self._slots = threading.BoundedSemaphore(max(1, threads))
+        self._stopping = threading.Event()
+        self._active = 0
+        self._idle = threading.Condition()
+
+    def get_request(self):
+        # Wait for a free thread before accepting; shutdown() can interrupt the wait
+        while not self._slots.acquire(timeout=0.5):
+            if self._stopping.is_set():
+                raise OSError("server is shutting down")
+        try:
+            return super().get_request()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def shutdown_request(self, request):
+        try:
+            super().shutdown_request(request)
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        self._stopping.set()
+        super().shutdown()
+
+    def process_request(self, request, client_address):
+        with self._idle:
+            self._active += 1
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            with self._idle:
+                self._active -= 1
+                self._idle.notify_all()
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-stream are routine
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def drain(self, timeout: float) -> bool:
+        """Stop listening and wait up to timeout for the requests in flight; False if some are still running"""
+        self.server_close()
+        with self._idle:
+            finished = self._idle.wait_for(lambda: self._active == 0, timeout)
+        self.executor.shutdown(wait=finished)
+        return finished
+
+
+def warm_worker():
+    """Build this worker's shared clients, caches and graphs before it takes requests"""
+    started = time.perf_counter()
+    try:
+        from api.research_agent import warm_up
+        timings = warm_up()
+    except Exception as e:
+        logger.warning("[%d] warm-up failed (%s); continuing cold", os.getpid(), e)
+        return
+    logger.info("[%d] warm in %.2fs: %s", os.getpid(), time.perf_counter() - started, timings)
+
+
+def serve(server: PooledHTTPServer, shutdown_timeout: float = SERVER_SHUTDOWN_TIMEOUT) -> bool:
+    """Run one worker until SIGTERM/SIGINT, then drain it; False if requests
+    were still running when shutdown_timeout ran out"""
+    def stop(*_):
+        # shutdown() waits for serve_forever, which runs on this (the signal handler's) thread
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    warm_worker()
+    logger.info("[%d] serving on %s:%d", os.getpid(), server.server_address[0], server.server_address[1])
+    server.serve_forever()
+    logger.info("[%d] draining", os.getpid())
+    drained = server.drain(shutdown_timeout)
+    if not drained:
+        logger.warning("[%d] requests still running after %.0fs, exiting anyway", os.getpid(), shutdown_timeout)
+    return drained
+
+
+def exit_now(code: int):
+    """Exit without joining request threads that are still running"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(code)
+
+
+def run_workers(server: PooledHTTPServer, workers: int, shutdown_timeout: float) -> int:
+    """Fork workers sharing the listening socket, replacing any that die, until signalled"""
+    children: Dict[int, int] = {}
+    stopping = threading.Event()
+
+    def spawn(slot: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                serve(server, shutdown_timeout)
+                code = 0
+            finally:
+                exit_now(code)
+        children[pid] = slot
+
+    def stop(*_):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for slot in range(workers):
+        spawn(slot)
+
+    while not stopping.is_set():
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid and not stopping.is_set():
+            logger.warning("Worker %d exited with status %d, restarting", pid, status)
+            spawn(children.pop(pid))
+        stopping.wait(0.5)
+
+    for pid in children:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+    # Workers give up on their own after shutdown_timeout; this is the backstop
+    expires = time.monotonic() + shutdown_timeout + 5
+    while children and time.monotonic() < expires:
+        pid, _ = os.waitpid(-1, os.WNOHANG)
+        if pid:
+            children.pop(pid, None)
+        else:
+            time.sleep(0.1)
+    for pid in children:
+        logger.warning("Worker %d still busy after %.0fs, killing it", pid, shutdown_timeout)
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+    server.socket.close()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the research API from long-lived worker processes")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS, help="processes (0 = one per CPU)")
+    parser.add_argument("--threads", type=int, default=SERVER_THREADS, help="request threads per process")
+    parser.add_argument("--backlog", type=int, default=SERVER_BACKLOG)
+    parser.add_argument("--shutdown-timeout", type=float, default=SERVER_SHUTDOWN_TIMEOUT)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if workers > 1 and not hasattr(os, "fork"):
+        logger.warning("Multiple workers need os.fork; running a single worker")
+        workers = 1
+
+    # Workers warm themselves in serve(); no handler may start a thread before the fork
+    os.environ["RESEARCH_WARM_ON_LOAD"] = "false"
+    # Handler modules and the agent are imported once before forking so workers
+    # share those pages; connections, pools and caches are built per worker
+    RoutedHandler.routes = load_routes()
+    try:
+        importlib.import_module("api.research_agent")
+    except Exception as e:
+        logger.warning("Could not import the research agent (%s); research routes will report it", e)
+    PooledHTTPServer.request_queue_size = args.backlog
+    server = PooledHTTPServer((args.host, args.port), RoutedHandler, args.threads)
+
+    if workers == 1:
+        if not serve(server, args.shutdown_timeout):
+            exit_now(0)
+        return 0
+    logger.info("Starting %d workers on %s:%d", workers, args.host, args.port)
+    return run_workers(server, workers, args.shutdown_timeout)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+from types import SimpleNamespace
+
+import pytest
+
+from api import article_index
+from api.article_index import ArticleIndex, match_query
+
+
+def article(n, title, abstract="", **extra):
+    return {"title": title, "abstract": abstract, "url": f"https://example.org/{n}", **extra}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(article_index, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def index(tmp_path, clock):
+    return ArticleIndex(str(tmp_path / "articles.sqlite3"), max_age=100, min_hits=2)
+
+
+def test_match_query_quotes_every_term():
+    assert match_query('The "graph" NEAR networks NOT graph') == '"graph" "near" "networks" "not"'
+    assert match_query("the of") is None
+
+
+def test_search_requires_every_term_and_keeps_records(index):
+    graph = article(1, "Graph neural networks", "message passing", authors="Ada")
+    index.add("arXiv", [graph, article(2, "Graph theory"), article(3, "Neural networks for vision")])
+    assert index.search("arXiv", "graph networks") == [graph]
+    # porter stemming matches word forms
+    assert index.search("arXiv", "graphs network") == [graph]
+    assert index.search("bioRxiv", "graph networks") == []
+    assert index.search("arXiv", "the") == []
+
+
+def test_placeholders_and_articles_without_url_are_not_indexed(index):
+    index.add("arXiv", [{"error": "graph timed out"}, {"note": "graph"}, {"title": "Graph", "url": ""}])
+    assert index.stats()["articles"] == 0
+
+
+def test_add_upserts_on_url(index):
+    index.add("arXiv", [article(1, "Graph networks", "first")])
+    index.add("SSRN", [article(1, "Graph networks", "second")])
+    assert index.stats()["articles"] == 1
+    assert index.search("arXiv", "graph") == []
+    assert index.search("SSRN", "graph")[0]["abstract"] == "second"
+
+
+def test_stale_articles_are_not_served_and_get_dropped(index, clock):
+    index.add("arXiv", [article(1, "Graph networks")])
+    clock.now += 101
+    assert index.search("arXiv", "graph") == []
+    index.add("arXiv", [article(2, "Graph theory")])
+    assert index.stats()["articles"] == 1
+
+
+def test_lookup_needs_min_hits(index):
+    index.add("arXiv", [article(1, "Graph networks")])
+    assert index.lookup("arXiv", "graph") is None
+    index.add("arXiv", [article(2, "Graph theory")])
+    assert len(index.lookup("arXiv", "graph")) == 2
+    assert index.stats() == {"articles": 2, "hits": 1, "misses": 1, "hit_ratio": 0.5}
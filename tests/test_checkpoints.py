@@ -0,0 +1,79 @@
+import time
+
+import pytest
+
+from api.checkpoints import CheckpointStore, valid_run_id
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl=60)
+
+
+def test_valid_run_id():
+    assert valid_run_id("retry-1_a")
+    assert not valid_run_id("")
+    assert not valid_run_id("../etc")
+    assert not valid_run_id("x" * 65)
+
+
+def test_saved_state_is_loaded_for_same_run_and_topic(store):
+    store.save("run", "fetch", "Quantum  Computing", {"topic": "Quantum Computing", "fetched_data": {"arXiv": []}})
+    assert store.load("run", "fetch", "quantum computing") == {"topic": "Quantum Computing",
+                                                               "fetched_data": {"arXiv": []}}
+    assert store.load("run", "select", "quantum computing") is None
+    assert store.load("other", "fetch", "quantum computing") is None
+    # a run id reused for another topic does not resume
+    assert store.load("run", "fetch", "protein folding") is None
+
+
+def test_expired_checkpoints_are_not_loaded(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.sqlite3"), ttl=0.05)
+    store.save("run", "fetch", "topic", {"topic": "topic"})
+    time.sleep(0.06)
+    assert store.load("run", "fetch", "topic") is None
+
+
+def test_clear_one_run(store):
+    store.save("a", "fetch", "topic", {"topic": "topic"})
+    store.save("b", "fetch", "topic", {"topic": "topic"})
+    store.clear("a")
+    assert store.load("a", "fetch", "topic") is None
+    assert store.load("b", "fetch", "topic") is not None
+
+
+def test_retried_run_resumes_after_completed_nodes(store, monkeypatch):
+    from api import research_agent
+
+    monkeypatch.setattr(research_agent, "get_checkpoint_store", lambda: store)
+    calls = []
+
+    def node(name, fail=False):
+        def fn(state):
+            calls.append(name)
+            if fail:
+                raise RuntimeError(f"{name} failed")
+            return {**state, name: True}
+        return research_agent._checkpointed_node(name, fn)
+
+    config = {"configurable": {"run_id": "retry"}}
+    state = node("classify")({"topic": "topic"}, config)
+    with pytest.raises(RuntimeError):
+        node("fetch", fail=True)(state, config)
+
+    # the retry gets classify's state back and only re-runs fetch
+    state = node("classify")({"topic": "topic"}, config)
+    state = node("fetch")(state, config)
+    assert calls == ["classify", "fetch", "fetch"]
+    assert state == {"topic": "topic", "classify": True, "fetch": True}
+
+    research_agent._completed("retry")
+    assert store.load("retry", "classify", "topic") is None
+
+
+def test_runs_without_run_id_are_not_checkpointed(store, monkeypatch):
+    from api import research_agent
+
+    monkeypatch.setattr(research_agent, "get_checkpoint_store", lambda: store)
+    research_agent._checkpointed_node("classify", lambda state: state)({"topic": "topic"}, {"configurable": {}})
+    assert store._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0] == 0
@@ -0,0 +1,201 @@
+import os
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from api import deadline, research_agent
+from api.article_index import ArticleIndex
+from api.deadline import Deadline, LatencyTracker, deadline_scope
+from api.http_pool import close_async_session
+from api.parsers import parse_arxiv_soup
+from api.source_cache import CACHE_HIT, CACHE_MISS, MemoryBackend, SourceCache
+from api.source_registry import CircuitBreaker, default_adapters
+
+ARXIV_PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "benchmarks", "fixtures", "arXiv.html")
+
+ARTICLES = [{"title": "Graph networks", "url": "https://example.org/1", "abstract": "graph networks"}]
+
+
+class RecordingCache(SourceCache):
+    """SourceCache noting the thread of every read and write"""
+
+    def __init__(self):
+        super().__init__(MemoryBackend(), default_ttl=60)
+        self.threads = []
+
+    def get(self, source, topic):
+        self.threads.append(threading.current_thread())
+        return super().get(source, topic)
+
+    def set(self, source, topic, results):
+        self.threads.append(threading.current_thread())
+        super().set(source, topic, results)
+
+
+@pytest.fixture
+def sources(monkeypatch, tmp_path):
+    """Fresh cache, index, breakers, latency tracker and fetch pool for sources named A and B"""
+    env = SimpleNamespace(
+        cache=RecordingCache(),
+        index=ArticleIndex(str(tmp_path / "articles.sqlite3"), min_hits=1),
+        registry={name: SimpleNamespace(breaker=CircuitBreaker(name, enabled=False)) for name in "AB"},
+        tracker=LatencyTracker(),
+    )
+    monkeypatch.setattr(research_agent, "get_source_cache", lambda: env.cache)
+    monkeypatch.setattr(research_agent, "get_article_index", lambda: env.index)
+    monkeypatch.setattr(research_agent, "get_source_registry", lambda: env.registry)
+    monkeypatch.setattr(research_agent, "get_latency_tracker", lambda: env.tracker)
+    executor = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(research_agent, "get_fetch_executor", lambda: executor)
+    yield env
+    executor.shutdown(wait=False)
+
+
+def test_async_cache_and_index_io_runs_off_the_event_loop(sources):
+    async def scrape(budget):
+        return ARTICLES
+
+    first = asyncio.run(research_agent.afan_out("graph networks", {"A": scrape}))
+    second = asyncio.run(research_agent.afan_out("graph networks", {"A": scrape}))
+    assert first["A"] == second["A"] == ARTICLES
+    assert first[research_agent.CACHE_STATUS_KEY] == {"A": CACHE_MISS}
+    assert second[research_agent.CACHE_STATUS_KEY] == {"A": CACHE_HIT}
+    assert sources.cache.threads and threading.main_thread() not in sources.cache.threads
+    assert sources.index.search("A", "graph networks") == ARTICLES
+
+
+@pytest.fixture
+def release():
+    """Wakes blocked sync scrapers at teardown so no pool thread outlives the test"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def scraper(asynchronous, delays, calls, release):
+    """Scraper whose nth call answers after delays[n] seconds, recording the budget
+    of every call; the answer names the attempt that produced it"""
+    def attempt(budget):
+        n = len(calls)
+        calls.append(budget)
+        return delays[min(n, len(delays) - 1)], [{"title": f"attempt {n}", "url": f"https://example.org/{n}"}]
+
+    if asynchronous:
+        async def scrape(budget):
+            delay, articles = attempt(budget)
+            await asyncio.sleep(delay)
+            return articles
+    else:
+        def scrape(budget):
+            delay, articles = attempt(budget)
+            release.wait(delay)
+            return articles
+    return scrape
+
+
+def run_fan_out(asynchronous, scrapers):
+    if asynchronous:
+        return asyncio.run(research_agent.afan_out("graph networks", scrapers))
+    return research_agent.fan_out("graph networks", scrapers)
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_slow_source_times_out_at_the_deadline(sources, release, asynchronous):
+    slow, fast = [], []
+    scrapers = {"A": scraper(asynchronous, [5], slow, release), "B": scraper(asynchronous, [0], fast, release)}
+    started = time.monotonic()
+    with deadline_scope(Deadline(0.3)):
+        results = run_fan_out(asynchronous, scrapers)
+    assert time.monotonic() - started < 2
+    assert results["A"][0]["timed_out"] and "A timed out" in results["A"][0]["error"]
+    assert [article["title"] for article in results["B"]] == ["attempt 0"]
+    assert slow[0] == pytest.approx(0.3, abs=0.1)
+    assert sources.cache.get("A", "graph networks") is None
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_expired_deadline_skips_the_scrape(sources, release, asynchronous):
+    calls = []
+    with deadline_scope(Deadline(0)):
+        results = run_fan_out(asynchronous, {"A": scraper(asynchronous, [0], calls, release)})
+    assert calls == []
+    assert results["A"] == research_agent.timed_out("A", 0.0)
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_slow_source_is_hedged_and_the_first_answer_wins(sources, release, monkeypatch, asynchronous):
+    monkeypatch.setattr(deadline, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(deadline, "HEDGE_MIN_DELAY", 0.05)
+    for _ in range(deadline.HEDGE_MIN_SAMPLES):
+        sources.tracker.record("A", 0.01)
+    calls = []
+    started = time.monotonic()
+    results = run_fan_out(asynchronous, {"A": scraper(asynchronous, [5, 0], calls, release)})
+    assert time.monotonic() - started < 2
+    assert [article["title"] for article in results["A"]] == ["attempt 1"]
+    assert len(calls) == 2 and calls[1] < calls[0]
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_source_without_latency_history_is_not_hedged(sources, release, monkeypatch, asynchronous):
+    monkeypatch.setattr(deadline, "HEDGE_MIN_DELAY", 0.05)
+    calls = []
+    results = run_fan_out(asynchronous, {"A": scraper(asynchronous, [0.2], calls, release)})
+    assert [article["title"] for article in results["A"]] == ["attempt 0"]
+    assert len(calls) == 1
+    assert sources.tracker.average("A") == pytest.approx(0.2, abs=0.15)
+
+
+def test_source_budget_is_bounded_by_its_cap_and_the_deadline(monkeypatch):
+    monkeypatch.setattr(deadline, "_source_timeouts", {"SSRN": 6.0})
+    assert deadline.source_budget("SSRN") == 6.0
+    assert deadline.source_budget("arXiv") == deadline.SOURCE_TIMEOUT_SECONDS
+    assert deadline.source_budget("SSRN", Deadline(2)) == pytest.approx(2, abs=0.1)
+    assert deadline.source_budget("SSRN", Deadline(0)) == 0.0
+
+
+@pytest.fixture
+def arxiv_page(monkeypatch):
+    """The arXiv fixture served locally, with a registry pointing arXiv at it"""
+    with open(ARXIV_PAGE, "rb") as f:
+        page = f.read()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    adapter = next(adapter for adapter in default_adapters() if adapter.name == "arXiv")
+    adapter.url_template = f"http://127.0.0.1:{server.server_address[1]}/arxiv?query={{query}}"
+    monkeypatch.setattr(research_agent, "get_source_registry", lambda: {"arXiv": adapter})
+    yield parse_arxiv_soup(page.decode("utf-8"))
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("streaming", [True, False])
+def test_scrape_source_sync_and_async(arxiv_page, monkeypatch, streaming):
+    monkeypatch.setattr(research_agent, "STREAMING", streaming)
+
+    async def ascrape():
+        try:
+            return await research_agent.ascrape_source("arXiv", "graph", timeout=10)
+        finally:
+            await close_async_session()
+
+    assert research_agent.scrape_source("arXiv", "graph", timeout=10) == arxiv_page
+    assert asyncio.run(ascrape()) == arxiv_page
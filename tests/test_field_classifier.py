@@ -0,0 +1,52 @@
+import pytest
+
+from api import field_classifier, research_agent
+from api.field_classifier import BUCKET_FIELDS, FIELD_CLASSIFIER_THRESHOLD, classify_topic, get_field_classifier
+from api.source_registry import get_source_registry
+
+
+@pytest.mark.parametrize("topic, bucket", [
+    ("cancer immunotherapy", "medicine"),
+    ("mRNA vaccines for malaria", "medicine"),
+    ("minimum wage employment effects", "social"),
+    ("antitrust regulation of big tech", "social"),
+    ("graph neural networks", "multi"),
+    ("quantum error correction", "multi"),
+])
+def test_clear_topics_are_classified_locally(topic, bucket):
+    field, confidence = get_field_classifier().predict(topic)
+    assert field == BUCKET_FIELDS[bucket]
+    assert confidence >= FIELD_CLASSIFIER_THRESHOLD
+    assert classify_topic(topic) == field
+
+
+def test_each_bucket_field_routes_to_its_source_group():
+    registry = get_source_registry()
+    assert {bucket: registry.route(field) for bucket, field in BUCKET_FIELDS.items()} == {
+        "medicine": "medicine", "social": "social", "multi": "multi"
+    }
+
+
+def test_unknown_words_are_left_to_the_llm():
+    assert get_field_classifier().predict("xyzzy plugh")[1] == 0.0
+    assert classify_topic("xyzzy plugh") is None
+    assert classify_topic("") is None
+
+
+def test_disabled_classifier_defers_to_the_llm(monkeypatch):
+    monkeypatch.setattr(field_classifier, "FIELD_CLASSIFIER_ENABLED", False)
+    assert classify_topic("cancer immunotherapy") is None
+
+
+def test_classify_field_calls_the_llm_only_when_unsure(monkeypatch):
+    calls = []
+
+    def routed_invoke(prompt, inputs, node, parse):
+        calls.append(inputs["topic"])
+        return parse("Physics")
+
+    monkeypatch.setattr(research_agent, "_routed_invoke", routed_invoke)
+    assert research_agent.classify_field({"topic": "cancer immunotherapy"})["field"] == BUCKET_FIELDS["medicine"]
+    assert calls == []
+    assert research_agent.classify_field({"topic": "xyzzy plugh"})["field"] == "physics"
+    assert calls == ["xyzzy plugh"]
@@ -0,0 +1,55 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import requests
+
+from api.http_pool import build_adapter, build_retry
+
+
+@pytest.fixture
+def unavailable():
+    """Local server answering every request 503 with a 30 second Retry-After"""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Retry-After", "30")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        do_POST = do_GET
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/", hits
+    server.shutdown()
+    server.server_close()
+
+
+def session_with(retry):
+    session = requests.Session()
+    session.mount("http://", build_adapter(retry=retry))
+    return session
+
+
+def test_status_retries_ignore_retry_after(unavailable):
+    url, hits = unavailable
+    started = time.monotonic()
+    response = session_with(build_retry(total=2)).get(url, timeout=5)
+    assert response.status_code == 503
+    assert len(hits) == 3
+    assert time.monotonic() - started < 5
+
+
+def test_connect_only_never_replays_a_request(unavailable):
+    url, hits = unavailable
+    retry = build_retry(allowed_methods=("POST",), connect_only=True)
+    assert session_with(retry).post(url, timeout=5).status_code == 503
+    assert len(hits) == 1
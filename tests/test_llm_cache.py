@@ -0,0 +1,29 @@
+import time
+
+from api.llm_cache import LLMCache, cache_key
+from api.source_cache import MemoryBackend
+
+
+def test_llm_cache_per_node_ttls_and_savings():
+    cache = LLMCache(MemoryBackend(), default_ttl=60, ttls={"classify": 0.05, "draft": 0})
+    usage = {"input_tokens": 100, "output_tokens": 20}
+    cache.set("gpt-4.1", "prompt", "field", usage, latency=1.5, node="classify")
+    cache.set("gpt-4.1", "draft prompt", "article", usage, node="draft")
+    cache.set("gpt-4.1", "summary prompt", "summary", usage, node="summarise")
+
+    assert cache.get("gpt-4.1", "prompt")["output"] == "field"
+    # same prompt on another model is a different entry
+    assert cache.get("gpt-4.1-mini", "prompt") is None
+    assert cache.get("gpt-4.1", "draft prompt") is None
+    assert cache.get("gpt-4.1", "summary prompt")["output"] == "summary"
+    time.sleep(0.06)
+    assert cache.get("gpt-4.1", "prompt") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 3)
+    assert stats["saved_input_tokens"] == 200 and stats["saved_latency_seconds"] == 1.5
+
+
+def test_cache_key_separates_model_and_input():
+    assert cache_key("a", "bc") != cache_key("ab", "c")
+    assert cache_key("m", "x") == cache_key("m", "x")
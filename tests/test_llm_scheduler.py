@@ -0,0 +1,157 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from api import llm_scheduler
+from api.deadline import Deadline, DeadlineExceeded
+from api.llm_scheduler import BatchScheduler, RateLimiter, TokenBucket, backoff_delay
+
+
+class Throttled(Exception):
+    retryable = True
+    status_code = 429
+
+    def __init__(self, retry_after=None):
+        super().__init__("429")
+        self.retry_after = retry_after
+
+
+class BadRequest(Exception):
+    retryable = False
+    status_code = 400
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "backoff_delay", lambda attempt, retry_after=None: 0.0)
+
+
+def flaky(failures, error=Throttled):
+    """A call failing `failures` times before it returns "ok", and its attempt counter"""
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        if len(attempts) <= failures:
+            raise error()
+        return "ok"
+    return fn, attempts
+
+
+def test_token_bucket_goes_into_debt_and_reports_the_wait():
+    bucket = TokenBucket(per_minute=60)
+    assert bucket.reserve(60, now=bucket.updated) == 0.0
+    # 30 more units at 1 unit/second: a 30s wait
+    assert bucket.reserve(30, now=bucket.updated) == pytest.approx(30.0)
+    assert TokenBucket(per_minute=0).reserve(10 ** 6, now=0) == 0.0
+
+
+def test_rate_limiter_enforces_both_budgets_and_pauses():
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=0)
+    assert limiter.reserve(10) == 0.0
+    assert limiter.reserve(10) == 0.0
+    assert limiter.reserve(10) == pytest.approx(30.0, abs=0.1)
+
+    limiter = RateLimiter(requests_per_minute=0, tokens_per_minute=600)
+    assert limiter.reserve(600) == 0.0
+    assert limiter.reserve(60) == pytest.approx(6.0, abs=0.1)
+
+    limiter = RateLimiter(0, 0)
+    limiter.pause(5)
+    assert limiter.reserve(1) == pytest.approx(5.0, abs=0.1)
+
+
+def test_backoff_honours_retry_after_and_cap():
+    assert 2.0 <= backoff_delay(0, retry_after=2.0, base=0.5) <= 2.5
+    assert backoff_delay(10, base=1.0, cap=3.0) <= 3.0
+
+
+def test_retryable_errors_are_retried(no_backoff):
+    scheduler = BatchScheduler(limiter=RateLimiter(0, 0), max_retries=3)
+    fn, attempts = flaky(2)
+    assert scheduler.call(fn, tokens=10) == "ok"
+    assert len(attempts) == 3
+    assert scheduler.stats() == {"retries": 2, "throttled": 2}
+
+
+def test_final_errors_are_raised(no_backoff):
+    scheduler = BatchScheduler(limiter=RateLimiter(0, 0), max_retries=3)
+    fn, attempts = flaky(5, BadRequest)
+    with pytest.raises(BadRequest):
+        scheduler.call(fn, tokens=10)
+    assert len(attempts) == 1
+
+    fn, attempts = flaky(10)
+    with pytest.raises(Throttled):
+        scheduler.call(fn, tokens=10)
+    assert len(attempts) == 4
+
+
+def test_retry_after_past_the_deadline_is_not_waited_for():
+    scheduler = BatchScheduler(limiter=RateLimiter(0, 0), max_retries=3)
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        raise Throttled(retry_after=5.0)
+
+    started = time.monotonic()
+    with pytest.raises(Throttled):
+        scheduler.call(fn, tokens=10, deadline=Deadline(1.0))
+    assert len(attempts) == 1
+    assert time.monotonic() - started < 0.5
+
+
+def test_rate_limit_wait_past_the_deadline_raises():
+    scheduler = BatchScheduler(limiter=RateLimiter(requests_per_minute=1, tokens_per_minute=0))
+    scheduler.call(lambda: "ok", tokens=1)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.call(lambda: "ok", tokens=1, deadline=Deadline(1.0))
+    assert time.monotonic() - started < 0.5
+
+
+def test_run_keeps_order_and_bounds_concurrency():
+    scheduler = BatchScheduler(max_concurrency=2, limiter=RateLimiter(0, 0))
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def call(i):
+        def fn():
+            with lock:
+                running.append(i)
+                peak.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(i)
+            return i
+        return fn
+
+    assert scheduler.run([call(i) for i in range(8)], [1] * 8) == list(range(8))
+    assert max(peak) == 2
+
+
+def test_run_can_return_exceptions(no_backoff):
+    scheduler = BatchScheduler(limiter=RateLimiter(0, 0), max_retries=0)
+    fn, _ = flaky(1, BadRequest)
+    results = scheduler.run([lambda: "ok", fn], [1, 1], return_exceptions=True)
+    assert results[0] == "ok" and isinstance(results[1], BadRequest)
+
+
+def test_arun_retries_and_keeps_order(no_backoff):
+    scheduler = BatchScheduler(max_concurrency=2, limiter=RateLimiter(0, 0), max_retries=2)
+    attempts = []
+
+    def call(i):
+        async def fn():
+            attempts.append(i)
+            if attempts.count(i) == 1 and i == 1:
+                raise Throttled()
+            return i
+        return fn
+
+    assert asyncio.run(scheduler.arun([call(i) for i in range(3)], [1] * 3)) == [0, 1, 2]
+    assert attempts.count(1) == 2
@@ -0,0 +1,45 @@
+from api.model_router import ModelRouter
+
+
+def make_router(probe_every=4, min_samples=2):
+    return ModelRouter(default="large", node_models={"select": "small"},
+                       min_samples=min_samples, probe_every=probe_every)
+
+
+def simulate(router, node, latencies, calls):
+    """Route `calls` calls, recording each chosen model's latency; returns the models used"""
+    used = []
+    for _ in range(calls):
+        model = router.model_for(node)
+        router.record(node, model, latencies[model])
+        used.append(model)
+    return used
+
+
+def test_unlisted_node_uses_default():
+    router = make_router()
+    assert router.model_for("summarise") == "large"
+    assert router.model_for(None) == "large"
+
+
+def test_fast_small_model_keeps_traffic():
+    router = make_router()
+    used = simulate(router, "select", {"small": 0.1, "large": 1.0}, 40)
+    assert used.count("small") == 30
+    # the default is probed too, so the comparison has both sides
+    assert used.count("large") == 10
+
+
+def test_slow_small_model_is_routed_away_from():
+    router = make_router()
+    used = simulate(router, "select", {"small": 2.0, "large": 0.5}, 40)
+    # only the probes after both sides have min_samples go to the small model
+    assert used[-20:].count("small") == 5
+    assert used[-20:].count("large") == 15
+
+
+def test_small_model_wins_traffic_back():
+    router = make_router()
+    simulate(router, "select", {"small": 2.0, "large": 0.5}, 40)
+    used = simulate(router, "select", {"small": 0.1, "large": 0.5}, 40)
+    assert used[-20:].count("small") == 15
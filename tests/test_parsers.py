@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from api import parsers
+from api.source_registry import default_adapters
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+ADAPTERS = {adapter.name: adapter for adapter in default_adapters()}
+
+BASE_URLS = {"bioRxiv": "https://www.biorxiv.org", "medRxiv": "https://www.medrxiv.org",
+             "PubMed": "https://www.pubmed.org"}
+
+SOUP_PARSERS = {
+    **{name: (lambda html, base=base: parsers.parse_highwire_soup(html, base)) for name, base in BASE_URLS.items()},
+    "SSRN": parsers.parse_ssrn_soup,
+    "arXiv": parsers.parse_arxiv_soup,
+    "SpringerOpen": parsers.parse_springeropen_soup,
+}
+
+LXML_PARSERS = {
+    **{name: (lambda html, base=base: parsers.parse_highwire_lxml(html, base)) for name, base in BASE_URLS.items()},
+    "SSRN": parsers.parse_ssrn_lxml,
+    "arXiv": parsers.parse_arxiv_lxml,
+    "SpringerOpen": parsers.parse_springeropen_lxml,
+}
+
+CHUNK_SIZES = (1, 7, 64, 1000, 4096, 1000000)
+
+
+def fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURES_DIR, f"{name}.html"), "rb") as f:
+        return f.read()
+
+
+def parse_incrementally(name: str, page: bytes, chunk_size: int):
+    parser = ADAPTERS[name].stream_parser("utf-8")
+    for start in range(0, len(page), chunk_size):
+        if parser.feed(page[start:start + chunk_size]):
+            break
+    return parser.close()
+
+
+@pytest.mark.parametrize("name", sorted(SOUP_PARSERS))
+def test_lxml_matches_soup(name):
+    html = fixture(name).decode("utf-8")
+    expected = SOUP_PARSERS[name](html)
+    assert expected and all("title" in article for article in expected)
+    assert LXML_PARSERS[name](html) == expected
+
+
+@pytest.mark.parametrize("name", sorted(SOUP_PARSERS))
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_incremental_matches_soup(name, chunk_size):
+    page = fixture(name)
+    assert parse_incrementally(name, page, chunk_size) == SOUP_PARSERS[name](page.decode("utf-8"))
+
+
+SSRN_PARSERS = [parsers.parse_ssrn_soup, parsers.parse_ssrn_lxml,
+                lambda html: parse_incrementally("SSRN", html.encode(), 64)]
+
+
+@pytest.mark.parametrize("parse", SSRN_PARSERS)
+def test_empty_ssrn_results_list_is_a_note(parse):
+    assert parse('<html><body><ol class="searchResults"></ol></body></html>') == [
+        {"note": "No relevant papers found for this query."}
+    ]
+
+
+@pytest.mark.parametrize("parse", SSRN_PARSERS)
+def test_ssrn_page_without_results_list_is_an_error(parse):
+    with pytest.raises(parsers.PageLayoutError, match="no search results list"):
+        parse("<html><body><p>Access denied</p></body></html>")
@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from api import prompt_packing
+from api.llm_scheduler import estimate_tokens
+from api.prompt_packing import _allowances, count_tokens, pack_articles
+
+
+@pytest.fixture(autouse=True)
+def length_estimate(monkeypatch):
+    # The ~4 characters per token estimate, as before the tokenizer has loaded
+    monkeypatch.setattr(prompt_packing, "_encoding", None)
+    monkeypatch.setattr(prompt_packing, "_encoding_loader", threading.Thread())
+
+
+def article(n, abstract_words=200, **extra):
+    return {"title": f"Paper {n}", "authors": "A. Author", "pub_date": "2024",
+            "url": f"https://example.org/{n}", "abstract": " ".join(["word"] * abstract_words), **extra}
+
+
+def test_packed_articles_fit_the_budget():
+    articles = [article(n) for n in range(10)]
+    for budget in (200, 500, 1500):
+        packed = pack_articles(articles, budget)
+        assert count_tokens(packed) <= budget * 1.05
+
+
+def test_short_abstracts_are_kept_whole():
+    first, second = pack_articles([article(1, abstract_words=5), article(2, abstract_words=2000)], 400).split("\n\n")
+    assert first == "[1] Paper 1\nA. Author | 2024\nhttps://example.org/1\nword word word word word"
+    assert second.endswith("…")
+
+
+def test_placeholders_and_empty_fields_are_dropped():
+    packed = pack_articles([
+        {"error": "SSRN HTTP 403"},
+        {"note": "No relevant papers found for this query."},
+        article(1, authors="N/A", pub_date="unknown"),
+    ], 500)
+    assert packed.startswith("[1] Paper 1\nhttps://example.org/1")
+    assert "N/A" not in packed and "SSRN" not in packed
+
+
+def test_trailing_articles_dropped_when_headings_do_not_fit():
+    packed = pack_articles([article(n, abstract_words=0) for n in range(1, 50)], 60)
+    assert packed.startswith("[1] Paper 1")
+    assert "[49]" not in packed
+
+
+def test_no_articles():
+    assert pack_articles([], 100) == "(no articles found)"
+    assert pack_articles([{"error": "timed out"}], 100) == "(no articles found)"
+
+
+def test_allowances_share_the_budget():
+    allowances = _allowances([10, 500, 1000], 600)
+    assert allowances[0] == 10
+    assert sum(allowances) <= 600
+    assert allowances[1] == allowances[2] == 295
+    assert _allowances([10, 20], 1000) == [10, 20]
+    assert _allowances([10, 20], -5) == [0, 0]
+
+
+class WordEncoding:
+    def encode(self, text, disallowed_special=()):
+        return text.split()
+
+
+def test_first_token_count_loads_the_encoding_in_the_background(monkeypatch):
+    loaded = threading.Event()
+
+    def load():
+        loaded.wait(5)
+        monkeypatch.setattr(prompt_packing, "_encoding", WordEncoding())
+
+    monkeypatch.setattr(prompt_packing, "_encoding_loader", None)
+    monkeypatch.setattr(prompt_packing, "_load_encoding", load)
+    text = "a b c d e f g h"
+    # estimated from the length while the load is still running
+    assert count_tokens(text) == estimate_tokens(text) != 8
+    loaded.set()
+    prompt_packing._encoding_loader.join(5)
+    assert count_tokens(text) == 8
+
+
+def test_budgets_per_node(monkeypatch):
+    monkeypatch.setattr(prompt_packing, "_budgets", {"select": 1500})
+    assert prompt_packing.budget_for("select") == 1500
+    assert prompt_packing.budget_for("draft") == prompt_packing.PROMPT_TOKEN_BUDGET
@@ -0,0 +1,103 @@
+import math
+
+import pytest
+
+from api import research_agent
+from api.relevance import as_selection, bm25_scores, is_decisive, rank_articles, tokenize
+
+
+def article(title, abstract="", url=None):
+    return {"title": title, "abstract": abstract, "url": url or f"https://example.org/{title.replace(' ', '-')}"}
+
+
+def reference_bm25(query, documents, k1=1.5, b=0.75):
+    """Term-at-a-time BM25, the textbook loop the vectorized version replaces"""
+    terms = set(tokenize(query))
+    average = sum(len(tokens) for tokens in documents) / len(documents)
+    scores = []
+    for tokens in documents:
+        score = 0.0
+        for term in terms:
+            frequency = tokens.count(term)
+            containing = sum(term in other for other in documents)
+            idf = math.log(1 + (len(documents) - containing + 0.5) / (containing + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + k1 * (1 - b + b * len(tokens) / average))
+        scores.append(score)
+    return scores
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("The Effects of GNNs on C++ code-search") == ["effects", "gnns", "c", "code", "search"]
+
+
+def test_bm25_matches_the_reference_loop():
+    documents = [tokenize(text) for text in (
+        "graph neural networks for molecules", "graph theory", "protein folding with neural networks", "",
+    )]
+    scores = bm25_scores("graph neural networks", documents)
+    for vectorized, expected in zip(scores, reference_bm25("graph neural networks", documents)):
+        assert math.isclose(vectorized, expected, rel_tol=1e-9, abs_tol=1e-12)
+
+
+def test_query_without_terms_scores_zero():
+    assert bm25_scores("the of and", [["graph"], ["networks"]]).tolist() == [0.0, 0.0]
+    assert bm25_scores("graph", []).tolist() == []
+
+
+def test_rank_prefers_title_matches_and_skips_placeholders():
+    in_abstract = article("Unrelated heading", "graph networks")
+    in_title = article("Graph networks", "unrelated body")
+    ranked = rank_articles("graph networks", [
+        in_abstract, {"error": "arXiv timed out"}, {"note": "No results"}, {"title": ""}, in_title,
+    ])
+    assert [item for _, item in ranked] == [in_title, in_abstract]
+    assert ranked[0][0] > ranked[1][0]
+
+
+def test_rank_keeps_input_order_for_ties():
+    articles = [article(f"paper {i}", "same words") for i in range(4)]
+    assert [item for _, item in rank_articles("unmatched", articles)] == articles
+
+
+def test_is_decisive():
+    ranked = [(score, {}) for score in (9.0, 8.0, 6.0, 4.0, 1.0)]
+    assert is_decisive(ranked, k=3, ratio=1.5)
+    assert not is_decisive(ranked, k=3, ratio=1.6)
+    assert is_decisive(ranked[:3], k=3)
+    assert not is_decisive([(0.0, {})] * 4, k=3)
+
+
+def test_as_selection_has_the_llm_shape():
+    ranked = rank_articles("graph", [article("Graph", url="https://example.org/g"), article("Other")])
+    selection = as_selection(ranked, k=1)
+    assert selection == [{"title": "Graph", "url": "https://example.org/g",
+                          "reason": f"Ranked locally by BM25 relevance ({ranked[0][0]:.2f})"}]
+
+
+def fetched(*articles):
+    return {"topic": "graph networks", "fetched_data": {"A": list(articles)}}
+
+
+def test_select_relevant_skips_the_llm_when_decisive(monkeypatch):
+    monkeypatch.setattr(research_agent, "_routed_invoke", lambda *args: pytest.fail("LLM called"))
+    state = research_agent.select_relevant(fetched(article("Graph networks"), article("Protein folding")))
+    assert [item["title"] for item in state["selected_artices"]] == ["Graph networks", "Protein folding"]
+
+
+def test_select_relevant_sends_only_the_top_candidates(monkeypatch):
+    monkeypatch.setattr(research_agent, "SELECT_TOP_K", 2)
+    seen = []
+
+    def routed_invoke(prompt, inputs, node, parse):
+        seen.append(inputs["articles"])
+        return None
+
+    monkeypatch.setattr(research_agent, "_routed_invoke", routed_invoke)
+    articles = [article(f"Graph networks {i}") for i in range(5)]
+    state = research_agent.select_relevant(fetched(*articles))
+    assert len(seen) == 1
+    assert "Graph networks 0" in seen[0] and "Graph networks 1" in seen[0]
+    assert "Graph networks 2" not in seen[0]
+    # the LLM gave nothing usable, so the local ranking stands in
+    assert [item["title"] for item in state["selected_artices"]] == ["Graph networks 0", "Graph networks 1",
+                                                                    "Graph networks 2"]
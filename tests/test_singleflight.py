@@ -0,0 +1,130 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from api.deadline import Deadline, DeadlineExceeded
+from api.singleflight import SingleFlight
+
+
+def run_concurrently(flights, key, fn, callers):
+    """Call flights.do(key, fn) from `callers` threads at once; returns their (result, shared) pairs"""
+    outcomes = []
+    errors = []
+    start = threading.Barrier(callers)
+
+    def call():
+        start.wait()
+        try:
+            outcomes.append(flights.do(key, fn))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes, errors
+
+
+def test_concurrent_identical_calls_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        time.sleep(0.2)
+        return "result"
+
+    outcomes, errors = run_concurrently(flights, "topic", slow, 5)
+    assert not errors
+    assert len(runs) == 1
+    assert [result for result, _ in outcomes] == ["result"] * 5
+    assert sorted(shared for _, shared in outcomes) == [False, True, True, True, True]
+    assert flights.stats() == {"in_flight": 0, "coalesced": 4}
+
+
+def test_error_reaches_every_caller():
+    flights = SingleFlight()
+
+    def failing():
+        time.sleep(0.2)
+        raise RuntimeError("boom")
+
+    outcomes, errors = run_concurrently(flights, "topic", failing, 3)
+    assert not outcomes
+    assert len(errors) == 3 and all(str(e) == "boom" for e in errors)
+
+
+def test_finished_run_is_not_reused():
+    flights = SingleFlight()
+    calls = []
+    assert flights.do("topic", lambda: calls.append(1) or len(calls)) == (1, False)
+    assert flights.do("topic", lambda: calls.append(1) or len(calls)) == (2, False)
+
+
+def test_different_keys_run_separately():
+    flights = SingleFlight()
+    outcomes = []
+    threads = [threading.Thread(target=lambda k=k: outcomes.append(flights.do(k, lambda: time.sleep(0.1) or k)))
+               for k in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(outcomes) == [("a", False), ("b", False)]
+
+
+def test_waiter_gives_up_at_its_deadline():
+    flights = SingleFlight()
+    release = threading.Event()
+    leader = threading.Thread(target=flights.do, args=("topic", release.wait))
+    leader.start()
+    time.sleep(0.05)
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        flights.do("topic", lambda: "unused", Deadline(0.1))
+    assert time.monotonic() - started < 1
+    release.set()
+    leader.join()
+
+
+def test_async_callers_share_one_task():
+    flights = SingleFlight()
+    runs = []
+
+    async def slow():
+        runs.append(1)
+        await asyncio.sleep(0.1)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.ado("topic", slow) for _ in range(4)))
+
+    outcomes = asyncio.run(main())
+    assert len(runs) == 1
+    assert [result for result, _ in outcomes] == ["result"] * 4
+    assert [shared for _, shared in outcomes].count(False) == 1
+
+
+def test_late_stream_subscriber_gets_events_replayed():
+    flights = SingleFlight()
+    proceed = threading.Event()
+
+    def start(publish, finish):
+        def produce():
+            publish(("first", {}))
+            proceed.wait()
+            publish(("second", {}))
+            finish()
+        threading.Thread(target=produce).start()
+
+    events, shared = flights.stream("topic", start)
+    assert not shared
+    late, late_shared = flights.stream("topic", start)
+    assert late_shared
+    proceed.set()
+    assert [event for event, _ in events] == ["first", "second"]
+    assert [event for event, _ in late] == ["first", "second"]
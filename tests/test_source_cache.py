@@ -0,0 +1,83 @@
+import sys
+import time
+import threading
+
+import pytest
+
+from api.source_cache import MemoryBackend, SQLiteBackend, SourceCache, build_backend, normalize_topic
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend_factory(request, tmp_path):
+    if request.param == "memory":
+        return lambda max_entries=10: MemoryBackend(max_entries)
+    return lambda max_entries=10: SQLiteBackend(str(tmp_path / "cache.sqlite3"), max_entries)
+
+
+def test_normalize_topic():
+    assert normalize_topic("  Quantum+Computing  Now ") == "quantum computing now"
+
+
+def test_entries_expire_after_their_ttl(backend_factory):
+    backend = backend_factory()
+    backend.set("short", [1], 0.05)
+    backend.set("long", [2], 60)
+    assert backend.get("short") == [1]
+    time.sleep(0.06)
+    assert backend.get("short") is None
+    assert backend.get("long") == [2]
+
+
+def test_least_recently_used_entry_is_evicted(backend_factory):
+    backend = backend_factory(max_entries=2)
+    backend.set("a", "A", 60)
+    time.sleep(0.01)
+    backend.set("b", "B", 60)
+    time.sleep(0.01)
+    backend.get("a")
+    time.sleep(0.01)
+    backend.set("c", "C", 60)
+    assert backend.get("b") is None
+    assert backend.get("a") == "A" and backend.get("c") == "C"
+
+
+def test_source_cache_keys_ttls_and_counters():
+    cache = SourceCache(MemoryBackend(), default_ttl=60, ttls={"SSRN": 0})
+    cache.set("arXiv", "Graph  Networks", [{"title": "t"}])
+    assert cache.get("arXiv", "graph networks") == [{"title": "t"}]
+    # a zero TTL disables caching for that source
+    cache.set("SSRN", "graph networks", [{"title": "t"}])
+    assert cache.get("SSRN", "graph networks") is None
+    # failed scrapes are not cached
+    cache.set("bioRxiv", "graph networks", [{"error": "HTTP 503"}])
+    assert cache.get("bioRxiv", "graph networks") is None
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_ratio": pytest.approx(1 / 3)}
+
+
+def test_source_cache_counters_are_thread_safe():
+    cache = SourceCache(MemoryBackend(), default_ttl=60)
+    cache.set("arXiv", "topic", [{"title": "t"}])
+
+    def hammer():
+        for _ in range(2000):
+            cache.get("arXiv", "topic")
+            cache.get("arXiv", "missing")
+
+    threads = [threading.Thread(target=hammer) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 8000
+
+
+def test_redis_backend_without_the_package_fails_loudly(monkeypatch):
+    monkeypatch.setitem(sys.modules, "redis", None)
+    with pytest.raises(ImportError, match="pip install redis"):
+        build_backend("redis")
+
+
+def test_unusable_sqlite_path_falls_back_to_memory(tmp_path):
+    with pytest.warns(UserWarning, match="sqlite"):
+        backend = build_backend("sqlite", str(tmp_path / "missing" / "cache.sqlite3"))
+    assert isinstance(backend, MemoryBackend)
@@ -0,0 +1,131 @@
+import time
+
+import pytest
+
+from api.source_registry import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, RateLimiter, SourceAdapter, SourceHTTPError, SourceUnavailable,
+    is_source_failure
+)
+
+
+def make_breaker(**kwargs):
+    settings = dict(window=10, min_calls=4, failure_rate=0.5, cooldown=0.05, enabled=True)
+    settings.update(kwargs)
+    return CircuitBreaker("test", **settings)
+
+
+def make_adapter(**kwargs):
+    adapter = SourceAdapter("test", "multi", "https://example.org/search?q={query}", parse=lambda html: [], **kwargs)
+    adapter.breaker = make_breaker()
+    return adapter
+
+
+def test_breaker_waits_for_min_calls_before_opening():
+    breaker = make_breaker()
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == CLOSED
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_breaker_stays_closed_below_failure_rate():
+    breaker = make_breaker()
+    for success in (True, True, True, False, True, False):
+        breaker.record(success)
+    assert breaker.state == CLOSED
+
+
+def test_breaker_lets_one_probe_through_after_cooldown():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    time.sleep(0.06)
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # only one probe at a time
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == OPEN
+    assert breaker.opened == 2
+
+
+def test_released_probe_frees_the_slot():
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_disabled_breaker_never_opens():
+    breaker = make_breaker(enabled=False)
+    for _ in range(10):
+        breaker.record(False)
+    assert breaker.state == CLOSED
+
+
+def test_only_transport_and_http_errors_count_as_failures():
+    assert is_source_failure(SourceHTTPError("HTTP 503"))
+    assert is_source_failure(ConnectionError("reset"))
+    assert is_source_failure(TimeoutError())
+    assert not is_source_failure(ValueError("page structure changed"))
+    assert not is_source_failure(KeyError("title"))
+
+
+def test_adapter_call_records_outcomes():
+    adapter = make_adapter()
+    for _ in range(6):
+        with pytest.raises(ValueError):
+            with adapter.call():
+                raise ValueError("parser error")
+    assert adapter.breaker.state == CLOSED
+    for _ in range(4):
+        with pytest.raises(SourceHTTPError):
+            with adapter.call():
+                raise SourceHTTPError("HTTP 503")
+    # 4 failures out of 10 calls is below the 50% rate
+    assert adapter.breaker.state == CLOSED
+    with pytest.raises(OSError):
+        with adapter.call():
+            raise OSError("connection refused")
+    assert adapter.breaker.state == OPEN
+    with pytest.raises(SourceUnavailable):
+        with adapter.call():
+            pass
+
+
+def test_adapter_concurrency_cap():
+    adapter = make_adapter(concurrency=1)
+    with adapter.call():
+        with pytest.raises(SourceUnavailable):
+            with adapter.call(timeout=0.05):
+                pass
+    with adapter.call(timeout=0.05):
+        pass
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(10)
+    assert limiter.reserve() == 0.0
+    assert limiter.reserve() == pytest.approx(0.1, abs=0.01)
+    # a slot further away than the timeout is not booked
+    assert limiter.reserve(timeout=0.05) is None
+    assert limiter.reserve() == pytest.approx(0.2, abs=0.01)
+    assert RateLimiter(0).reserve() == 0.0
@@ -0,0 +1,12 @@
+from api.spec import parse_spec
+
+
+def test_values_are_converted():
+    assert parse_spec("bioRxiv=3600, SSRN=0.5", float) == {"bioRxiv": 3600.0, "SSRN": 0.5}
+    assert parse_spec("arxiv.org=4,www.springeropen.com = 2", int) == {"arxiv.org": 4, "www.springeropen.com": 2}
+    assert parse_spec("classify=mini, select = mini ", str) == {"classify": "mini", "select": "mini"}
+
+
+def test_malformed_entries_are_skipped():
+    assert parse_spec("SSRN=1,bad,x=y,=3,empty=", int) == {"SSRN": 1}
+    assert parse_spec("", float) == {}
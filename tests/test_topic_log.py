@@ -0,0 +1,82 @@
+from types import SimpleNamespace
+
+import pytest
+
+from api import cache_warmer, topic_log
+from api.topic_log import TopicLog
+
+MISS = {"arXiv": "miss", "bioRxiv": "miss"}
+HIT = {"arXiv": "hit", "bioRxiv": "index"}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(topic_log, "time", SimpleNamespace(time=lambda: clock.now))
+    return clock
+
+
+@pytest.fixture
+def log(tmp_path, clock):
+    return TopicLog(str(tmp_path / "topics.sqlite3"), retention=10_000)
+
+
+def test_freshly_scraped_topic_is_not_due(log, clock):
+    log.record("Graph Networks", MISS)
+    assert log.due(10, window=1000, refresh_after=100) == []
+    clock.now += 101
+    assert log.due(10, window=1000, refresh_after=100) == ["graph networks"]
+
+
+def test_cached_requests_do_not_count_as_scrapes(log, clock):
+    log.record("graph networks", MISS)
+    clock.now += 90
+    log.record("graph networks", HIT)
+    clock.now += 20
+    # the cache entries written 110s ago are what is about to expire
+    assert log.due(10, window=1000, refresh_after=100) == ["graph networks"]
+
+
+def test_warming_resets_the_age(log, clock):
+    log.record("graph networks", MISS)
+    clock.now += 200
+    log.warmed("graph networks")
+    assert log.due(10, window=1000, refresh_after=100) == []
+    clock.now += 101
+    assert log.due(10, window=1000, refresh_after=100) == ["graph networks"]
+
+
+def test_most_requested_first_within_the_window(log, clock):
+    log.record("old topic", MISS)
+    clock.now += 500
+    for _ in range(3):
+        log.record("hot topic", HIT)
+    log.record("cold topic", HIT)
+    log.record("cold topic", MISS)
+    clock.now += 200
+    assert log.due(10, window=600, refresh_after=100) == ["hot topic", "cold topic"]
+    assert log.due(1, window=600, refresh_after=100) == ["hot topic"]
+
+
+def test_hit_ratio(log):
+    log.record("a", MISS)
+    log.record("b", HIT)
+    assert log.hit_ratio(1000) == {"requests": 2, "sources": 4, "warm": 2, "hit_ratio": 0.5}
+    assert log.hit_ratio(1000, ["B"])["hit_ratio"] == 1.0
+
+
+def test_warmer_pass_refreshes_due_topics_once(log, clock, monkeypatch):
+    monkeypatch.setattr(cache_warmer, "get_topic_log", lambda: log)
+    warmer = cache_warmer.CacheWarmer(topics=10, window=1000, refresh_after=100, concurrency=2)
+    refreshed = []
+    monkeypatch.setattr(warmer, "refresh", lambda topic: refreshed.append(topic) or
+                        {"sources": 2, "failed_sources": []})
+    log.record("graph networks", MISS)
+    log.record("protein folding", MISS)
+    clock.now += 150
+    log.record("protein folding", MISS)
+
+    result = warmer.run_once()
+    assert refreshed == ["graph networks"]
+    assert (result["topics"], result["warmed"], result["errors"]) == (1, 1, {})
+    assert warmer.run_once()["topics"] == 0
@@ -0,0 +1,61 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from api import research_agent
+from api.research_agent import ARTICLE_MARKER, SUMMARY_MARKER, SectionSplitter
+
+FUSED_TEXT = f"Sure.\n{SUMMARY_MARKER}\n**Key** findings\n\n{ARTICLE_MARKER}\n# Title\n\nBody text.\n"
+
+
+def responses_output(text):
+    """Serialized Responses API output list, as ResponsesAPIChatModel returns it"""
+    return json.dumps([{"type": "message", "content": [{"type": "output_text", "text": text}]}])
+
+
+def split(chunks, sink=None):
+    splitter = SectionSplitter(sink)
+    for chunk in chunks:
+        splitter.feed(chunk)
+    return splitter.close()
+
+
+@pytest.mark.parametrize("size", [1, 2, 5, 14, 1000])
+def test_splitter_is_independent_of_chunking(size):
+    chunks = [FUSED_TEXT[i:i + size] for i in range(0, len(FUSED_TEXT), size)]
+    assert split(chunks) == ("**Key** findings", "# Title\n\nBody text.")
+
+
+def test_splitter_forwards_deltas_per_section():
+    seen = []
+    split([FUSED_TEXT[:30], FUSED_TEXT[30:]], lambda node, text: seen.append((node, text)))
+    assert {node for node, _ in seen} == {"summarise", "draft"}
+    assert "".join(text for node, text in seen if node == "draft").strip() == "# Title\n\nBody text."
+
+
+def test_splitter_without_markers_has_no_sections():
+    assert split(["just an article"]) == ("", "")
+
+
+@pytest.fixture
+def fused_llm(monkeypatch):
+    monkeypatch.setattr(research_agent, "get_llm", lambda node: RunnableLambda(lambda prompt: None))
+    monkeypatch.setattr(research_agent, "_summary_inputs", lambda state: {"articles": "", "topic": state["topic"]})
+    monkeypatch.setattr(research_agent, "_generate", lambda chain, inputs, node, config=None: responses_output(FUSED_TEXT))
+
+    async def agenerate(chain, inputs, node, config=None):
+        return responses_output(FUSED_TEXT)
+
+    monkeypatch.setattr(research_agent, "_agenerate", agenerate)
+
+
+def test_write_fused_splits_the_output_text(fused_llm):
+    state = research_agent.write_fused({"topic": "topic"})
+    assert (state["summary"], state["article"]) == ("**Key** findings", "# Title\n\nBody text.")
+
+
+def test_awrite_fused_splits_the_output_text(fused_llm):
+    state = asyncio.run(research_agent.awrite_fused({"topic": "topic"}))
+    assert (state["summary"], state["article"]) == ("**Key** findings", "# Title\n\nBody text.")